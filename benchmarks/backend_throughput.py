@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Benchmark: sync (thread pool) vs async (aio client) query backends.
+
+Runs a burst of concurrent queries through ``server._run_query`` against fake
+Kusto clients that simulate a fixed cluster round-trip latency, and reports
+throughput, peak traced memory and peak thread count for each backend.
+
+Usage:
+    python benchmarks/backend_throughput.py [--queries 2000] [--latency-ms 50] [--workers 10]
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+import tracemalloc
+from unittest.mock import patch, MagicMock
+
+from adx_mcp_server import server
+from adx_mcp_server.server import config, ClientBackend
+
+
+class _SyncFakeClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def execute(self, database, query, properties=None):
+        time.sleep(self.latency)
+        return MagicMock(primary_results=[])
+
+
+class _AsyncFakeClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def execute(self, database, query, properties=None):
+        await asyncio.sleep(self.latency)
+        return MagicMock(primary_results=[])
+
+
+class _AsyncFakeRegistry:
+    def __init__(self, client):
+        self.client = client
+
+    async def get_client(self, cluster_url):
+        return self.client
+
+    async def evict_idle(self, idle_seconds, keep=()):
+        return 0
+
+    async def invalidate(self):
+        pass
+
+
+async def _burst(queries: int) -> tuple[float, int]:
+    peak_threads = threading.active_count()
+
+    async def one():
+        nonlocal peak_threads
+        await server._run_query("benchdb", "T | take 1")
+        peak_threads = max(peak_threads, threading.active_count())
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(queries)])
+    return time.perf_counter() - start, peak_threads
+
+
+def run(backend: str, queries: int, latency: float, workers: int) -> dict:
+    config.cluster_url = "https://bench.kusto.windows.net"
+    config.client_backend = backend
+    config.max_concurrent_queries = workers
+    server.shutdown_query_executor()
+
+    with patch('adx_mcp_server.server.get_kusto_client', return_value=_SyncFakeClient(latency)), \
+            patch('adx_mcp_server.server._get_async_client_registry',
+                  return_value=_AsyncFakeRegistry(_AsyncFakeClient(latency))):
+        tracemalloc.start()
+        elapsed, peak_threads = asyncio.run(_burst(queries))
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    server.get_query_executor().shutdown(wait=True)
+    server.shutdown_query_executor()
+    return {
+        "backend": backend,
+        "elapsed_s": elapsed,
+        "qps": queries / elapsed,
+        "peak_memory_kib": peak_memory / 1024,
+        "peak_threads": peak_threads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=2000, help="number of concurrent queries")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated cluster latency per query")
+    parser.add_argument("--workers", type=int, default=10, help="sync backend worker threads")
+    args = parser.parse_args()
+    # Per-query debug and info lines would dominate the measurement
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    server.configure_logging()
+
+    print(f"{args.queries} queries, {args.latency_ms:.0f} ms simulated latency, {args.workers} sync workers")
+    print(f"{'backend':<8} {'elapsed s':>10} {'queries/s':>10} {'peak KiB':>10} {'threads':>8}")
+    for backend in ClientBackend.values():
+        result = run(backend, args.queries, args.latency_ms / 1000, args.workers)
+        print(
+            f"{result['backend']:<8} {result['elapsed_s']:>10.2f} {result['qps']:>10.0f} "
+            f"{result['peak_memory_kib']:>10.0f} {result['peak_threads']:>8}"
+        )
+    server.shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
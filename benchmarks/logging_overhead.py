@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Benchmark: logging overhead per call on the tool path.
+
+Times one per-call info log (the "Executing KQL query" event with its usual
+fields) through the server's processor chain, writing synchronously to a file
+as before, through the background queue writer, and through the queue writer
+with sampling and rate limiting, and reports microseconds per call.
+
+Usage:
+    python benchmarks/logging_overhead.py [--calls 50000] [--sample-rate 0.1] [--rate-limit 10]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import structlog
+
+from adx_mcp_server.logsink import EventSampler, QueueLoggerFactory, QueueWriter
+from adx_mcp_server.server import PER_CALL_LOG_EVENTS
+
+
+def _configure(logger_factory, sampler=None):
+    processors = [structlog.contextvars.merge_contextvars, structlog.processors.add_log_level]
+    if sampler is not None:
+        processors.append(sampler)
+    processors += [structlog.processors.TimeStamper(fmt="iso"), structlog.processors.JSONRenderer()]
+    structlog.configure(
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(20),
+        context_class=dict,
+        logger_factory=logger_factory,
+        cache_logger_on_first_use=False,
+    )
+
+
+def _time_calls(calls: int) -> float:
+    logger = structlog.get_logger()
+    started = time.perf_counter()
+    for i in range(calls):
+        logger.info("Executing KQL query", database="testdb", query="StormEvents | take 10", call=i)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=50000, help="log calls per scenario")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="LOG_SAMPLE_RATE for the sampled scenario")
+    parser.add_argument("--rate-limit", type=float, default=10, help="LOG_RATE_LIMIT for the sampled scenario")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "server.log")
+        results = []
+
+        with open(path, "a", encoding="utf-8") as stream:
+            _configure(structlog.PrintLoggerFactory(stream))
+            results.append(("synchronous write", _time_calls(args.calls), None))
+
+        for label, sampler in (
+            ("queue writer", None),
+            (f"queue + sample {args.sample_rate} + limit {args.rate_limit:g}/s",
+             EventSampler(PER_CALL_LOG_EVENTS, args.sample_rate, args.rate_limit)),
+        ):
+            writer = QueueWriter(open(path, "a", encoding="utf-8"), max_queue=args.calls, close_stream=True)
+            _configure(QueueLoggerFactory(writer), sampler)
+            per_call = _time_calls(args.calls)
+            writer.close()
+            results.append((label, per_call, writer.stats()))
+
+    print(f"{args.calls} 'Executing KQL query' info logs per scenario")
+    print(f"{'':<36} {'us/call':>8} {'written':>8} {'dropped':>8}")
+    for label, per_call, stats in results:
+        written = stats["written"] if stats else args.calls
+        dropped = stats["dropped"] if stats else 0
+        print(f"{label:<36} {per_call:>8.2f} {written:>8} {dropped:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""
+Benchmark: serializing a large mixed-type query result for an MCP response.
+
+Builds a result of datetime, timespan, decimal, guid, real, long, string and
+dynamic columns, then times formatting it as records, converting the records
+into a tool result, and serializing the CallToolResult the way the MCP
+session writes it to the transport. The previous path (SDK-typed rows
+serialized by fastmcp's pydantic conversion) is compared with records built
+from the raw rows whose text content is encoded by the server's result tools;
+the structured content is serialized by pydantic in both.
+
+Usage:
+    python benchmarks/result_serialization.py [--rows 100000] [--runs 3]
+"""
+
+import argparse
+import logging
+import time
+import uuid
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+import structlog
+from azure.kusto.data._models import KustoResultTable
+from fastmcp.tools import FunctionTool
+from mcp.types import CallToolResult
+
+from adx_mcp_server.serialization import json_backend
+from adx_mcp_server.server import EncodedResultTool, format_query_results
+
+COLUMNS = [
+    ("Timestamp", "datetime"), ("Duration", "timespan"), ("Price", "decimal"), ("Id", "guid"),
+    ("Ratio", "real"), ("Count", "long"), ("Name", "string"), ("Props", "dynamic"),
+]
+
+
+def build_result_set(rows: int):
+    raw_rows = [
+        [
+            f"2024-01-{i % 28 + 1:02}T{i % 24:02}:{i % 60:02}:00.1234567Z",
+            f"{i % 3}.{i % 24:02}:{i % 60:02}:05.5000000",
+            f"{i}.{i % 100:02}",
+            str(uuid.UUID(int=i)),
+            i / 7,
+            i,
+            f"name-{i}",
+            {"index": i, "tags": ["a", "b"]},
+        ]
+        for i in range(rows)
+    ]
+    table = KustoResultTable({
+        "TableName": "PrimaryResult",
+        "Columns": [{"ColumnName": name, "ColumnType": column_type} for name, column_type in COLUMNS],
+        "Rows": raw_rows,
+    })
+    result_set = MagicMock()
+    result_set.primary_results = [table]
+    return result_set
+
+
+def sdk_typed_records(result_set) -> List[Dict[str, Any]]:
+    """Records as formatted before per-column converters: SDK values left to pydantic."""
+    table = result_set.primary_results[0]
+    columns = [col.column_name for col in table.columns]
+    return [dict(zip(columns, row)) for row in table.rows]
+
+
+def records_tool() -> List[Dict[str, Any]]:
+    return []
+
+
+def serialize(tool_result) -> str:
+    """Serialize a tool result as the MCP session sends it."""
+    result = tool_result.to_mcp_result()
+    if isinstance(result, tuple):
+        result = CallToolResult(content=result[0], structuredContent=result[1])
+    elif isinstance(result, list):
+        result = CallToolResult(content=result)
+    return result.model_dump_json(by_alias=True, exclude_none=True)
+
+
+def best_of(runs: int, rows: int, format_records, tool):
+    """Return the fastest (format ms, convert ms, serialize ms) over ``runs`` freshly built results."""
+    timings = []
+    for _ in range(runs):
+        # A new table per run: the SDK caches typed rows on the table
+        result_set = build_result_set(rows)
+        started = time.perf_counter()
+        records = format_records(result_set)
+        formatted = time.perf_counter()
+        tool_result = tool.convert_result(records)
+        converted = time.perf_counter()
+        serialize(tool_result)
+        timings.append((
+            (formatted - started) * 1000,
+            (converted - formatted) * 1000,
+            (time.perf_counter() - converted) * 1000,
+        ))
+    return min(timings, key=sum)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000, help="rows in the result")
+    parser.add_argument("--runs", type=int, default=3, help="runs per measurement; the fastest is reported")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.INFO))
+    default_tool = FunctionTool.from_function(records_tool)
+    encoded_tool = EncodedResultTool.from_function(records_tool)
+
+    scenarios = [
+        ("typed rows + pydantic", *best_of(args.runs, args.rows, sdk_typed_records, default_tool)),
+        (f"raw rows + {json_backend()}", *best_of(args.runs, args.rows, format_query_results, encoded_tool)),
+    ]
+    size = len(serialize(encoded_tool.convert_result(format_query_results(build_result_set(args.rows)))))
+
+    print(f"{args.rows} rows x {len(COLUMNS)} mixed-type columns, {size / 1e6:.1f} MB response, best of {args.runs}")
+    print(f"{'':<24} {'format ms':>10} {'convert ms':>11} {'serialize ms':>13} {'total ms':>10}")
+    for label, format_ms, convert_ms, serialize_ms in scenarios:
+        total_ms = format_ms + convert_ms + serialize_ms
+        print(f"{label:<24} {format_ms:>10.0f} {convert_ms:>11.0f} {serialize_ms:>13.0f} {total_ms:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Benchmark: server import and startup time.
+
+Imports ``adx_mcp_server.main`` in fresh interpreters and reports the total
+import time, the part spent in fastmcp and structlog (needed to serve at all),
+the server's own share, and whether the Azure SDK was imported eagerly.
+
+Usage:
+    python benchmarks/startup_time.py [--runs 10]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from fastmcp import FastMCP
+import structlog
+dependencies = time.perf_counter()
+import adx_mcp_server.main
+finished = time.perf_counter()
+print(json.dumps({
+    "total_ms": (finished - started) * 1000,
+    "dependencies_ms": (dependencies - started) * 1000,
+    "server_ms": (finished - dependencies) * 1000,
+    "azure_loaded": any(m.startswith("azure") for m in sys.modules),
+}))
+"""
+
+
+def run_once() -> dict:
+    output = subprocess.run([sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="number of fresh interpreters to time")
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    print(f"{args.runs} cold imports of adx_mcp_server.main")
+    print(f"{'':<22} {'min ms':>8} {'median ms':>10}")
+    for key, label in (("total_ms", "total"), ("dependencies_ms", "fastmcp + structlog"), ("server_ms", "adx_mcp_server")):
+        values = [result[key] for result in results]
+        print(f"{label:<22} {min(values):>8.0f} {statistics.median(values):>10.0f}")
+    print(f"Azure SDK imported at startup: {any(result['azure_loaded'] for result in results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Admission Control
+Limits how many tool calls run at once, overall and per client, rate-limits
+each client with a token bucket, and queues the overflow in a bounded queue.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+# Weight of the latest queue wait in the moving average used for retry hints
+_WAIT_SMOOTHING = 0.2
+# Idle client state is pruned once this many clients are tracked
+_PRUNE_THRESHOLD = 1024
+
+class AdmissionRejected(Exception):
+    """A call was not admitted. ``retry_after`` is the suggested wait in seconds before retrying."""
+
+    def __init__(self, reason: str, message: str, retry_after: float):
+        super().__init__(f"{message} Retry after {retry_after:g} seconds.")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """A token bucket holding up to ``burst`` tokens, refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token. Returns 0 on success, otherwise the seconds until one is available."""
+        self._refill(now)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self._tokens >= self.burst
+
+class _ClientState:
+    __slots__ = ("in_flight", "bucket")
+
+    def __init__(self, bucket: Optional[TokenBucket]):
+        self.in_flight = 0
+        self.bucket = bucket
+
+class AdmissionController:
+    """
+    Admission control in front of the tools.
+
+    A call is admitted at once when fewer than ``max_in_flight`` calls run
+    overall and fewer than ``client_max_in_flight`` run for its client (0
+    means no limit). Otherwise it waits in a FIFO queue of at most
+    ``max_queue`` calls for up to ``queue_timeout`` seconds; waiting calls
+    with a lower ``priority`` number go first, and a waiting call whose own
+    client is at its limit does not hold up calls of other clients. Each
+    client also spends one token per call from a bucket of ``client_burst``
+    tokens refilled at ``client_rate`` per second (0 means no rate limit).
+    Calls over the rate, arriving at a full queue or waiting past the timeout
+    are rejected with a retry-after hint.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 0,
+        max_queue: int = 100,
+        queue_timeout: float = 30.0,
+        client_max_in_flight: int = 0,
+        client_rate: float = 0.0,
+        client_burst: int = 20,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        for name, value in (("max_in_flight", max_in_flight), ("max_queue", max_queue), ("client_max_in_flight", client_max_in_flight)):
+            if not isinstance(value, int) or value < 0:
+                raise ValueError(f"{name} must be a non-negative integer, got: {value}")
+        if queue_timeout <= 0:
+            raise ValueError(f"queue_timeout must be positive, got: {queue_timeout}")
+        if client_rate < 0:
+            raise ValueError(f"client_rate must not be negative, got: {client_rate}")
+        if client_rate and (not isinstance(client_burst, int) or client_burst <= 0):
+            raise ValueError(f"client_burst must be a positive integer, got: {client_burst}")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.client_max_in_flight = client_max_in_flight
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self._clock = clock
+        self._clients: Dict[str, _ClientState] = {}
+        self._waiters: Deque[Tuple[str, asyncio.Future, float, int]] = deque()
+        self._in_flight = 0
+        self._admitted = 0
+        self._rejected: Dict[str, int] = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+        self._wait_average = 0.0
+        self._max_wait = 0.0
+
+    def _client(self, client: str) -> _ClientState:
+        state = self._clients.get(client)
+        if state is None:
+            if len(self._clients) >= _PRUNE_THRESHOLD:
+                self._prune()
+            bucket = TokenBucket(self.client_rate, self.client_burst, self._clock()) if self.client_rate else None
+            state = self._clients[client] = _ClientState(bucket)
+        return state
+
+    def _prune(self) -> None:
+        """Forget clients with nothing running and a full bucket; they would get the same state back."""
+        now = self._clock()
+        idle = [
+            client for client, state in self._clients.items()
+            if state.in_flight == 0 and (state.bucket is None or state.bucket.is_full(now))
+        ]
+        for client in idle:
+            del self._clients[client]
+
+    def _can_run(self, state: _ClientState) -> bool:
+        if self.max_in_flight and self._in_flight >= self.max_in_flight:
+            return False
+        return not self.client_max_in_flight or state.in_flight < self.client_max_in_flight
+
+    def _start(self, state: _ClientState) -> None:
+        self._in_flight += 1
+        self._admitted += 1
+        state.in_flight += 1
+
+    def _retry_after(self) -> float:
+        """Suggest a retry delay from the recent queue wait, at least one second."""
+        return max(1.0, round(self._wait_average, 1))
+
+    def _reject(self, reason: str, message: str, retry_after: float) -> AdmissionRejected:
+        self._rejected[reason] += 1
+        return AdmissionRejected(reason, message, retry_after)
+
+    def _record_wait(self, wait: float) -> None:
+        self._wait_average += _WAIT_SMOOTHING * (wait - self._wait_average)
+        self._max_wait = max(self._max_wait, wait)
+
+    async def acquire(self, client: str, priority: int = 0) -> None:
+        """
+        Wait until a call from ``client`` may run.
+
+        Queued calls are admitted by ``priority`` (lower first), in arrival
+        order within a priority.
+
+        Every successful acquire must be paired with a ``release(client)``.
+
+        Raises:
+            AdmissionRejected: If the client is over its rate, the queue is full
+                or the call waited longer than ``queue_timeout``
+        """
+        state = self._client(client)
+        if state.bucket is not None:
+            wait = state.bucket.take(self._clock())
+            if wait:
+                raise self._reject("rate_limited", f"Rate limit of {self.client_rate:g} calls per second exceeded.", round(max(wait, 0.1), 1))
+
+        ahead = any(waiting[3] <= priority for waiting in self._waiters)
+        if not ahead and self._can_run(state):
+            self._start(state)
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full", "Server is busy and its queue is full.", self._retry_after())
+
+        waiter = (client, asyncio.get_running_loop().create_future(), self._clock(), priority)
+        self._waiters.append(waiter)
+        # Calls ahead in the queue may be held only by their own client's limit
+        self._dispatch()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter[1]
+        except (asyncio.CancelledError, TimeoutError) as e:
+            future = waiter[1]
+            if future.done() and not future.cancelled():
+                # Admitted as the wait ended
+                if isinstance(e, TimeoutError):
+                    return
+                self.release(client)
+                raise
+            future.cancel()
+            self._waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                self._record_wait(self.queue_timeout)
+                raise self._reject(
+                    "queue_timeout", f"Server is busy; the call waited {self.queue_timeout:g} seconds without starting.", self._retry_after()
+                ) from None
+            raise
+
+    def release(self, client: str) -> None:
+        """Mark a call from ``client`` as finished and admit waiting calls that may now run."""
+        self._in_flight -= 1
+        state = self._clients.get(client)
+        if state is not None:
+            state.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = self._clock()
+        # sorted() is stable, so arrival order is kept within a priority
+        for waiter in sorted(self._waiters, key=lambda waiting: waiting[3]):
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                break
+            client, future, queued_at, _ = waiter
+            state = self._client(client)
+            if self._can_run(state):
+                self._waiters.remove(waiter)
+                self._start(state)
+                self._record_wait(now - queued_at)
+                future.set_result(None)
+
+    def stats(self) -> Dict[str, object]:
+        """Return calls running and queued, admissions, rejections by reason and queue wait times."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "clients": len(self._clients),
+            "admitted": self._admitted,
+            "rejected": dict(self._rejected),
+            "avg_wait_ms": round(self._wait_average * 1000, 2),
+            "max_wait_ms": round(self._max_wait * 1000, 2),
+        }
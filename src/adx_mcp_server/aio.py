@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Async Backend
+Native asyncio execution path built on the azure-kusto-data aio client.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+import structlog
+from azure.kusto.data import KustoConnectionStringBuilder
+
+try:
+    from azure.identity.aio import DefaultAzureCredential, WorkloadIdentityCredential
+    from azure.kusto.data.aio import KustoClient
+except ImportError:  # pragma: no cover - depends on the optional aio extras
+    KustoClient = None
+
+logger = structlog.get_logger()
+
+def _create_async_credential():
+    """
+    Create the async Azure credential used by the aio Kusto client.
+
+    Mirrors the sync credential selection: WorkloadIdentityCredential when the
+    workload identity variables are set, DefaultAzureCredential otherwise.
+    """
+    tenant_id = os.environ.get('AZURE_TENANT_ID')
+    client_id = os.environ.get('AZURE_CLIENT_ID')
+    token_file_path = os.environ.get('ADX_TOKEN_FILE_PATH', '/var/run/secrets/azure/tokens/azure-identity-token')
+
+    if tenant_id and client_id:
+        logger.info(
+            "Using async WorkloadIdentityCredential",
+            client_id=client_id,
+            tenant_id=tenant_id,
+            token_file_path=token_file_path
+        )
+        try:
+            return WorkloadIdentityCredential(
+                tenant_id=tenant_id,
+                client_id=client_id,
+                token_file_path=token_file_path
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to initialize async WorkloadIdentityCredential, falling back",
+                error=str(e),
+                exception_type=type(e).__name__
+            )
+            return DefaultAzureCredential()
+
+    logger.info("Using async DefaultAzureCredential (missing WorkloadIdentity credentials)")
+    return DefaultAzureCredential()
+
+class AsyncSharedCredential:
+    """
+    The view of the shared async credential that one aio Kusto client is built with.
+
+    Like ``credentials.SharedCredential``: closing the client leaves the
+    credential other clients use open; the registry closes it directly.
+    """
+
+    def __init__(self, credential):
+        self.credential = credential
+
+    async def get_token(self, *scopes, **kwargs):
+        return await self.credential.get_token(*scopes, **kwargs)
+
+    async def close(self) -> None:
+        """Do nothing; the credential is closed by its owner."""
+
+
+class AsyncKustoClientRegistry:
+    """
+    Registry of pooled aio Kusto clients, one per cluster URL.
+
+    Each aio client owns an aiohttp session bound to the running event loop, so
+    the registry must be created and used from that loop. In-flight queries cost
+    a coroutine each rather than a worker thread.
+
+    Leasing follows the sync KustoClientRegistry: callers pair get_client with
+    release, and a client replaced or evicted while leased is retired and closed
+    (with its credential, once no retired client uses it) on its last release.
+    """
+
+    def __init__(self):
+        if KustoClient is None:
+            raise ImportError(
+                "The async client backend requires the aio extras. "
+                "Install them with: pip install 'adx_mcp_server[aio]'"
+            )
+        self._lock = asyncio.Lock()
+        self._credential = None
+        self._clients: Dict[str, KustoClient] = {}
+        self._last_used: Dict[str, float] = {}
+        # Leases by id(client), and leased clients that were replaced, with their credential
+        self._leases: Dict[int, int] = {}
+        self._retired: Dict[int, tuple] = {}
+
+    async def get_client(self, cluster_url: str) -> "KustoClient":
+        """
+        Lease the pooled aio client for a cluster, creating it on first use.
+
+        Every call must be paired with ``release(client)`` once the client is no longer used.
+        """
+        async with self._lock:
+            self._last_used[cluster_url] = time.monotonic()
+            client = self._clients.get(cluster_url)
+            if client is None:
+                client = self._create_client_locked(cluster_url)
+            self._leases[id(client)] = self._leases.get(id(client), 0) + 1
+            return client
+
+    def _create_client_locked(self, cluster_url: str) -> "KustoClient":
+        """Build and pool the aio client for a cluster; the caller holds the lock."""
+        if self._credential is None:
+            self._credential = _create_async_credential()
+
+        try:
+            # The client closes its credential on close(); the shared one is closed here instead
+            kcsb = KustoConnectionStringBuilder.with_azure_token_credential(
+                connection_string=cluster_url,
+                credential=AsyncSharedCredential(self._credential)
+            )
+            client = KustoClient(kcsb)
+        except Exception as e:
+            logger.error(
+                "Failed to create async Kusto client",
+                error=str(e),
+                exception_type=type(e).__name__,
+                cluster_url=cluster_url
+            )
+            raise
+
+        self._clients[cluster_url] = client
+        logger.debug("Async Kusto client initialized successfully", cluster_url=cluster_url)
+        return client
+
+    async def release(self, client: "KustoClient") -> None:
+        """End a lease taken with get_client, closing the client if it was retired meanwhile."""
+        async with self._lock:
+            key = id(client)
+            leases = self._leases.get(key, 0) - 1
+            if leases > 0:
+                self._leases[key] = leases
+                return
+            self._leases.pop(key, None)
+            retired = self._retired.pop(key, None)
+            if retired is None:
+                return
+            client, credential = retired
+            if credential is self._credential or any(other is credential for _, other in self._retired.values()):
+                credential = None
+        await self._close_all([client, credential])
+
+    def _retire_locked(self, clients, credential) -> tuple:
+        """
+        Retire replaced clients built with ``credential``.
+
+        Returns the clients and credential that are no longer leased and can be
+        closed now; the others are closed by release().
+        """
+        idle = []
+        for client in clients:
+            if self._leases.get(id(client)):
+                self._retired[id(client)] = (client, credential)
+            else:
+                idle.append(client)
+        if credential is self._credential or any(other is credential for _, other in self._retired.values()):
+            credential = None
+        return idle, credential
+
+    async def evict_idle(self, idle_seconds: float, keep: Iterable[str] = ()) -> int:
+        """Close clients not requested for ``idle_seconds``, except those in ``keep``."""
+        cutoff = time.monotonic() - idle_seconds
+        async with self._lock:
+            idle = [
+                url for url in self._clients
+                if url not in keep and self._last_used.get(url, 0) < cutoff
+            ]
+            evicted = [self._clients.pop(url) for url in idle]
+            for url in idle:
+                self._last_used.pop(url, None)
+            closable, _ = self._retire_locked(evicted, self._credential)
+        if evicted:
+            await self._close_all(closable)
+            logger.info("Idle async Kusto clients evicted", cluster_urls=idle)
+        return len(evicted)
+
+    async def invalidate(self, cluster_url: Optional[str] = None, failed_client: Optional["KustoClient"] = None) -> bool:
+        """
+        Drop all pooled clients and the credential so the next call rebuilds them.
+
+        With ``failed_client`` this is a compare-and-swap, as in
+        KustoClientRegistry.invalidate: coroutines that fail together on the same
+        client rebuild it once. Leased clients are closed when released.
+
+        Returns:
+            True if the registry was invalidated
+        """
+        async with self._lock:
+            if failed_client is not None and self._clients.get(cluster_url) is not failed_client:
+                return False
+            clients, credential = list(self._clients.values()), self._credential
+            self._clients, self._credential = {}, None
+            closable, credential = self._retire_locked(clients, credential)
+        await self._close_all([*closable, credential])
+        logger.info("Async Kusto client registry invalidated", client_count=len(clients))
+        return True
+
+    async def close(self) -> None:
+        """Close all pooled clients, including retired ones still leased, and the shared credential."""
+        async with self._lock:
+            clients, credential = list(self._clients.values()), self._credential
+            retired = list(self._retired.values())
+            self._clients, self._credential = {}, None
+            self._leases.clear()
+            self._retired.clear()
+        retired_credentials = {id(other): other for _, other in retired if other is not None and other is not credential}
+        await self._close_all([*clients, *(client for client, _ in retired), credential, *retired_credentials.values()])
+
+    async def _close_all(self, resources) -> None:
+        """Close clients and credentials, logging instead of raising on failure."""
+        for resource in resources:
+            if resource is None:
+                continue
+            try:
+                await resource.close()
+            except Exception as e:
+                logger.warning("Failed to close async Kusto resource", error=str(e), exception_type=type(e).__name__)
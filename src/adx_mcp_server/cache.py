@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Caching
+In-process TTL/LRU cache shared by the result store, metadata and query caches.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class TTLCache:
+    """
+    A thread-safe mapping with per-entry expiry and LRU eviction.
+
+    Entries expire ``ttl_seconds`` after they are stored. When more than
+    ``max_entries`` are held, the least recently used entry is evicted.
+    When ``max_bytes`` is set, entries also carry a caller-supplied size and
+    the least recently used entries are evicted until the total fits the
+    budget. Hits, misses and evictions are counted for observability.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: Optional[int] = None):
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be a positive integer, got: {max_entries}")
+        if ttl_seconds <= 0:
+            raise ValueError(f"ttl_seconds must be positive, got: {ttl_seconds}")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError(f"max_bytes must be a positive integer, got: {max_bytes}")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key``, or ``default`` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, size: int = 0) -> bool:
+        """
+        Store ``value`` under ``key``, evicting the least recently used entries if full.
+
+        Returns:
+            False if ``size`` alone exceeds the byte budget and nothing was stored
+        """
+        with self._lock:
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+            return True
+
+    def _remove(self, key: Hashable) -> Optional[tuple]:
+        """Drop ``key`` and its size from the cache; the caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+        return entry
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove ``key`` and return its value, or None if it was not cached."""
+        with self._lock:
+            entry = self._remove(key)
+        return entry[1] if entry else None
+
+    def clear(self) -> int:
+        """Remove every entry and return how many were removed."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        return count
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and hit/miss/eviction counters, plus byte usage when budgeted."""
+        with self._lock:
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+            if self.max_bytes is not None:
+                stats["bytes"] = self._bytes
+                stats["max_bytes"] = self.max_bytes
+            return stats
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Schema Catalog
+In-memory catalog of a database's tables and columns, built from one
+``.show database schema as json`` call and optionally persisted to disk.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+SCHEMA_QUERY = ".show database schema as json"
+# Cheap freshness probe; the version has the same "vMajor.Minor" form as SchemaCatalog.version
+SCHEMA_VERSION_QUERY = ".show database | project Version"
+# Bumped when the persisted layout changes so old files are ignored
+CATALOG_FILE_FORMAT = 1
+
+@dataclass
+class TableSchema:
+    """Name, folder, docstring and ordered (name, data type, KQL type) columns of one table."""
+    name: str
+    folder: str = ""
+    docstring: str = ""
+    columns: List[tuple] = field(default_factory=list)
+
+@dataclass
+class SchemaCatalog:
+    """
+    Tables and columns of one database.
+
+    Answers ``list_tables`` and ``get_table_schema`` in the same shape as
+    ``.show tables`` and ``getschema`` so callers cannot tell the difference.
+    """
+    database: str
+    version: str = ""
+    tables: Dict[str, TableSchema] = field(default_factory=dict)
+
+    @classmethod
+    def from_schema_json(cls, database: str, payload: Union[str, Dict[str, Any]]) -> "SchemaCatalog":
+        """
+        Build a catalog from the output of ``.show database schema as json``.
+
+        Raises:
+            ValueError: If the payload is not valid JSON or does not describe the database
+        """
+        if isinstance(payload, str):
+            try:
+                payload = json.loads(payload)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid database schema JSON: {e}") from e
+        if not isinstance(payload, dict) or not isinstance(payload.get("Databases"), dict):
+            raise ValueError("Invalid database schema JSON: missing 'Databases'")
+
+        databases = payload["Databases"]
+        schema = databases.get(database)
+        if schema is None:
+            # The current database may be reported under its pretty name
+            if len(databases) != 1:
+                raise ValueError(f"Database schema does not describe database '{database}'")
+            schema = next(iter(databases.values()))
+
+        tables = {}
+        for name, table in (schema.get("Tables") or {}).items():
+            columns = [
+                (column["Name"], column.get("Type", ""), column.get("CslType", ""))
+                for column in table.get("OrderedColumns") or []
+            ]
+            tables[name] = TableSchema(
+                name=name,
+                folder=table.get("Folder") or "",
+                docstring=table.get("DocString") or "",
+                columns=columns
+            )
+
+        version = ""
+        if "MajorVersion" in schema:
+            version = f"v{schema['MajorVersion']}.{schema.get('MinorVersion', 0)}"
+        return cls(database=database, version=version, tables=tables)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SchemaCatalog":
+        """Rebuild a catalog from the output of :meth:`to_dict`."""
+        tables = {
+            table["name"]: TableSchema(
+                name=table["name"],
+                folder=table.get("folder", ""),
+                docstring=table.get("docstring", ""),
+                columns=[(column["name"], column["data_type"], column["type"]) for column in table["columns"]]
+            )
+            for table in data["tables"]
+        }
+        return cls(database=data["database"], version=data.get("version", ""), tables=tables)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the catalog as plain JSON-serializable data."""
+        return {
+            "database": self.database,
+            "version": self.version,
+            "table_count": len(self.tables),
+            "tables": [
+                {
+                    "name": table.name,
+                    "folder": table.folder,
+                    "docstring": table.docstring,
+                    "columns": [
+                        {"name": name, "type": column_type, "data_type": data_type}
+                        for name, data_type, column_type in table.columns
+                    ],
+                }
+                for table in self.tables.values()
+            ],
+        }
+
+    def list_tables(self) -> List[Dict[str, Any]]:
+        """Return the tables in the shape of ``.show tables | project TableName, Folder, DatabaseName``."""
+        return [
+            {"TableName": table.name, "Folder": table.folder, "DatabaseName": self.database}
+            for table in self.tables.values()
+        ]
+
+    def table_schema(self, table_name: str) -> Optional[List[Dict[str, Any]]]:
+        """Return a table's columns in the shape of ``getschema``, or None if the table is unknown."""
+        table = self.tables.get(table_name)
+        if table is None:
+            return None
+        return [
+            {"ColumnName": name, "ColumnOrdinal": ordinal, "DataType": data_type, "ColumnType": column_type}
+            for ordinal, (name, data_type, column_type) in enumerate(table.columns)
+        ]
+
+def catalog_file_path(directory: str, cluster_url: str, database: str) -> str:
+    """Return the file a catalog for ``cluster_url``/``database`` is persisted to in ``directory``."""
+    digest = hashlib.sha256(f"{cluster_url.rstrip('/').lower()}|{database}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory, f"schema-{digest}.json")
+
+def save_catalog(path: str, cluster_url: str, catalog: SchemaCatalog) -> None:
+    """
+    Persist a catalog as JSON.
+
+    The file is written next to its destination and renamed into place, so a
+    reader never sees a partially written catalog.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    document = {"format": CATALOG_FILE_FORMAT, "cluster_url": cluster_url, "catalog": catalog.to_dict()}
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".schema-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(document, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def load_catalog(path: str, cluster_url: str, database: str) -> Optional[SchemaCatalog]:
+    """
+    Load a persisted catalog.
+
+    Returns:
+        The catalog, or None if no file exists
+
+    Raises:
+        ValueError: If the file is corrupt, from another format version, or
+            describes a different cluster or database
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid persisted schema catalog: {e}") from e
+
+    if not isinstance(document, dict) or document.get("format") != CATALOG_FILE_FORMAT or not isinstance(document.get("catalog"), dict):
+        raise ValueError("Persisted schema catalog has an unsupported format")
+    if document.get("cluster_url") != cluster_url or document["catalog"].get("database") != database:
+        raise ValueError("Persisted schema catalog belongs to a different cluster or database")
+    try:
+        return SchemaCatalog.from_dict(document["catalog"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid persisted schema catalog: {e}") from e
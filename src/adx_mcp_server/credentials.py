@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Token Refresh
+Credential wrapper that keeps Kusto access tokens fresh in the background,
+and the non-closing view of a shared credential each Kusto client is built on.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+from adx_mcp_server.tracing import span
+
+logger = structlog.get_logger()
+
+# A cached token this close to expiry is never handed out
+_EXPIRY_SAFETY_SECONDS = 30
+# Delay before retrying a failed background refresh
+_RETRY_SECONDS = 30
+# Minimum time between refreshes of one token, for tokens shorter-lived than the margin
+_MIN_REFRESH_INTERVAL_SECONDS = 60
+
+class SharedCredential:
+    """
+    The view of a shared credential that one Kusto client is built with.
+
+    ``KustoClient.close()`` closes the credential of its token provider. Every
+    pooled client uses the same credential, so closing one client through this
+    view leaves the credential open; its owner closes it directly.
+    """
+
+    def __init__(self, credential: Any):
+        self.credential = credential
+
+    def get_token(self, *scopes: str, **kwargs: Any):
+        return self.credential.get_token(*scopes, **kwargs)
+
+    def close(self) -> None:
+        """Do nothing; the credential is closed by its owner."""
+
+class RefreshingCredential:
+    """
+    A token credential that serves cached tokens and refreshes them ahead of expiry.
+
+    Tokens are cached per scope. A daemon thread re-acquires each token
+    ``refresh_margin_seconds`` before it expires, so callers on the query path
+    get a cached token instead of waiting on AAD or workload identity. Only when
+    no usable token exists (first use, or every background refresh failed)
+    does ``get_token`` acquire one inline.
+
+    Token age and acquisition latency are tracked for observability.
+    """
+
+    def __init__(self, credential: Any, refresh_margin_seconds: float):
+        if refresh_margin_seconds <= 0:
+            raise ValueError(f"refresh_margin_seconds must be positive, got: {refresh_margin_seconds}")
+        self.credential = credential
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._lock = threading.Lock()
+        self._acquire_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        # scopes -> (AccessToken, acquired at wall-clock time)
+        self._tokens: Dict[Tuple[str, ...], Tuple[Any, float]] = {}
+        self._retry_at: Dict[Tuple[str, ...], float] = {}
+        self._refreshes = 0
+        self._failures = 0
+        self._last_refresh_ms = 0.0
+        self._max_refresh_ms = 0.0
+
+    def get_token(self, *scopes: str, **kwargs: Any):
+        """Return a cached token for ``scopes``, acquiring one only if none is usable."""
+        if kwargs:
+            # Claims challenges and tenant overrides must reach the credential
+            return self.credential.get_token(*scopes, **kwargs)
+
+        token = self._usable_token(scopes)
+        if token is not None:
+            return token
+        with self._acquire_lock:
+            token = self._usable_token(scopes)
+            if token is not None:
+                return token
+            return self._acquire(scopes)
+
+    def prefetch(self, *scopes: str) -> None:
+        """Acquire a token for ``scopes`` now and keep it refreshed from then on."""
+        with self._acquire_lock:
+            self._acquire(scopes)
+
+    def _usable_token(self, scopes: Tuple[str, ...]):
+        with self._lock:
+            entry = self._tokens.get(scopes)
+        if entry is not None and entry[0].expires_on > time.time() + _EXPIRY_SAFETY_SECONDS:
+            return entry[0]
+        return None
+
+    def _acquire(self, scopes: Tuple[str, ...]):
+        """Acquire and cache a token, recording latency, and make sure the refresher runs."""
+        started = time.monotonic()
+        with span("azure.get_token", {"azure.scopes": " ".join(scopes)}):
+            token = self.credential.get_token(*scopes)
+        elapsed_ms = round((time.monotonic() - started) * 1000, 2)
+        with self._lock:
+            self._tokens[scopes] = (token, time.time())
+            self._retry_at.pop(scopes, None)
+            self._refreshes += 1
+            self._last_refresh_ms = elapsed_ms
+            self._max_refresh_ms = max(self._max_refresh_ms, elapsed_ms)
+            start_thread = self._thread is None and not self._closed
+            if start_thread:
+                self._thread = threading.Thread(target=self._refresh_loop, name="adx-token-refresh", daemon=True)
+        logger.debug("Access token acquired", duration_ms=elapsed_ms, expires_in_seconds=round(token.expires_on - time.time()))
+        if start_thread:
+            self._thread.start()
+        else:
+            self._wakeup.set()
+        return token
+
+    def _next_refresh(self) -> Tuple[Optional[Tuple[str, ...]], float]:
+        """Return the scopes due soonest and the wall-clock time they are due."""
+        with self._lock:
+            due = [
+                (
+                    self._retry_at.get(
+                        scopes,
+                        max(token.expires_on - self.refresh_margin_seconds, acquired + _MIN_REFRESH_INTERVAL_SECONDS)
+                    ),
+                    scopes
+                )
+                for scopes, (token, acquired) in self._tokens.items()
+            ]
+        if not due:
+            return None, time.time() + 3600
+        at, scopes = min(due)
+        return scopes, at
+
+    def _refresh_loop(self) -> None:
+        while not self._closed:
+            scopes, at = self._next_refresh()
+            wait = at - time.time()
+            if scopes is None or wait > 0:
+                self._wakeup.wait(timeout=max(wait, 0.05))
+                self._wakeup.clear()
+                continue
+            try:
+                with self._acquire_lock:
+                    if not self._closed:
+                        self._acquire(scopes)
+            except Exception as e:
+                with self._lock:
+                    self._failures += 1
+                    self._retry_at[scopes] = time.time() + _RETRY_SECONDS
+                logger.warning(
+                    "Background token refresh failed",
+                    error=str(e),
+                    exception_type=type(e).__name__,
+                    retry_in_seconds=_RETRY_SECONDS
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return token age, time to expiry and refresh latency counters."""
+        now = time.time()
+        with self._lock:
+            tokens = list(self._tokens.values())
+            return {
+                "tokens": len(tokens),
+                "token_age_seconds": round(max((now - acquired for _, acquired in tokens), default=0.0), 1),
+                "expires_in_seconds": round(min((token.expires_on - now for token, _ in tokens), default=0.0), 1),
+                "refreshes": self._refreshes,
+                "refresh_failures": self._failures,
+                "last_refresh_ms": self._last_refresh_ms,
+                "max_refresh_ms": self._max_refresh_ms,
+            }
+
+    def close(self) -> None:
+        """Stop background refresh and close the wrapped credential."""
+        self._closed = True
+        self._wakeup.set()
+        if hasattr(self.credential, "close"):
+            self.credential.close()
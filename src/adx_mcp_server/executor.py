@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Bounded Executor
+Runs blocking Kusto SDK calls off the event loop in a bounded thread pool.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+class BoundedExecutor:
+    """
+    A fixed-size thread pool for synchronous SDK calls made from async tools.
+
+    At most ``max_workers`` calls run at once; the rest wait in the pool's queue.
+    Queue depth, running calls and the time spent waiting for a worker are
+    tracked so that saturation is visible in logs and metrics; ``on_wait``,
+    if given, is called with each call's wait in seconds when it starts.
+    """
+
+    def __init__(self, name: str, max_workers: int, on_wait: Optional[Callable[[float], None]] = None):
+        if not isinstance(max_workers, int) or max_workers <= 0:
+            raise ValueError(f"max_workers must be a positive integer, got: {max_workers}")
+        self.name = name
+        self.max_workers = max_workers
+        self._on_wait = on_wait
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"adx-{name}")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._started = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on a worker thread and await its result."""
+        submitted = time.monotonic()
+        context = contextvars.copy_context()
+
+        def task():
+            wait = time.monotonic() - submitted
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._started += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+                queued = self._queued
+            if self._on_wait is not None:
+                self._on_wait(wait)
+            logger.debug(
+                "Executor task started",
+                executor=self.name,
+                queue_wait_ms=round(wait * 1000, 2),
+                queue_depth=queued
+            )
+            try:
+                return context.run(fn, *args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        with self._lock:
+            self._queued += 1
+        future = self._pool.submit(task)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A task cancelled before it started never decrements the queue itself
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of queue depth, concurrency and wait times."""
+        with self._lock:
+            started = self._started
+            return {
+                "executor": self.name,
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "avg_wait_ms": round(self._total_wait / started * 1000, 2) if started else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 2),
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting work and release the worker threads."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Export
+Writes query results to Parquet or Arrow IPC files column by column, in
+record batches built straight from the raw Kusto rows as they are read.
+"""
+
+import os
+import re
+import tempfile
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from adx_mcp_server.serialization import dumps
+
+# Rows per record batch (and Parquet row group chunk)
+DEFAULT_BATCH_ROWS = 65536
+
+class ExportFormat(str, Enum):
+    """Supported export file formats."""
+
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+    @classmethod
+    def values(cls) -> list[str]:
+        """Get all valid export format values."""
+        return [export_format.value for export_format in cls]
+
+FILE_EXTENSIONS = {ExportFormat.PARQUET.value: ".parquet", ExportFormat.ARROW.value: ".arrow"}
+
+def _load_pyarrow():
+    """Import pyarrow on first export; it is optional and slow to import."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:  # pragma: no cover - depends on the optional export extra
+        raise ImportError(
+            "export_query requires pyarrow. "
+            "Install it with: pip install 'adx_mcp_server[export]'"
+        ) from e
+    return pyarrow
+
+_TIMESPAN = re.compile(r"^(-)?(?:(\d+)\.)?(\d+):(\d+):(\d+)(?:\.(\d{1,7}))?$")
+
+def _timespan_nanoseconds(value: Optional[str]) -> Optional[int]:
+    """Parse a Kusto timespan (``[-][d.]hh:mm:ss[.fffffff]``) into nanoseconds."""
+    if value is None:
+        return None
+    match = _TIMESPAN.match(value)
+    if match is None:
+        raise ValueError(f"Invalid timespan value: '{value}'")
+    sign, days, hours, minutes, seconds, fraction = match.groups()
+    total = ((int(days or 0) * 24 + int(hours)) * 60 + int(minutes)) * 60 + int(seconds)
+    nanoseconds = total * 1_000_000_000 + int((fraction or "0").ljust(7, "0")) * 100
+    return -nanoseconds if sign else nanoseconds
+
+def _real(value: Any) -> Any:
+    # Kusto sends NaN and infinities as the strings "NaN", "Infinity" and "-Infinity"
+    return float(value) if isinstance(value, str) else value
+
+def _dynamic(value: Any) -> Optional[str]:
+    return value if value is None or isinstance(value, str) else dumps(value)
+
+def _column_builders(pa) -> Dict[str, Tuple[Any, Optional[Callable[[Any], Any]], Any]]:
+    """Map Kusto types to (Arrow type values are built as, per-value converter, Arrow type cast to)."""
+    timestamp = pa.timestamp("ns", tz="UTC")
+    return {
+        "bool": (pa.bool_(), None, None),
+        "int": (pa.int32(), None, None),
+        "long": (pa.int64(), None, None),
+        "real": (pa.float64(), _real, None),
+        # ISO 8601 strings with 100ns precision; Arrow's vectorized cast parses them
+        "datetime": (pa.string(), None, timestamp),
+        "timespan": (pa.duration("ns"), _timespan_nanoseconds, None),
+        "string": (pa.string(), None, None),
+        # Decimals (up to 34 digits) and GUIDs are kept as strings so no value is lost
+        "decimal": (pa.string(), None, None),
+        "guid": (pa.string(), None, None),
+        "dynamic": (pa.string(), _dynamic, None),
+    }
+
+class ExportWriter:
+    """
+    Writes raw Kusto rows to a Parquet or Arrow IPC file as they arrive.
+
+    Each record batch is built one column at a time from a slice of the raw
+    rows; no per-row dictionaries or typed SDK rows are created. The file is
+    written to a unique temporary file next to ``path`` and renamed onto it by
+    close(); abort() removes it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        export_format: str,
+        columns: Sequence[Tuple[str, str]],
+        batch_rows: int = DEFAULT_BATCH_ROWS
+    ):
+        pa = _load_pyarrow()
+        self._pa = pa
+        self.path = path
+        self.export_format = export_format
+        self.columns = list(columns)
+        self.row_count = 0
+        self._batch_rows = batch_rows
+        builders = _column_builders(pa)
+        self._plans = [builders.get(column_type, (pa.string(), _dynamic, None)) for _, column_type in columns]
+        self._schema = pa.schema([
+            (name, cast_type or build_type)
+            for (name, _), (build_type, _, cast_type) in zip(self.columns, self._plans)
+        ])
+        descriptor, self._temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(path) or None, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+        )
+        os.close(descriptor)
+        try:
+            if export_format == ExportFormat.PARQUET.value:
+                self._writer = pa.parquet.ParquetWriter(self._temporary_path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self._temporary_path, self._schema)
+        except BaseException:
+            os.remove(self._temporary_path)
+            raise
+
+    def write(self, raw_rows: Sequence[list]) -> None:
+        """Append rows, as record batches of at most ``batch_rows`` rows."""
+        pa = self._pa
+        for start in range(0, len(raw_rows), self._batch_rows):
+            batch = raw_rows[start:start + self._batch_rows]
+            arrays = []
+            for index, (build_type, converter, cast_type) in enumerate(self._plans):
+                if converter is None:
+                    values = [row[index] for row in batch]
+                else:
+                    values = [converter(row[index]) for row in batch]
+                array = pa.array(values, type=build_type)
+                arrays.append(array.cast(cast_type) if cast_type is not None else array)
+            self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+            self.row_count += len(batch)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish the file and move it to its destination.
+
+        Returns:
+            Dictionary with the path, format, row_count, bytes and the column schema
+        """
+        try:
+            self._writer.close()
+            os.replace(self._temporary_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        return {
+            "path": self.path,
+            "format": self.export_format,
+            "row_count": self.row_count,
+            "bytes": os.path.getsize(self.path),
+            "columns": [
+                {"name": name, "type": column_type, "arrow_type": str(field.type)}
+                for (name, column_type), field in zip(self.columns, self._schema)
+            ],
+        }
+
+    def abort(self) -> None:
+        """Discard the partially written file."""
+        try:
+            self._writer.close()
+        except Exception:
+            pass
+        if os.path.exists(self._temporary_path):
+            os.remove(self._temporary_path)
+
+def write_export(
+    path: str,
+    export_format: str,
+    columns: Sequence[Tuple[str, str]],
+    raw_rows: Sequence[list],
+    batch_rows: int = DEFAULT_BATCH_ROWS
+) -> Dict[str, Any]:
+    """
+    Write raw Kusto rows that are already in memory to a Parquet or Arrow IPC file.
+
+    Args:
+        path: Destination file path
+        export_format: "parquet" or "arrow"
+        columns: (name, Kusto type) per column
+        raw_rows: Row value lists as returned by Kusto
+        batch_rows: Rows per record batch
+
+    Returns:
+        Dictionary with the path, format, row_count, bytes and the column schema
+    """
+    writer = ExportWriter(path, export_format, columns, batch_rows)
+    try:
+        writer.write(raw_rows)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Log Sink
+Queue-backed structlog output written by a background thread, and a processor
+that samples and rate-limits high-volume events.
+"""
+
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, TextIO
+
+import structlog
+
+_STOP = object()
+# Lines written per flush by the background writer
+_BATCH_SIZE = 256
+
+class QueueWriter:
+    """
+    Writes log lines to a stream from a background thread.
+
+    ``write_line`` only enqueues, so logging never waits on stdout, stderr or
+    disk from the event loop. When the queue is full, lines are dropped and
+    counted rather than blocking the caller.
+    """
+
+    def __init__(self, stream: TextIO, max_queue: int = 10000, close_stream: bool = False):
+        if max_queue <= 0:
+            raise ValueError(f"max_queue must be a positive integer, got: {max_queue}")
+        self.stream = stream
+        self.close_stream = close_stream
+        self._queue: "queue.Queue[Any]" = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="adx-log-writer", daemon=True)
+        self._thread.start()
+
+    def write_line(self, line: str) -> None:
+        """Queue one line for writing; drops it if the queue is full or the writer is closed."""
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = []
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= _BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.stream.write("\n".join(batch) + "\n")
+                    self.stream.flush()
+                except (OSError, ValueError):
+                    # The stream was closed under us (e.g. interpreter shutdown); nothing left to report to
+                    pass
+                with self._lock:
+                    self.written += len(batch)
+            if item is _STOP:
+                return
+
+    def stats(self) -> Dict[str, int]:
+        """Return queued, written and dropped line counts."""
+        with self._lock:
+            return {"queued": self._queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write the lines already queued, stop the thread and close an owned stream."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if self.close_stream:
+            self.stream.close()
+
+class QueueLogger:
+    """A structlog logger that hands rendered lines to a QueueWriter."""
+
+    def __init__(self, writer: QueueWriter):
+        self._writer = writer
+
+    def msg(self, message: str) -> None:
+        self._writer.write_line(message)
+
+    log = debug = info = warn = warning = err = error = critical = exception = fatal = failure = msg
+
+class QueueLoggerFactory:
+    """structlog logger factory producing QueueLoggers that share one writer."""
+
+    def __init__(self, writer: QueueWriter):
+        self.writer = writer
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger(self.writer)
+
+class EventSampler:
+    """
+    structlog processor that samples and rate-limits selected events.
+
+    Only debug and info events whose name is in ``events`` are affected;
+    warnings and errors always pass. A kept event carries ``sample_rate`` when
+    sampling is on, and ``suppressed`` with the number of events of its name
+    dropped by the rate limit since the last one that was written.
+
+    Args:
+        events: Event names to sample, typically the per-call info logs
+        sample_rate: Fraction of those events to keep (1.0 keeps all)
+        rate_limit: Maximum events per second per event name (0 = unlimited)
+    """
+
+    def __init__(self, events: Iterable[str], sample_rate: float = 1.0, rate_limit: float = 0.0):
+        if not 0 < sample_rate <= 1:
+            raise ValueError(f"sample_rate must be greater than 0 and at most 1, got: {sample_rate}")
+        if rate_limit < 0:
+            raise ValueError(f"rate_limit must not be negative, got: {rate_limit}")
+        self.events = frozenset(events)
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        # At least one event can always be written after a quiet period
+        self._capacity = max(rate_limit, 1.0)
+        self._lock = threading.Lock()
+        # event name -> [tokens, last refill time, suppressed count]
+        self._buckets: Dict[str, list] = {}
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        event = event_dict.get("event")
+        if method_name not in ("debug", "info") or event not in self.events:
+            return event_dict
+        if self.sample_rate < 1:
+            if random.random() >= self.sample_rate:
+                raise structlog.DropEvent
+            event_dict["sample_rate"] = self.sample_rate
+        if self.rate_limit > 0:
+            now = time.monotonic()
+            with self._lock:
+                bucket = self._buckets.get(event)
+                if bucket is None:
+                    bucket = self._buckets[event] = [self._capacity, now, 0]
+                bucket[0] = min(self._capacity, bucket[0] + (now - bucket[1]) * self.rate_limit)
+                bucket[1] = now
+                if bucket[0] < 1:
+                    bucket[2] += 1
+                    raise structlog.DropEvent
+                bucket[0] -= 1
+                suppressed, bucket[2] = bucket[2], 0
+            if suppressed:
+                event_dict["suppressed"] = suppressed
+        return event_dict
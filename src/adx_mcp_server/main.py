@@ -9,22 +9,50 @@ import os
 import dotenv
 import structlog
 
-from adx_mcp_server.server import mcp, config, TransportType
+from adx_mcp_server.server import (
+    mcp,
+    config,
+    configure_logging,
+    load_config,
+    TransportType,
+    ClientBackend,
+    admission_control_configured,
+    enable_admission_control,
+    enable_metrics,
+    enable_sighup_cache_reload,
+    enable_tool_deadline,
+    enable_tracing,
+    close_kusto_clients,
+    shutdown_query_executor,
+    shutdown_logging,
+)
+from adx_mcp_server.preflight import PreflightAction
+from adx_mcp_server.tracing import shutdown_tracing
 
 logger = structlog.get_logger()
 
-def setup_environment() -> bool:
+def load_environment() -> None:
     """
-    Setup and validate the environment configuration.
+    Load ``.env``, configure logging and build the server configuration.
 
-    Returns:
-        bool: True if configuration is valid, False otherwise
+    Runs once at startup, so ``.env`` is read a single time and its values
+    (including LOG_LEVEL and LOG_FORMAT) apply to logging and configuration.
     """
-    if dotenv.load_dotenv():
+    env_file_loaded = dotenv.load_dotenv()
+    configure_logging()
+    if env_file_loaded:
         logger.info("Loaded environment variables from .env file")
     else:
         logger.info("No .env file found, using system environment variables")
+    load_config()
 
+def setup_environment() -> bool:
+    """
+    Validate the environment configuration.
+
+    Returns:
+        bool: True if configuration is valid, False otherwise
+    """
     # Validate required configuration
     if not config.cluster_url:
         logger.error(
@@ -63,12 +91,139 @@ def setup_environment() -> bool:
             )
             return False
 
+    if config.client_backend not in ClientBackend.values():
+        logger.error(
+            "Invalid client backend",
+            variable="ADX_CLIENT_BACKEND",
+            backend=config.client_backend,
+            valid_backends=ClientBackend.values()
+        )
+        return False
+
+    if config.preflight_action not in PreflightAction.values() or config.preflight_limit_rows <= 0:
+        logger.error(
+            "Invalid preflight configuration",
+            action=config.preflight_action,
+            valid_actions=PreflightAction.values(),
+            limit_rows=config.preflight_limit_rows
+        )
+        return False
+
+    if config.result_store_max_entries <= 0 or config.result_store_ttl_seconds <= 0:
+        logger.error(
+            "Invalid result store configuration",
+            max_entries=config.result_store_max_entries,
+            ttl_seconds=config.result_store_ttl_seconds
+        )
+        return False
+
+    for variable, value in (
+        ("ADX_MAX_ROWS", config.max_rows),
+        ("ADX_MAX_BYTES", config.max_bytes),
+        ("ADX_SERVER_TIMEOUT_SECONDS", config.server_timeout_seconds),
+        ("ADX_TOOL_TIMEOUT_SECONDS", config.tool_timeout_seconds),
+        ("ADX_PREFLIGHT_MAX_SCAN_BYTES", config.preflight_max_scan_bytes),
+    ):
+        if value is not None and value <= 0:
+            logger.error("Invalid query limit", variable=variable, value=value)
+            return False
+
+    if config.metadata_cache_ttl_seconds < 0 or config.metadata_cache_max_entries <= 0:
+        logger.error(
+            "Invalid metadata cache configuration",
+            ttl_seconds=config.metadata_cache_ttl_seconds,
+            max_entries=config.metadata_cache_max_entries
+        )
+        return False
+
+    if config.query_cache_ttl_seconds < 0 or config.query_cache_max_entries <= 0 or config.query_cache_max_bytes <= 0:
+        logger.error(
+            "Invalid query cache configuration",
+            ttl_seconds=config.query_cache_ttl_seconds,
+            max_entries=config.query_cache_max_entries,
+            max_bytes=config.query_cache_max_bytes
+        )
+        return False
+
+    for variable, value in (
+        ("ADX_MAX_CONCURRENT_QUERIES", config.max_concurrent_queries),
+        ("ADX_METADATA_CONCURRENT_QUERIES", config.metadata_concurrent_queries),
+    ):
+        if value <= 0:
+            logger.error("Invalid query concurrency", variable=variable, value=value)
+            return False
+
+    for cluster_url in config.allowed_clusters:
+        if not cluster_url.startswith(("https://", "http://")):
+            logger.error(
+                "Invalid allowed cluster",
+                variable="ADX_ALLOWED_CLUSTERS",
+                value=cluster_url,
+                example="https://youradxcluster.region.kusto.windows.net"
+            )
+            return False
+
+    if config.batch_max_queries <= 0 or config.batch_max_parallelism <= 0:
+        logger.error(
+            "Invalid batch configuration",
+            max_queries=config.batch_max_queries,
+            max_parallelism=config.batch_max_parallelism
+        )
+        return False
+
+    if config.client_idle_seconds < 0:
+        logger.error(
+            "Invalid client idle timeout",
+            variable="ADX_CLIENT_IDLE_SECONDS",
+            value=config.client_idle_seconds
+        )
+        return False
+
+    if config.token_refresh_margin_seconds < 0:
+        logger.error(
+            "Invalid token refresh margin",
+            variable="ADX_TOKEN_REFRESH_MARGIN_SECONDS",
+            value=config.token_refresh_margin_seconds
+        )
+        return False
+
+    if (
+        config.admission_max_in_flight < 0 or config.admission_max_queue < 0
+        or config.admission_queue_timeout_seconds <= 0 or config.client_max_in_flight < 0
+        or config.client_rate_per_second < 0 or config.client_burst <= 0
+    ):
+        logger.error(
+            "Invalid admission control configuration",
+            max_in_flight=config.admission_max_in_flight,
+            max_queue=config.admission_max_queue,
+            queue_timeout_seconds=config.admission_queue_timeout_seconds,
+            client_max_in_flight=config.client_max_in_flight,
+            client_rate_per_second=config.client_rate_per_second,
+            client_burst=config.client_burst
+        )
+        return False
+
+    if config.metrics_path and not config.metrics_path.startswith("/"):
+        logger.error(
+            "Invalid metrics path",
+            variable="ADX_METRICS_PATH",
+            value=config.metrics_path,
+            example="/metrics"
+        )
+        return False
+
     # Log configuration summary
     logger.info(
         "Azure Data Explorer configuration loaded",
         cluster_url=config.cluster_url,
         database=config.database
     )
+    if config.allowed_clusters or config.allowed_databases:
+        logger.info(
+            "Additional query targets allowed",
+            clusters=config.allowed_clusters,
+            databases=config.allowed_databases
+        )
 
     # Check for Azure workload identity credentials
     tenant_id = os.environ.get('AZURE_TENANT_ID')
@@ -88,28 +243,55 @@ def setup_environment() -> bool:
 
 def run_server():
     """Main entry point for the Azure Data Explorer MCP Server."""
+    load_environment()
     logger.info("Starting Azure Data Explorer MCP Server")
 
-    # Setup and validate environment
+    # Validate environment
     if not setup_environment():
         logger.error("Environment setup failed, exiting")
         sys.exit(1)
 
+    enable_sighup_cache_reload()
+
+    if config.tracing_enabled:
+        enable_tracing()
+    if config.tool_timeout_seconds is not None:
+        enable_tool_deadline(config.tool_timeout_seconds)
+
     mcp_config = config.mcp_server_config
     transport = mcp_config.mcp_server_transport
 
     http_transports = [TransportType.HTTP.value, TransportType.SSE.value]
-    if transport in http_transports:
-        logger.info(
-            "Starting server with network transport",
-            transport=transport,
-            host=mcp_config.mcp_bind_host,
-            port=mcp_config.mcp_bind_port
-        )
-        mcp.run(transport=transport, host=mcp_config.mcp_bind_host, port=mcp_config.mcp_bind_port)
-    else:
-        logger.info("Starting server with stdio transport", transport=transport)
-        mcp.run(transport=transport)
+    try:
+        if transport in http_transports:
+            if config.metrics_path:
+                enable_metrics(config.metrics_path)
+                logger.info("Metrics endpoint enabled", path=config.metrics_path)
+            if admission_control_configured():
+                enable_admission_control()
+                logger.info(
+                    "Admission control enabled",
+                    max_in_flight=config.admission_max_in_flight,
+                    max_queue=config.admission_max_queue,
+                    client_max_in_flight=config.client_max_in_flight,
+                    client_rate_per_second=config.client_rate_per_second
+                )
+            logger.info(
+                "Starting server with network transport",
+                transport=transport,
+                host=mcp_config.mcp_bind_host,
+                port=mcp_config.mcp_bind_port
+            )
+            mcp.run(transport=transport, host=mcp_config.mcp_bind_host, port=mcp_config.mcp_bind_port)
+        else:
+            logger.info("Starting server with stdio transport", transport=transport)
+            mcp.run(transport=transport)
+    finally:
+        shutdown_query_executor()
+        close_kusto_clients()
+        shutdown_tracing()
+        logger.info("Azure Data Explorer MCP Server stopped")
+        shutdown_logging()
 
 if __name__ == "__main__":
     run_server()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Query Preflight
+Estimates the extents, bytes and rows a query would scan from the tables it
+references, its time filter and the extent statistics of ``.show tables
+details``, before the query is sent to the cluster.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Dict, List, Mapping, Optional
+
+TABLE_STATS_QUERY = (
+    ".show tables details"
+    " | project TableName, TotalExtents, TotalExtentSize, TotalRowCount, MinExtentsCreationTime, MaxExtentsCreationTime"
+)
+
+class PreflightAction(str, Enum):
+    """What happens to a query estimated to scan more than the budget."""
+    REJECT = "reject"
+    LIMIT = "limit"
+
+    @classmethod
+    def values(cls) -> list[str]:
+        """Get all action values."""
+        return [action.value for action in cls]
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """Parse a Kusto datetime (ISO 8601, any fraction length) as UTC. Returns None if it cannot be parsed."""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value or "").strip().strip("'\"")
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+_TIMESPAN_UNITS = {
+    "d": 86400, "day": 86400, "days": 86400,
+    "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+    "m": 60, "min": 60, "minute": 60, "minutes": 60,
+    "s": 1, "sec": 1, "second": 1, "seconds": 1,
+    "ms": 0.001, "milli": 0.001, "millis": 0.001, "millisecond": 0.001, "milliseconds": 0.001,
+}
+_TIMESPAN_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)\s*([a-z]+)$")
+
+def parse_timespan(text: str) -> Optional[timedelta]:
+    """Parse a KQL timespan literal such as ``7d``, ``1.5h`` or ``30min``. Returns None for other forms."""
+    match = _TIMESPAN_PATTERN.match(text.strip().lower())
+    if match is None or match.group(2) not in _TIMESPAN_UNITS:
+        return None
+    return timedelta(seconds=float(match.group(1)) * _TIMESPAN_UNITS[match.group(2)])
+
+@dataclass(frozen=True)
+class TableStats:
+    """Extent statistics of one table, from a row of ``.show tables details``."""
+    name: str
+    extents: int
+    bytes: int
+    rows: int
+    min_created: Optional[datetime] = None
+    max_created: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "TableStats":
+        return cls(
+            name=row["TableName"],
+            extents=int(row.get("TotalExtents") or 0),
+            bytes=int(row.get("TotalExtentSize") or 0),
+            rows=int(row.get("TotalRowCount") or 0),
+            min_created=parse_datetime(row.get("MinExtentsCreationTime")),
+            max_created=parse_datetime(row.get("MaxExtentsCreationTime")),
+        )
+
+    def fraction_since(self, since: Optional[datetime]) -> float:
+        """
+        Estimate the share of the table's data created at or after ``since``.
+
+        Data is assumed to be spread evenly between the oldest and newest
+        extent; without a time bound or creation times the whole table counts.
+        """
+        if since is None or self.min_created is None or self.max_created is None or since <= self.min_created:
+            return 1.0
+        if since > self.max_created:
+            return 0.0
+        span = (self.max_created - self.min_created).total_seconds()
+        return (self.max_created - since).total_seconds() / span if span else 1.0
+
+@dataclass(frozen=True)
+class TableEstimate:
+    table: str
+    fraction: float
+    extents: int
+    bytes: int
+    rows: int
+    since: Optional[datetime] = None
+
+@dataclass(frozen=True)
+class CostEstimate:
+    """Estimated scan of a query, per table and in total."""
+    tables: List[TableEstimate]
+
+    @property
+    def extents(self) -> int:
+        return sum(table.extents for table in self.tables)
+
+    @property
+    def bytes(self) -> int:
+        return sum(table.bytes for table in self.tables)
+
+    @property
+    def rows(self) -> int:
+        return sum(table.rows for table in self.tables)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the estimate as plain JSON-serializable data."""
+        return {
+            "estimated_extents": self.extents,
+            "estimated_bytes": self.bytes,
+            "estimated_rows": self.rows,
+            "tables": [
+                {
+                    "table": table.table,
+                    "time_filter_start": table.since.isoformat() if table.since else None,
+                    "fraction": round(table.fraction, 4),
+                    "extents": table.extents,
+                    "bytes": table.bytes,
+                    "rows": table.rows,
+                }
+                for table in self.tables
+            ],
+        }
+
+# String literals and comments; their contents are never table references
+_LITERAL_PATTERN = re.compile(r"""```.*?```|@'[^']*'|@"[^"]*"|'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*"|//[^\n]*""", re.DOTALL)
+_BRACKETED_NAME_PATTERN = re.compile(r"""\[\s*(?:'([^']+)'|"([^"]+)")\s*\]""")
+_TABLE_FUNCTION_PATTERN = re.compile(r"""\btable\(\s*(?:'([^']+)'|"([^"]+)")\s*\)""")
+_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# What may precede a table that starts a pipeline: nothing, "(", ";" or "let name ="
+_SOURCE_PREFIX_PATTERN = re.compile(r"(?:\A|[(;]|\blet\s+[A-Za-z_][A-Za-z0-9_]*\s*=)\s*\Z")
+_SOURCE_PATTERN = re.compile(r"""([A-Za-z_][A-Za-z0-9_]*)|\[\s*(?:'([^']+)'|"([^"]+)")\s*\]|table\(\s*(?:'([^']+)'|"([^"]+)")\s*\)""")
+_OPERATOR_PATTERN = re.compile(r"\s*([a-z][a-z-]*)")
+_CONNECTIVE_PATTERN = re.compile(r"[()\[\]{}]|\b(?:and|or)\b")
+_COLUMN = r"""(?:[A-Za-z_][A-Za-z0-9_.]*|\[\s*(?:'[^']*'|"[^"]*")\s*\])"""
+_BOUND = r"""(?:ago\(\s*([^()]*?)\s*\)|now\(\s*-\s*([^()]*?)\s*\)|datetime\(\s*([^()]*?)\s*\))"""
+# Only lower bounds narrow the scan: "Column > bound", "Column >= bound" and "Column between (bound .. ...)"
+_LOWER_BOUND_PATTERN = re.compile(
+    rf"{_COLUMN}\s*(?:>=?\s*{_BOUND}|between\s*\(\s*{_BOUND}\s*\.\.[^()]*(?:\([^()]*\)[^()]*)*\))", re.DOTALL
+)
+_FILTER_OPERATORS = frozenset({"where", "filter"})
+# Operators a time filter still narrows the scan through; anything else
+# (summarize, join, union, ...) ends the part of a pipeline that is trusted
+_ROW_PRESERVING_OPERATORS = _FILTER_OPERATORS | {
+    "extend", "project", "project-away", "project-keep", "project-rename", "project-reorder",
+}
+# Operators a trailing take still stops the scan through
+_STREAMING_OPERATORS = _ROW_PRESERVING_OPERATORS | {"parse", "take", "limit"}
+
+def _blank(match: re.Match, keep_literals: bool) -> str:
+    text = match.group(0)
+    if text.startswith("//"):
+        return " " * len(text)
+    return text if keep_literals else "~" * len(text)
+
+def _masks(query: str) -> tuple[str, str]:
+    """
+    Return the query with comments blanked, and with comments and string literals blanked.
+
+    Both keep every other character at its position, so offsets found in the
+    fully masked text can be used to read the literals back.
+    """
+    text = _LITERAL_PATTERN.sub(lambda match: _blank(match, True), query)
+    masked = _LITERAL_PATTERN.sub(lambda match: _blank(match, False), query)
+    return text, masked
+
+def _pipeline(masked: str, start: int) -> tuple[int, List[tuple[int, int]]]:
+    """
+    Split the pipeline that continues at ``start`` into operators.
+
+    The pipeline ends at a ";" or "," or at the bracket closing the expression
+    it is nested in. Returns where the text before its first "|" ends and the
+    (start, end) span of each operator after a "|".
+    """
+    depth = 0
+    head_end = None
+    segment_start = None
+    segments = []
+    end = len(masked)
+    for position in range(start, len(masked)):
+        char = masked[position]
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            if depth == 0:
+                end = position
+                break
+            depth -= 1
+        elif depth == 0 and char in ";,":
+            end = position
+            break
+        elif depth == 0 and char == "|":
+            if segment_start is None:
+                head_end = position
+            else:
+                segments.append((segment_start, position))
+            segment_start = position + 1
+    if segment_start is not None:
+        segments.append((segment_start, end))
+    return end if head_end is None else head_end, segments
+
+def _operator(masked: str, segment: tuple[int, int]) -> Optional[re.Match]:
+    return _OPERATOR_PATTERN.match(masked, *segment)
+
+def _table_references(text: str, masked: str, table_names: Mapping[str, Any]) -> List[tuple[str, int, int]]:
+    """Return the name, start and end of every reference to a table of ``table_names``, in order."""
+    references = [
+        (match.group(0), match.start(), match.end())
+        for match in _IDENTIFIER_PATTERN.finditer(masked) if match.group(0) in table_names
+    ]
+    for pattern in (_BRACKETED_NAME_PATTERN, _TABLE_FUNCTION_PATTERN):
+        for match in pattern.finditer(text):
+            name = match.group(1) or match.group(2)
+            # A match starting inside a literal is masked; one outside it is not
+            if name in table_names and masked[match.start()] == text[match.start()]:
+                references.append((name, match.start(), match.end()))
+    return sorted(references, key=lambda reference: reference[1])
+
+def referenced_tables(query: str, table_names: Mapping[str, Any]) -> List[str]:
+    """
+    Return the tables of ``table_names`` a query mentions, in order of first mention.
+
+    Any identifier outside string literals and comments that names a table
+    counts, so a column sharing a table's name over- rather than
+    under-estimates the scan.
+    """
+    text, masked = _masks(query)
+    return list(dict.fromkeys(name for name, _, _ in _table_references(text, masked, table_names)))
+
+def _lower_bound(conjunct: str, now: datetime) -> Optional[datetime]:
+    match = _LOWER_BOUND_PATTERN.fullmatch(conjunct.strip())
+    if match is None:
+        return None
+    ago, now_offset, literal, between_ago, between_now_offset, between_literal = match.groups()
+    offset = ago or now_offset or between_ago or between_now_offset
+    if offset is not None:
+        span = parse_timespan(offset)
+        return now - span if span is not None else None
+    return parse_datetime(literal or between_literal)
+
+def _conjuncts(masked: str, start: int, end: int) -> List[tuple[int, int]]:
+    """
+    Split a predicate into its top-level ``and`` terms.
+
+    A top-level ``or`` means no term has to hold, so none is returned.
+    """
+    depth = 0
+    piece_start = start
+    pieces = []
+    for match in _CONNECTIVE_PATTERN.finditer(masked, start, end):
+        token = match.group(0)
+        if token in ("(", "[", "{"):
+            depth += 1
+        elif token in (")", "]", "}"):
+            depth -= 1
+        elif depth == 0:
+            if token == "or":
+                return []
+            pieces.append((piece_start, match.start()))
+            piece_start = match.end()
+    pieces.append((piece_start, end))
+    return pieces
+
+def _pipeline_time_filter_start(text: str, masked: str, start: int, end: int, now: datetime) -> Optional[datetime]:
+    """
+    Find the lower time bound that holds for a table reference spanning ``start`` to ``end``.
+
+    Only a bound that is a top-level ``and`` term of a where clause of the
+    table's own pipeline counts, and only before the first operator that
+    aggregates or combines rows.
+    """
+    if not _SOURCE_PREFIX_PATTERN.search(masked, 0, start):
+        return None
+    head_end, segments = _pipeline(masked, end)
+    if masked[end:head_end].strip():
+        return None
+    bounds = []
+    for segment in segments:
+        operator = _operator(masked, segment)
+        if operator is None or operator.group(1) not in _ROW_PRESERVING_OPERATORS:
+            break
+        if operator.group(1) in _FILTER_OPERATORS:
+            for conjunct_start, conjunct_end in _conjuncts(masked, operator.end(1), segment[1]):
+                bound = _lower_bound(text[conjunct_start:conjunct_end], now)
+                if bound is not None:
+                    bounds.append(bound)
+    # Successive terms and where clauses all have to hold, so the latest bound does
+    return max(bounds) if bounds else None
+
+def time_filter_starts(query: str, table_names: Mapping[str, Any], now: datetime) -> Dict[str, Optional[datetime]]:
+    """
+    Find the lower time bound of each table of ``table_names`` the query references.
+
+    Recognizes ``Column > ago(7d)``, ``>= now(-1h)``, ``> datetime(2024-01-01)``
+    and ``between (ago(7d) .. ...)`` as a top-level ``and`` term of a where
+    clause directly in the table's pipeline. A table is bounded only if every
+    reference to it is, by the earliest of their bounds; None means the whole
+    table is assumed to be scanned.
+    """
+    text, masked = _masks(query)
+    starts: Dict[str, Optional[datetime]] = {}
+    for name, start, end in _table_references(text, masked, table_names):
+        since = _pipeline_time_filter_start(text, masked, start, end, now)
+        if name not in starts:
+            starts[name] = since
+        elif starts[name] is not None:
+            starts[name] = None if since is None else min(starts[name], since)
+    return starts
+
+def estimate_query_cost(query: str, stats: Mapping[str, TableStats], now: datetime) -> Optional[CostEstimate]:
+    """
+    Estimate what a query would scan from table statistics.
+
+    Each referenced table is scaled by its own time filter. Returns None when
+    the query references no table with known statistics.
+    """
+    starts = time_filter_starts(query, stats, now)
+    if not starts:
+        return None
+    estimates = []
+    for name, since in starts.items():
+        table = stats[name]
+        fraction = table.fraction_since(since)
+        estimates.append(TableEstimate(
+            table=name,
+            fraction=fraction,
+            extents=math.ceil(table.extents * fraction),
+            bytes=round(table.bytes * fraction),
+            rows=round(table.rows * fraction),
+            since=since,
+        ))
+    return CostEstimate(tables=estimates)
+
+def limit_query(query: str, max_rows: int, table_names: Mapping[str, Any]) -> Optional[str]:
+    """
+    Add a ``take`` to the query's last statement so the cluster stops after ``max_rows`` rows.
+
+    The take goes before a trailing ``render``. Returns None when a take would
+    not stop the scan early: when the last statement does not read a table of
+    ``table_names`` directly, or aggregates, sorts or joins before its end.
+    """
+    query = query.rstrip()
+    while query.endswith(";"):
+        query = query[:-1].rstrip()
+    text, masked = _masks(query)
+    depth = 0
+    statement_start = 0
+    for position, char in enumerate(masked):
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif char == ";" and depth == 0:
+            statement_start = position + 1
+    head_end, segments = _pipeline(masked, statement_start)
+    source = _SOURCE_PATTERN.fullmatch(text[statement_start:head_end].strip())
+    if source is None or next(name for name in source.groups() if name) not in table_names:
+        return None
+    operators = [_operator(masked, segment) for segment in segments]
+    insert_at = len(query)
+    if operators and operators[-1] is not None and operators[-1].group(1) == "render":
+        # Position of the "|" before render
+        insert_at = segments[-1][0] - 1
+        operators.pop()
+    if any(operator is None or operator.group(1) not in _STREAMING_OPERATORS for operator in operators):
+        return None
+    rest = query[insert_at:]
+    return f"{query[:insert_at].rstrip()}\n| take {max_rows}" + (f"\n{rest}" if rest else "")
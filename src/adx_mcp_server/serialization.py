@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Serialization
+JSON encoding of tool results, with per-column converters chosen from the
+Kusto column types and orjson as the encoder when installed.
+"""
+
+import json
+import math
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, List, Sequence, Tuple
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the optional fast-json extra
+    orjson = None
+
+Converter = Callable[[Any], Any]
+
+def _format_datetime(value: datetime) -> str:
+    """Render a datetime as ISO 8601, with ``Z`` for UTC as Kusto does."""
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+def _format_timespan(value: timedelta) -> str:
+    """Render a timedelta the way Kusto writes timespans: ``[-][d.]hh:mm:ss[.fffffff]``."""
+    sign = "-" if value < timedelta(0) else ""
+    value = abs(value)
+    minutes, seconds = divmod(value.seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    text = f"{sign}{value.days}.{hours:02}:{minutes:02}:{seconds:02}" if value.days else f"{sign}{hours:02}:{minutes:02}:{seconds:02}"
+    # Kusto timespans have 100ns ticks; Python keeps microseconds
+    return f"{text}.{value.microseconds:06}0" if value.microseconds else text
+
+# NaN and infinity are not valid JSON; use the spelling Kusto itself returns them in
+_NON_FINITE = {"nan": "NaN", "inf": "Infinity", "-inf": "-Infinity"}
+
+def _format_real(value: Any) -> Any:
+    if value is None or isinstance(value, str) or math.isfinite(value):
+        return value
+    return _NON_FINITE[repr(value)]
+
+# Kusto column types whose wire values are not always valid JSON. The wire
+# form of every other type is kept as is: datetime, timespan, decimal and guid
+# values arrive as strings in Kusto's own notation (with 100ns precision), and
+# string, bool, int, long and dynamic values are plain JSON.
+_CONVERTERS = {
+    "real": _format_real,
+}
+
+def column_converters(column_types: Sequence[str]) -> List[Tuple[int, Converter]]:
+    """
+    Pick a converter for each column of raw Kusto rows from its type.
+
+    Returns ``(column index, converter)`` pairs for the columns that need one,
+    so formatting a row costs one call per converted value and no per-value
+    type checks; for most results the list is empty.
+    """
+    return [
+        (index, _CONVERTERS[column_type])
+        for index, column_type in enumerate(column_types)
+        if column_type in _CONVERTERS
+    ]
+
+def _default(value: Any) -> Any:
+    """Encode values outside the JSON types, for payloads that were not built with column converters."""
+    if isinstance(value, datetime):
+        return _format_datetime(value)
+    if isinstance(value, timedelta):
+        return _format_timespan(value)
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(value: Any) -> str:
+        """Encode ``value`` as compact JSON text."""
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS).decode()
+else:
+    _ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_default)
+
+    def dumps(value: Any) -> str:
+        """Encode ``value`` as compact JSON text."""
+        return _ENCODER.encode(value)
+
+def json_backend() -> str:
+    """Return the name of the JSON encoder in use."""
+    return "orjson" if orjson is not None else "json"
@@ -4,37 +4,223 @@ Azure Data Explorer MCP Server
 Main server implementation with KQL query execution and database exploration tools.
 """
 
+import asyncio
+import atexit
+import base64
+import binascii
+import contextvars
+import csv
+import hashlib
+import importlib
+import io
+import json
+import logging
 import os
 import re
+import secrets
+import signal
 import sys
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta, timezone
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+from dataclasses import dataclass, field, fields
 from enum import Enum
 
-import dotenv
 import structlog
-from fastmcp import FastMCP
-from azure.identity import DefaultAzureCredential, WorkloadIdentityCredential
-from azure.kusto.data import KustoClient, KustoConnectionStringBuilder
-
-# Configure structured logging
-structlog.configure(
-    processors=[
-        structlog.contextvars.merge_contextvars,
-        structlog.processors.add_log_level,
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.dev.ConsoleRenderer() if os.getenv("LOG_FORMAT", "json") != "json" else structlog.processors.JSONRenderer()
-    ],
-    wrapper_class=structlog.make_filtering_bound_logger(int(os.getenv("LOG_LEVEL", "20"))),  # 20 = INFO
-    context_class=dict,
-    logger_factory=structlog.PrintLoggerFactory(),
-    cache_logger_on_first_use=True,
-)
+from fastmcp import Context, FastMCP
+from fastmcp.exceptions import ToolError
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import Middleware
+from fastmcp.tools import FunctionTool, ToolResult
+from mcp.types import TextContent
+from starlette.responses import Response
+
+from adx_mcp_server.admission import AdmissionController, AdmissionRejected
+from adx_mcp_server.cache import TTLCache
+from adx_mcp_server.catalog import SCHEMA_QUERY, SCHEMA_VERSION_QUERY, SchemaCatalog, catalog_file_path, load_catalog, save_catalog
+from adx_mcp_server.credentials import RefreshingCredential, SharedCredential
+from adx_mcp_server.executor import BoundedExecutor
+from adx_mcp_server.export import DEFAULT_BATCH_ROWS, FILE_EXTENSIONS, ExportFormat, ExportWriter
+from adx_mcp_server.logsink import EventSampler, QueueLoggerFactory, QueueWriter
+from adx_mcp_server.metrics import CONTENT_TYPE, DEFAULT_SIZE_BUCKETS, MetricsRegistry
+from adx_mcp_server.preflight import TABLE_STATS_QUERY, CostEstimate, PreflightAction, TableStats, estimate_query_cost, limit_query
+from adx_mcp_server.serialization import column_converters, dumps
+from adx_mcp_server.singleflight import SingleFlight
+from adx_mcp_server.tracing import configure_tracing, span, tracing_enabled
+
+if TYPE_CHECKING:
+    from azure.kusto.data import ClientRequestProperties, KustoClient
+
+# Azure SDK names imported on first use. Importing azure-identity and
+# azure-kusto-data takes longer than the rest of the server, and neither is
+# needed until the first query or token prefetch.
+_AZURE_SDK_NAMES = {
+    "ClientAuthenticationError": "azure.core.exceptions",
+    "DefaultAzureCredential": "azure.identity",
+    "WorkloadIdentityCredential": "azure.identity",
+    "ClientRequestProperties": "azure.kusto.data",
+    "KustoClient": "azure.kusto.data",
+    "KustoConnectionStringBuilder": "azure.kusto.data",
+    "CloudSettings": "azure.kusto.data._cloud_settings",
+    "KustoAuthenticationError": "azure.kusto.data.exceptions",
+    "KustoServiceError": "azure.kusto.data.exceptions",
+}
+
+def _load_azure_sdk() -> None:
+    """Bind the Azure SDK names used by this module, importing them on first call."""
+    module_globals = globals()
+    for name, module in _AZURE_SDK_NAMES.items():
+        # Names already bound (including ones patched in tests) are kept
+        if name not in module_globals:
+            module_globals[name] = getattr(importlib.import_module(module), name)
+
+def __getattr__(name: str) -> Any:
+    if name in _AZURE_SDK_NAMES:
+        _load_azure_sdk()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 logger = structlog.get_logger()
 
-dotenv.load_dotenv()
-mcp = FastMCP("Azure Data Explorer MCP")
+# Info events written on every tool call; subject to LOG_SAMPLE_RATE and LOG_RATE_LIMIT
+PER_CALL_LOG_EVENTS = frozenset({
+    "Executing KQL query",
+    "Query executed successfully",
+    "Executing query batch",
+    "Query batch executed",
+    "Result page fetched",
+    "Exporting KQL query",
+    "Query exported",
+    "Executing streaming query",
+    "Streaming query completed",
+    "Listing tables",
+    "Tables listed successfully",
+    "Getting table schema",
+    "Schema retrieved successfully",
+    "Sampling table data",
+    "Sample data retrieved successfully",
+    "Getting table details",
+    "Table details retrieved successfully",
+    "Getting database schema",
+    "Database schema retrieved successfully",
+})
+
+_log_writer: Optional[QueueWriter] = None
+
+def _open_log_stream(output: str) -> tuple:
+    """Return (stream, owned) for LOG_OUTPUT: "stderr", "stdout" or a file path."""
+    if output.lower() == "stderr":
+        return sys.stderr, False
+    if output.lower() == "stdout":
+        return sys.stdout, False
+    return open(output, "a", encoding="utf-8"), True
+
+def configure_logging() -> None:
+    """
+    Configure structured logging from the LOG_* environment variables.
+
+    Called once at startup rather than on import, so the process entry point
+    decides when logging is set up (after ``.env`` has been loaded).
+    LOG_LEVEL accepts a level name (``DEBUG``, ``INFO``, ...) or number.
+
+    Rendered lines are queued and written to LOG_OUTPUT (stderr by default,
+    keeping stdout free for the stdio transport) by a background thread, so
+    tool calls never wait on log I/O. Per-call info events can be sampled
+    (LOG_SAMPLE_RATE) and rate-limited per event name (LOG_RATE_LIMIT).
+    """
+    global _log_writer
+    level = os.getenv("LOG_LEVEL", "INFO").strip()
+    level_number = int(level) if level.isdigit() else logging.getLevelName(level.upper())
+    if not isinstance(level_number, int):
+        level_number = logging.INFO
+    # Logging is set up before configuration is validated, so bad values fall back to defaults
+    invalid = None
+    try:
+        sampler = EventSampler(
+            PER_CALL_LOG_EVENTS,
+            sample_rate=float(os.getenv("LOG_SAMPLE_RATE", "1")),
+            rate_limit=float(os.getenv("LOG_RATE_LIMIT", "0"))
+        )
+    except ValueError as e:
+        sampler, invalid = EventSampler(PER_CALL_LOG_EVENTS), e
+    try:
+        max_queue = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+        if max_queue <= 0:
+            raise ValueError(f"LOG_QUEUE_SIZE must be a positive integer, got: {max_queue}")
+    except ValueError as e:
+        max_queue, invalid = 10000, e
+    stream, owned = _open_log_stream(os.getenv("LOG_OUTPUT", "stderr").strip() or "stderr")
+
+    shutdown_logging()
+    _log_writer = QueueWriter(stream, max_queue=max_queue, close_stream=owned)
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            # Before the timestamp and renderer, so dropped events cost as little as possible
+            sampler,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.dev.ConsoleRenderer(colors=False) if os.getenv("LOG_FORMAT", "json") != "json" else structlog.processors.JSONRenderer()
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level_number),
+        context_class=dict,
+        logger_factory=QueueLoggerFactory(_log_writer),
+        cache_logger_on_first_use=True,
+    )
+    if invalid is not None:
+        logger.warning("Invalid logging setting, using defaults", error=str(invalid))
+
+def shutdown_logging() -> None:
+    """Write queued log lines and stop the background writer."""
+    global _log_writer
+    writer, _log_writer = _log_writer, None
+    if writer is not None:
+        writer.close()
+
+# Queued lines are written even when the process exits without run_server's cleanup (e.g. sys.exit)
+atexit.register(shutdown_logging)
+
+# Set by enable_sighup_cache_reload(); the lifespan installs the handler on the running loop
+_reload_caches_on_sighup = False
+
+def reload_caches() -> None:
+    """Drop cached metadata and query results, as on SIGHUP."""
+    invalidate_metadata_cache()
+    invalidate_query_cache()
+
+def enable_sighup_cache_reload() -> None:
+    """Invalidate the caches whenever the process receives SIGHUP (where the platform has it)."""
+    global _reload_caches_on_sighup
+    _reload_caches_on_sighup = True
+
+@asynccontextmanager
+async def _lifespan(server):
+    """Warm the credential and schema catalog on start and release event-loop bound resources on stop."""
+    loop = asyncio.get_running_loop()
+    sighup = getattr(signal, "SIGHUP", None) if _reload_caches_on_sighup else None
+    if sighup is not None:
+        # Runs as a loop callback rather than between bytecodes, so it cannot
+        # interrupt code that holds the cache or log queue locks
+        loop.add_signal_handler(sighup, reload_caches)
+    warmups = []
+    if config.client_backend == ClientBackend.SYNC.value:
+        warmups.append(asyncio.ensure_future(asyncio.to_thread(prefetch_kusto_token)))
+    if load_persisted_catalog() is not None:
+        warmups.append(asyncio.ensure_future(_revalidate_schema_catalog()))
+    try:
+        yield {}
+    finally:
+        for warmup in warmups:
+            warmup.cancel()
+        if sighup is not None:
+            loop.remove_signal_handler(sighup)
+        await close_async_kusto_clients()
+
+mcp = FastMCP("Azure Data Explorer MCP", lifespan=_lifespan)
 
 class TransportType(str, Enum):
     """Supported MCP server transport types."""
@@ -48,6 +234,55 @@ class TransportType(str, Enum):
         """Get all valid transport values."""
         return [transport.value for transport in cls]
 
+class OutputFormat(str, Enum):
+    """Supported result formats for query tools."""
+
+    RECORDS = "records"
+    COLUMNAR = "columnar"
+    CSV = "csv"
+    TSV = "tsv"
+
+    @classmethod
+    def values(cls) -> list[str]:
+        """Get all valid output format values."""
+        return [output_format.value for output_format in cls]
+
+class ClientBackend(str, Enum):
+    """Supported Kusto client backends."""
+
+    SYNC = "sync"
+    ASYNC = "async"
+
+    @classmethod
+    def values(cls) -> list[str]:
+        """Get all valid backend values."""
+        return [backend.value for backend in cls]
+
+class Lane(str, Enum):
+    """Scheduling lanes: cheap metadata lookups run apart from, and ahead of, queries."""
+
+    METADATA = "metadata"
+    QUERY = "query"
+
+    @classmethod
+    def values(cls) -> list[str]:
+        """Get all lane values, highest priority first."""
+        return [lane.value for lane in cls]
+
+# Tools that only read table metadata or stored results; all others are in the query lane
+METADATA_TOOLS = frozenset({
+    "list_tables",
+    "get_table_schema",
+    "get_table_details",
+    "get_database_schema",
+    "clear_metadata_cache",
+    "fetch_page",
+})
+
+def tool_lane(tool: str) -> str:
+    """Return the scheduling lane of a tool."""
+    return Lane.METADATA.value if tool in METADATA_TOOLS else Lane.QUERY.value
+
 @dataclass
 class MCPServerConfig:
     """Global Configuration for MCP."""
@@ -70,27 +305,204 @@ class ADXConfig:
     database: str
     # Optional Custom MCP Server Configuration
     mcp_server_config: Optional[MCPServerConfig] = None
+    # Maximum number of Kusto calls executing concurrently on worker threads
+    max_concurrent_queries: int = 10
+    # Worker threads reserved for metadata lookups, so they never wait behind queries
+    metadata_concurrent_queries: int = 4
+    # Kusto client backend: "sync" (thread pool) or "async" (aio client)
+    client_backend: str = ClientBackend.SYNC.value
+    # Paginated results kept server-side for fetch_page
+    result_store_max_entries: int = 32
+    result_store_ttl_seconds: int = 300
+    # Default execute_query limits, enforced by the cluster (None = no limit)
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
+    server_timeout_seconds: Optional[int] = None
+    # Deadline of every MCP tool call; Kusto requests get the time left as servertimeout (None = no deadline)
+    tool_timeout_seconds: Optional[int] = None
+    # Metadata (list_tables/get_table_schema/get_table_details) cache; TTL 0 disables it
+    metadata_cache_ttl_seconds: int = 300
+    metadata_cache_max_entries: int = 1024
+    # Opt-in execute_query result cache; TTL 0 disables it
+    query_cache_ttl_seconds: int = 0
+    query_cache_max_entries: int = 256
+    query_cache_max_bytes: int = 64 * 1024 * 1024
+    # Directory the schema catalog is persisted to for warm starts (None = memory only)
+    schema_cache_dir: Optional[str] = None
+    # Extra clusters and databases tools may target; "*" allows any database
+    allowed_clusters: List[str] = field(default_factory=list)
+    allowed_databases: List[str] = field(default_factory=list)
+    # Clients of non-default clusters idle this long are closed (0 = never)
+    client_idle_seconds: int = 900
+    # Refresh Kusto tokens this long before they expire (0 = no proactive refresh)
+    token_refresh_margin_seconds: int = 300
+    # execute_queries: maximum queries per batch and how many run at once
+    batch_max_queries: int = 50
+    batch_max_parallelism: int = 5
+    # Path of the Prometheus endpoint on the HTTP/SSE transports ("" = disabled)
+    metrics_path: str = "/metrics"
+    # Create OpenTelemetry spans (exported over OTLP with the tracing extras)
+    tracing_enabled: bool = False
+    # Directory export_query writes Parquet/Arrow files to (None = export disabled)
+    export_dir: Optional[str] = None
+    # Rows per progress notification sent by execute_streaming_query
+    stream_batch_rows: int = 1000
+    # Admission control on the HTTP/SSE transports: tool calls running at once
+    # (0 = no limit), the wait queue behind them, and per-client limits keyed by
+    # bearer token or MCP session (0 = no limit)
+    admission_max_in_flight: int = 0
+    admission_max_queue: int = 100
+    admission_queue_timeout_seconds: float = 30.0
+    client_max_in_flight: int = 0
+    client_rate_per_second: float = 0.0
+    client_burst: int = 20
+    # execute_query preflight: estimated bytes a query may scan, from table extent
+    # statistics (None = no preflight), and whether larger queries are rejected
+    # or limited to preflight_limit_rows rows
+    preflight_max_scan_bytes: Optional[int] = None
+    preflight_action: str = PreflightAction.REJECT.value
+    preflight_limit_rows: int = 1000
+
+def _bool_env(name: str, default: bool = False) -> bool:
+    """Read a boolean environment variable ("true"/"1"/"yes", case-insensitive)."""
+    value = os.environ.get(name, "").strip().lower()
+    return value in ("1", "true", "yes") if value else default
+
+def _optional_int_env(name: str) -> Optional[int]:
+    """Read an optional integer environment variable; unset or empty means None."""
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else None
 
-config = ADXConfig(
-    cluster_url=os.environ.get("ADX_CLUSTER_URL", ""),
-    database=os.environ.get("ADX_DATABASE", ""),
-    mcp_server_config=MCPServerConfig(
-        mcp_server_transport=os.environ.get("ADX_MCP_SERVER_TRANSPORT", "stdio").lower(),
-        mcp_bind_host=os.environ.get("ADX_MCP_BIND_HOST", "127.0.0.1"),
-        mcp_bind_port=int(os.environ.get("ADX_MCP_BIND_PORT", "8080"))
+def _list_env(name: str) -> List[str]:
+    """Read a comma-separated environment variable into a list, skipping empty items."""
+    return [item.strip() for item in os.environ.get(name, "").split(",") if item.strip()]
+
+def load_config() -> "ADXConfig":
+    """
+    Read the configuration from the environment into the shared ``config``.
+
+    Importing this module does not read the environment; the entry point
+    calls this once, after ``.env`` has been loaded. The shared object is
+    updated in place so references taken at import time see the new values.
+    """
+    loaded = ADXConfig(
+        cluster_url=os.environ.get("ADX_CLUSTER_URL", ""),
+        database=os.environ.get("ADX_DATABASE", ""),
+        mcp_server_config=MCPServerConfig(
+            mcp_server_transport=os.environ.get("ADX_MCP_SERVER_TRANSPORT", "stdio").lower(),
+            mcp_bind_host=os.environ.get("ADX_MCP_BIND_HOST", "127.0.0.1"),
+            mcp_bind_port=int(os.environ.get("ADX_MCP_BIND_PORT", "8080"))
+        ),
+        max_concurrent_queries=int(os.environ.get("ADX_MAX_CONCURRENT_QUERIES", "10")),
+        metadata_concurrent_queries=int(os.environ.get("ADX_METADATA_CONCURRENT_QUERIES", "4")),
+        client_backend=os.environ.get("ADX_CLIENT_BACKEND", ClientBackend.SYNC.value).lower(),
+        result_store_max_entries=int(os.environ.get("ADX_RESULT_STORE_MAX_ENTRIES", "32")),
+        result_store_ttl_seconds=int(os.environ.get("ADX_RESULT_STORE_TTL_SECONDS", "300")),
+        max_rows=_optional_int_env("ADX_MAX_ROWS"),
+        max_bytes=_optional_int_env("ADX_MAX_BYTES"),
+        server_timeout_seconds=_optional_int_env("ADX_SERVER_TIMEOUT_SECONDS"),
+        tool_timeout_seconds=_optional_int_env("ADX_TOOL_TIMEOUT_SECONDS"),
+        metadata_cache_ttl_seconds=int(os.environ.get("ADX_METADATA_CACHE_TTL_SECONDS", "300")),
+        metadata_cache_max_entries=int(os.environ.get("ADX_METADATA_CACHE_MAX_ENTRIES", "1024")),
+        query_cache_ttl_seconds=int(os.environ.get("ADX_QUERY_CACHE_TTL_SECONDS", "0")),
+        query_cache_max_entries=int(os.environ.get("ADX_QUERY_CACHE_MAX_ENTRIES", "256")),
+        query_cache_max_bytes=int(os.environ.get("ADX_QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        schema_cache_dir=os.environ.get("ADX_SCHEMA_CACHE_DIR") or None,
+        allowed_clusters=_list_env("ADX_ALLOWED_CLUSTERS"),
+        allowed_databases=_list_env("ADX_ALLOWED_DATABASES"),
+        client_idle_seconds=int(os.environ.get("ADX_CLIENT_IDLE_SECONDS", "900")),
+        token_refresh_margin_seconds=int(os.environ.get("ADX_TOKEN_REFRESH_MARGIN_SECONDS", "300")),
+        batch_max_queries=int(os.environ.get("ADX_BATCH_MAX_QUERIES", "50")),
+        batch_max_parallelism=int(os.environ.get("ADX_BATCH_MAX_PARALLELISM", "5")),
+        metrics_path=os.environ.get("ADX_METRICS_PATH", "/metrics").strip(),
+        tracing_enabled=_bool_env("ADX_TRACING_ENABLED"),
+        export_dir=os.environ.get("ADX_EXPORT_DIR") or None,
+        stream_batch_rows=int(os.environ.get("ADX_STREAM_BATCH_ROWS", "1000")),
+        admission_max_in_flight=int(os.environ.get("ADX_ADMISSION_MAX_IN_FLIGHT", "0")),
+        admission_max_queue=int(os.environ.get("ADX_ADMISSION_MAX_QUEUE", "100")),
+        admission_queue_timeout_seconds=float(os.environ.get("ADX_ADMISSION_QUEUE_TIMEOUT_SECONDS", "30")),
+        client_max_in_flight=int(os.environ.get("ADX_CLIENT_MAX_IN_FLIGHT", "0")),
+        client_rate_per_second=float(os.environ.get("ADX_CLIENT_RATE_PER_SECOND", "0")),
+        client_burst=int(os.environ.get("ADX_CLIENT_BURST", "20")),
+        preflight_max_scan_bytes=_optional_int_env("ADX_PREFLIGHT_MAX_SCAN_BYTES"),
+        preflight_action=os.environ.get("ADX_PREFLIGHT_ACTION", PreflightAction.REJECT.value).lower(),
+        preflight_limit_rows=int(os.environ.get("ADX_PREFLIGHT_LIMIT_ROWS", "1000"))
     )
-)
+    for config_field in fields(ADXConfig):
+        setattr(config, config_field.name, getattr(loaded, config_field.name))
+    return config
+
+# Populated by load_config() at startup
+config = ADXConfig(cluster_url="", database="")
 
-def get_kusto_client() -> KustoClient:
+@dataclass(frozen=True)
+class QueryTarget:
+    """The cluster and database a tool call runs against."""
+    cluster_url: str
+    database: str
+
+# Target selected by the running tool call; unset means the configured defaults
+_current_target: ContextVar[Optional[QueryTarget]] = ContextVar("adx_query_target", default=None)
+
+def current_target() -> QueryTarget:
+    """Return the target of the running tool call, defaulting to ADX_CLUSTER_URL/ADX_DATABASE."""
+    target = _current_target.get()
+    if target is None:
+        return QueryTarget(config.cluster_url, config.database)
+    return target
+
+def _normalize_cluster_url(cluster_url: str) -> str:
+    return cluster_url.strip().rstrip("/").lower()
+
+def _cluster_short_name(cluster_url: str) -> str:
+    """Return the first host label of a cluster URL, e.g. "help" for https://help.kusto.windows.net."""
+    host = _normalize_cluster_url(cluster_url).split("://", 1)[-1]
+    return host.split(".", 1)[0]
+
+def select_target(cluster: Optional[str] = None, database: Optional[str] = None) -> QueryTarget:
     """
-    Create and configure a Kusto client with appropriate Azure credentials.
+    Validate a tool call's cluster/database arguments and make them the current target.
+
+    The default cluster and database are always allowed. Other clusters must be
+    listed in ADX_ALLOWED_CLUSTERS (by URL or short name) and other databases
+    in ADX_ALLOWED_DATABASES, where "*" allows any database.
+
+    Raises:
+        ValueError: If the cluster or database is not allowed
+    """
+    cluster_url = config.cluster_url
+    if cluster is not None:
+        wanted = cluster.strip().lower()
+        candidates = [url for url in [config.cluster_url, *config.allowed_clusters] if url]
+        matches = [url for url in candidates if _normalize_cluster_url(url) == _normalize_cluster_url(wanted) or _cluster_short_name(url) == wanted]
+        if not matches:
+            raise ValueError(
+                f"Cluster '{cluster}' is not allowed. "
+                f"Allowed clusters: {', '.join(candidates) or 'none'}"
+            )
+        cluster_url = matches[0]
+
+    if database is None:
+        database = config.database
+    elif database != config.database and "*" not in config.allowed_databases and database not in config.allowed_databases:
+        allowed = [name for name in [config.database, *config.allowed_databases] if name]
+        raise ValueError(
+            f"Database '{database}' is not allowed. "
+            f"Allowed databases: {', '.join(allowed) or 'none'}"
+        )
+
+    target = QueryTarget(cluster_url, database)
+    _current_target.set(target)
+    return target
+
+def _create_credential():
+    """
+    Create the Azure credential used to authenticate against Kusto.
 
     Prioritizes WorkloadIdentityCredential when running in AKS with workload identity,
     falls back to DefaultAzureCredential for other authentication methods.
-
-    Returns:
-        KustoClient: Configured Kusto client instance
     """
+    _load_azure_sdk()
     tenant_id = os.environ.get('AZURE_TENANT_ID')
     client_id = os.environ.get('AZURE_CLIENT_ID')
     token_file_path = os.environ.get('ADX_TOKEN_FILE_PATH', '/var/run/secrets/azure/tokens/azure-identity-token')
@@ -103,7 +515,7 @@ def get_kusto_client() -> KustoClient:
             token_file_path=token_file_path
         )
         try:
-            credential = WorkloadIdentityCredential(
+            return WorkloadIdentityCredential(
                 tenant_id=tenant_id,
                 client_id=client_id,
                 token_file_path=token_file_path
@@ -114,32 +526,884 @@ def get_kusto_client() -> KustoClient:
                 error=str(e),
                 exception_type=type(e).__name__
             )
-            credential = DefaultAzureCredential()
-    else:
-        logger.info("Using DefaultAzureCredential (missing WorkloadIdentity credentials)")
-        credential = DefaultAzureCredential()
+            return DefaultAzureCredential()
 
-    try:
-        kcsb = KustoConnectionStringBuilder.with_azure_token_credential(
-            connection_string=config.cluster_url,
-            credential=credential
-        )
-        client = KustoClient(kcsb)
-        logger.debug("Kusto client initialized successfully", cluster_url=config.cluster_url)
+    logger.info("Using DefaultAzureCredential (missing WorkloadIdentity credentials)")
+    return DefaultAzureCredential()
+
+class KustoClientRegistry:
+    """
+    Process-wide registry of pooled Kusto clients.
+
+    The credential and one KustoClient per cluster URL are built lazily on first
+    use and then shared by every tool call, so the underlying HTTP connection pool
+    and token cache survive across calls. Clients can be invalidated (e.g. after
+    an authentication failure), evicted once idle, and are closed on shutdown.
+
+    Callers lease a client with get_client and hand it back with release. A
+    client replaced or evicted while leased is retired instead of closed, and
+    closed (with its credential, once no retired client uses it) when its last
+    lease is released, so in-flight requests never see a closed client.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._credential = None
+        self._clients: Dict[str, "KustoClient"] = {}
+        self._last_used: Dict[str, float] = {}
+        # Leases by id(client), and leased clients that were replaced, with their credential
+        self._leases: Dict[int, int] = {}
+        self._retired: Dict[int, tuple] = {}
+
+    def get_credential(self):
+        """Return the shared credential, creating it on first use."""
+        with self._lock:
+            return self._get_credential_locked()
+
+    def _get_credential_locked(self):
+        if self._credential is None:
+            credential = _create_credential()
+            if config.token_refresh_margin_seconds > 0:
+                credential = RefreshingCredential(credential, config.token_refresh_margin_seconds)
+            self._credential = credential
+        return self._credential
+
+    def token_stats(self) -> Optional[Dict[str, Any]]:
+        """Return token age and refresh latency of the shared credential, if it refreshes proactively."""
+        credential = self._credential
+        return credential.stats() if isinstance(credential, RefreshingCredential) else None
+
+    def get_client(self, cluster_url: str) -> "KustoClient":
+        """
+        Lease the pooled client for a cluster, creating it on first use.
+
+        Every call must be paired with ``release(client)`` once the client is no longer used.
+        """
+        with self._lock:
+            self._last_used[cluster_url] = time.monotonic()
+            client = self._clients.get(cluster_url)
+            if client is None:
+                client = self._create_client_locked(cluster_url)
+            self._leases[id(client)] = self._leases.get(id(client), 0) + 1
+            return client
+
+    def _create_client_locked(self, cluster_url: str) -> "KustoClient":
+        """Build and pool the client for a cluster; the caller holds the lock."""
+        credential = self._get_credential_locked()
+        _load_azure_sdk()
+
+        try:
+            # The client closes its credential on close(); the shared one is closed here instead
+            kcsb = KustoConnectionStringBuilder.with_azure_token_credential(
+                connection_string=cluster_url,
+                credential=SharedCredential(credential)
+            )
+            client = KustoClient(kcsb)
+        except Exception as e:
+            logger.error(
+                "Failed to create Kusto client",
+                error=str(e),
+                exception_type=type(e).__name__,
+                cluster_url=cluster_url
+            )
+            raise
+
+        self._clients[cluster_url] = client
+        logger.debug("Kusto client initialized successfully", cluster_url=cluster_url)
         return client
+
+    def release(self, client: "KustoClient") -> None:
+        """End a lease taken with get_client, closing the client if it was retired meanwhile."""
+        with self._lock:
+            key = id(client)
+            leases = self._leases.get(key, 0) - 1
+            if leases > 0:
+                self._leases[key] = leases
+                return
+            self._leases.pop(key, None)
+            retired = self._retired.pop(key, None)
+            if retired is None:
+                return
+            client, credential = retired
+            if credential is self._credential or any(other is credential for _, other in self._retired.values()):
+                credential = None
+        _close_quietly([client], credential)
+
+    def _retire_locked(self, clients, credential) -> tuple:
+        """
+        Retire replaced clients built with ``credential``.
+
+        Returns the clients and credential that are no longer leased and can be
+        closed now; the others are closed by release().
+        """
+        idle = []
+        for client in clients:
+            if self._leases.get(id(client)):
+                self._retired[id(client)] = (client, credential)
+            else:
+                idle.append(client)
+        if credential is self._credential or any(other is credential for _, other in self._retired.values()):
+            credential = None
+        return idle, credential
+
+    def evict_idle(self, idle_seconds: float, keep: Iterable[str] = ()) -> int:
+        """
+        Close clients that have not been requested for ``idle_seconds``.
+
+        Clusters in ``keep`` are never evicted. Returns the number of clients closed.
+        """
+        cutoff = time.monotonic() - idle_seconds
+        with self._lock:
+            idle = [
+                url for url in self._clients
+                if url not in keep and self._last_used.get(url, 0) < cutoff
+            ]
+            evicted = [self._clients.pop(url) for url in idle]
+            for url in idle:
+                self._last_used.pop(url, None)
+            closable, _ = self._retire_locked(evicted, self._credential)
+        if evicted:
+            _close_quietly(closable, None)
+            logger.info("Idle Kusto clients evicted", cluster_urls=idle)
+        return len(evicted)
+
+    def invalidate(self, cluster_url: Optional[str] = None, failed_client: Optional["KustoClient"] = None) -> bool:
+        """
+        Drop all pooled clients and the credential so the next call rebuilds them.
+
+        With ``failed_client`` this is a compare-and-swap: the registry is only
+        invalidated while that client is still the one pooled for
+        ``cluster_url``, so calls that fail together on the same client
+        rebuild it once. Leased clients are closed when released.
+
+        Returns:
+            True if the registry was invalidated
+        """
+        with self._lock:
+            if failed_client is not None and self._clients.get(cluster_url) is not failed_client:
+                return False
+            clients, credential = list(self._clients.values()), self._credential
+            self._clients, self._credential = {}, None
+            closable, credential = self._retire_locked(clients, credential)
+        _close_quietly(closable, credential)
+        logger.info("Kusto client registry invalidated", client_count=len(clients))
+        return True
+
+    def close(self) -> None:
+        """Close all pooled clients, including retired ones still leased, and the shared credential."""
+        with self._lock:
+            clients, credential = list(self._clients.values()), self._credential
+            retired = list(self._retired.values())
+            self._clients, self._credential = {}, None
+            self._leases.clear()
+            self._retired.clear()
+        _close_quietly(clients + [client for client, _ in retired], credential)
+        retired_credentials = {id(other): other for _, other in retired if other is not None and other is not credential}
+        for other in retired_credentials.values():
+            _close_quietly([], other)
+
+def _close_quietly(clients, credential) -> None:
+    """Close clients and a credential, logging instead of raising on failure."""
+    for resource in [*clients, credential]:
+        if resource is None or not hasattr(resource, "close"):
+            continue
+        try:
+            resource.close()
+        except Exception as e:
+            logger.warning("Failed to close Kusto resource", error=str(e), exception_type=type(e).__name__)
+
+_client_registry = KustoClientRegistry()
+
+_last_idle_sweep = 0.0
+
+def _idle_sweep_due() -> bool:
+    """Check whether idle clients should be swept; sweeps run at most twice per idle period."""
+    global _last_idle_sweep
+    if config.client_idle_seconds <= 0:
+        return False
+    now = time.monotonic()
+    if now - _last_idle_sweep < config.client_idle_seconds / 2:
+        return False
+    _last_idle_sweep = now
+    return True
+
+def get_kusto_client() -> "KustoClient":
+    """
+    Lease the pooled Kusto client for the current target cluster.
+
+    Hand it back with ``_client_registry.release(client)``; _pooled_client_call
+    does both around one request.
+
+    The client and its Azure credential are created once per process and reused
+    by every tool call. Clients of other clusters that have been idle for
+    ADX_CLIENT_IDLE_SECONDS are closed along the way; the default cluster's
+    client is kept.
+
+    Returns:
+        KustoClient: Configured Kusto client instance
+    """
+    cluster_url = current_target().cluster_url
+    with span("kusto.get_client", {"server.address": cluster_url}):
+        client = _client_registry.get_client(cluster_url)
+    if _idle_sweep_due():
+        _client_registry.evict_idle(config.client_idle_seconds, keep=(config.cluster_url,))
+    return client
+
+def _kusto_token_scope(cluster_url: str) -> str:
+    """Return the token scope the Kusto SDK requests for a cluster, resolving its cloud metadata."""
+    _load_azure_sdk()
+    cloud_info = CloudSettings.get_cloud_info_for_cluster(cluster_url)
+    resource_uri = cloud_info.kusto_service_resource_id
+    if cloud_info.login_mfa_required:
+        resource_uri = resource_uri.replace(".kusto.", ".kustomfa.")
+    return resource_uri + "/.default"
+
+def prefetch_kusto_token() -> None:
+    """
+    Acquire the default cluster's Kusto token ahead of the first query.
+
+    Resolving the scope also warms the SDK's cloud metadata cache. The token
+    is then kept fresh in the background, so no query waits on token
+    acquisition. Failures are logged; the first query acquires inline instead.
+    """
+    if config.token_refresh_margin_seconds <= 0 or not config.cluster_url:
+        return
+    started = time.monotonic()
+    try:
+        credential = _client_registry.get_credential()
+        credential.prefetch(_kusto_token_scope(config.cluster_url))
     except Exception as e:
-        logger.error(
-            "Failed to create Kusto client",
+        logger.warning("Failed to prefetch Kusto token", error=str(e), exception_type=type(e).__name__)
+        return
+    logger.info("Kusto token prefetched", duration_ms=round((time.monotonic() - started) * 1000, 2))
+
+def close_kusto_clients() -> None:
+    """Close all pooled Kusto clients. Called on server shutdown."""
+    _client_registry.close()
+
+@contextmanager
+def _pooled_client_call(call):
+    """
+    Run ``call(client)`` with a leased pooled client and yield its result, releasing the client afterwards.
+
+    On an authentication failure the registry is invalidated, unless a
+    concurrent call already replaced the failed client, and the call is
+    retried once with a freshly built credential and client. The lease is
+    held until the block exits, so streamed responses stay readable.
+    """
+    cluster_url = current_target().cluster_url
+    client = get_kusto_client()
+    try:
+        try:
+            result = call(client)
+        except Exception as e:
+            if not _is_auth_error(e):
+                raise
+            logger.warning("Authentication failed, rebuilding Kusto client", error=str(e))
+            _client_registry.invalidate(cluster_url, client)
+            _client_registry.release(client)
+            client = None
+            client = get_kusto_client()
+            result = call(client)
+        yield result
+    finally:
+        if client is not None:
+            _client_registry.release(client)
+
+def _is_auth_error(error: Exception) -> bool:
+    """Check whether an exception was caused by an expired or rejected credential."""
+    _load_azure_sdk()
+    if isinstance(error, (KustoAuthenticationError, ClientAuthenticationError)):
+        return True
+    return isinstance(error, KustoServiceError) and "401" in str(error)
+
+# Deadline (time.monotonic()) of the running tool call; unset means no deadline
+_tool_deadline: ContextVar[Optional[float]] = ContextVar("adx_tool_deadline", default=None)
+
+def remaining_time() -> Optional[float]:
+    """Return the seconds left before the running tool call's deadline, or None without a deadline."""
+    deadline = _tool_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def _with_client_request_id(properties: Optional["ClientRequestProperties"]) -> "ClientRequestProperties":
+    """
+    Give the request a client request id and a server timeout that ends by the tool call's deadline.
+
+    The id lets an abandoned request be cancelled with ``.cancel query`` and
+    its span be matched to the cluster's logs. Calling this again on the same
+    properties keeps the id and only shortens the timeout.
+
+    Raises:
+        TimeoutError: If the tool call's deadline has already passed
+    """
+    _load_azure_sdk()
+    if properties is None:
+        properties = ClientRequestProperties()
+    if not properties.client_request_id:
+        properties.client_request_id = f"adx-mcp-server;{uuid.uuid4()}"
+    remaining = remaining_time()
+    if remaining is not None:
+        if remaining <= 0:
+            raise TimeoutError("Tool call deadline exceeded before the Kusto request was sent")
+        server_timeout = properties.get_option(ClientRequestProperties.request_timeout_option_name, None)
+        if server_timeout is None or server_timeout.total_seconds() > remaining:
+            properties.set_option(ClientRequestProperties.request_timeout_option_name, timedelta(seconds=remaining))
+    return properties
+
+# Client request ids of Kusto requests sent and not yet answered
+_active_requests: set = set()
+_active_requests_lock = threading.Lock()
+
+@contextmanager
+def _tracked_request(client_request_id: str):
+    """Mark a request as sent to the cluster until it returns or fails."""
+    with _active_requests_lock:
+        _active_requests.add(client_request_id)
+    try:
+        yield
+    finally:
+        with _active_requests_lock:
+            _active_requests.discard(client_request_id)
+
+def _cancel_query(database: str, client_request_id: str) -> None:
+    """Ask the cluster to cancel a running query; failures are logged and otherwise ignored."""
+    try:
+        command = f'.cancel query "{client_request_id}" with (reason = "Cancelled by the MCP client")'
+        with _pooled_client_call(lambda client: client.execute_mgmt(database, command)):
+            pass
+        logger.info("Abandoned query cancelled", client_request_id=client_request_id)
+    except Exception as e:
+        logger.warning(
+            "Could not cancel abandoned query",
             error=str(e),
             exception_type=type(e).__name__,
-            cluster_url=config.cluster_url
+            client_request_id=client_request_id
         )
+
+def cancel_abandoned_request(database: str, client_request_id: str) -> bool:
+    """
+    Best-effort ``.cancel query`` for a request whose caller gave up on it.
+
+    Only requests still running on the cluster are cancelled. The command is
+    sent from its own thread, so it neither waits behind the query executor's
+    queue nor delays the cancelled tool call.
+
+    Returns:
+        True if a cancellation was sent
+    """
+    with _active_requests_lock:
+        running = client_request_id in _active_requests
+    if not running:
+        return False
+    context = contextvars.copy_context()
+    threading.Thread(
+        target=context.run,
+        args=(_cancel_query, database, client_request_id),
+        name="adx-cancel",
+        daemon=True
+    ).start()
+    return True
+
+def _request_span(database: str, properties: Optional["ClientRequestProperties"]):
+    """Open the span around one Kusto request."""
+    if not tracing_enabled():
+        return span("kusto.execute")
+    return span("kusto.execute", {
+        "db.system": "kusto",
+        "db.namespace": database,
+        "server.address": current_target().cluster_url,
+        "kusto.client_request_id": properties.client_request_id,
+    })
+
+def _execute(database: str, query: str, properties: Optional["ClientRequestProperties"] = None):
+    """
+    Execute a query with the pooled client.
+
+    On an authentication failure the registry is invalidated and the query is
+    retried once with a freshly built credential and client.
+    """
+    properties = _with_client_request_id(properties)
+    started = time.perf_counter()
+    try:
+        def execute(client):
+            with _request_span(database, properties):
+                return client.execute(database, query, properties)
+
+        with _tracked_request(properties.client_request_id), _pooled_client_call(execute) as result:
+            return result
+    finally:
+        _kusto_request_seconds.observe(time.perf_counter() - started, ClientBackend.SYNC.value)
+
+# One bounded executor per lane, created on first use
+_executors: Dict[str, BoundedExecutor] = {}
+_executor_lock = threading.Lock()
+
+def get_query_executor(lane: str = Lane.QUERY.value) -> BoundedExecutor:
+    """
+    Get the bounded executor that runs a lane's blocking Kusto calls, creating it on first use.
+
+    Each lane has its own worker threads (ADX_MAX_CONCURRENT_QUERIES for
+    queries, ADX_METADATA_CONCURRENT_QUERIES for metadata), so a saturated
+    query lane does not delay metadata lookups.
+    """
+    executor = _executors.get(lane)
+    if executor is None:
+        with _executor_lock:
+            executor = _executors.get(lane)
+            if executor is None:
+                max_workers = config.metadata_concurrent_queries if lane == Lane.METADATA.value else config.max_concurrent_queries
+                executor = _executors[lane] = BoundedExecutor(
+                    lane, max_workers, on_wait=lambda wait: _executor_wait_seconds.observe(wait, lane)
+                )
+    return executor
+
+def shutdown_query_executor() -> None:
+    """Shut down the executors of all lanes. Called on server shutdown."""
+    with _executor_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown()
+
+_async_client_registry = None
+
+def _get_async_client_registry():
+    """Get the aio client registry, creating it on first use from the running event loop."""
+    global _async_client_registry
+    if _async_client_registry is None:
+        from adx_mcp_server.aio import AsyncKustoClientRegistry
+        _async_client_registry = AsyncKustoClientRegistry()
+    return _async_client_registry
+
+async def close_async_kusto_clients() -> None:
+    """Close all pooled aio Kusto clients."""
+    global _async_client_registry
+    registry, _async_client_registry = _async_client_registry, None
+    if registry is not None:
+        await registry.close()
+
+async def _execute_async(database: str, query: str, properties: Optional["ClientRequestProperties"] = None):
+    """
+    Execute a query with the pooled aio client.
+
+    Like _execute, the client is leased for the request, and the registry is
+    rebuilt (unless a concurrent call already replaced the failed client) and
+    the query retried once on an authentication failure.
+    """
+    registry = _get_async_client_registry()
+    cluster_url = current_target().cluster_url
+    if _idle_sweep_due():
+        await registry.evict_idle(config.client_idle_seconds, keep=(config.cluster_url,))
+    properties = _with_client_request_id(properties)
+    started = time.perf_counter()
+    try:
+        with _tracked_request(properties.client_request_id):
+            client = None
+            try:
+                try:
+                    with span("kusto.get_client", {"server.address": cluster_url}):
+                        client = await registry.get_client(cluster_url)
+                    with _request_span(database, properties):
+                        return await client.execute(database, query, properties)
+                except Exception as e:
+                    if not _is_auth_error(e):
+                        raise
+                    logger.warning("Authentication failed, rebuilding async Kusto client", error=str(e))
+                    await registry.invalidate(cluster_url, client)
+                    await registry.release(client)
+                    client = None
+                    client = await registry.get_client(cluster_url)
+                    with _request_span(database, properties):
+                        return await client.execute(database, query, properties)
+            except asyncio.CancelledError:
+                # Dropping the HTTP request does not stop the query on the cluster
+                cancel_abandoned_request(database, properties.client_request_id)
+                raise
+            finally:
+                if client is not None:
+                    await registry.release(client)
+    finally:
+        _kusto_request_seconds.observe(time.perf_counter() - started, ClientBackend.ASYNC.value)
+
+async def _run_query(
+    database: str,
+    query: str,
+    properties: Optional["ClientRequestProperties"] = None,
+    lane: str = Lane.QUERY.value
+):
+    """
+    Execute a query without blocking the event loop.
+
+    Uses the native aio client when ADX_CLIENT_BACKEND=async, otherwise runs the
+    sync client on the lane's bounded executor. If the caller is cancelled (the MCP
+    client went away or the tool call's deadline passed) while the query runs,
+    the cluster is asked to cancel it.
+    """
+    _queries_in_flight.inc()
+    try:
+        if config.client_backend == ClientBackend.ASYNC.value:
+            return await _execute_async(database, query, properties)
+        properties = _with_client_request_id(properties)
+        try:
+            return await get_query_executor(lane).run(_execute, database, query, properties)
+        except asyncio.CancelledError:
+            # The worker thread stays blocked in client.execute until the cluster stops the query
+            cancel_abandoned_request(database, properties.client_request_id)
+            raise
+    finally:
+        _queries_in_flight.dec()
+
+def _stream_query(
+    database: str,
+    query: str,
+    properties: Optional["ClientRequestProperties"],
+    batch_size: int,
+    max_rows: Optional[int],
+    on_batch,
+    stop: threading.Event
+) -> Dict[str, Any]:
+    """
+    Execute a query with the pooled client's streaming API and hand its primary result over in batches.
+
+    Rows are read from the response as it arrives and passed to
+    ``on_batch(columns, rows)`` every ``batch_size`` rows, so no more than one
+    batch is held at a time. Reading stops after ``max_rows`` rows or once
+    ``stop`` is set. The rest of the response is then read, so its connection
+    is released, and its deferred partial failures are raised like in
+    limit_results unless they only report truncation or reading was stopped. Like _execute, an authentication failure rebuilds the
+    registry and the request is retried once; no rows have been read by then.
+
+    Returns:
+        Dictionary with the columns, row_count, batch_count and whether the result was truncated
+    """
+    properties = _with_client_request_id(properties)
+    started = time.perf_counter()
+    try:
+        with _tracked_request(properties.client_request_id), _request_span(database, properties), \
+                _pooled_client_call(lambda client: client.execute_streaming_query(database, query, properties=properties)) as response:
+            table = next(response.iter_primary_results(), None)
+            if table is None:
+                return {"columns": [], "row_count": 0, "batch_count": 0, "truncated": False}
+
+            columns = [{"name": col.column_name, "type": col.column_type} for col in table.columns]
+            converters = column_converters([col.column_type for col in table.columns])
+            row_count = batch_count = 0
+            truncated = False
+            batch = []
+            # raw_rows is read from the open response; the SDK's typed rows are never built
+            for row in table.raw_rows:
+                if stop.is_set():
+                    break
+                if max_rows is not None and row_count == max_rows:
+                    truncated = True
+                    break
+                batch.append(_convert_row(row, converters) if converters else row)
+                row_count += 1
+                if len(batch) == batch_size:
+                    on_batch(columns, batch)
+                    batch_count += 1
+                    batch = []
+            if batch and not stop.is_set():
+                on_batch(columns, batch)
+                batch_count += 1
+            # The SDK gives no way to close the response early; reading it to the
+            # end returns the connection to the pool instead of abandoning it
+            response.set_skip_incomplete_tables(True)
+            if stop.is_set():
+                # The abandoned query is cancelled on the cluster, which ends the response early
+                try:
+                    for _ in response:
+                        pass
+                except Exception as e:
+                    logger.debug("Stopped streaming response ended with an error", error=str(e), exception_type=type(e).__name__)
+            else:
+                # Failures come in the completion table after the primary result
+                for _ in response:
+                    pass
+                truncated = raise_partial_failures(response.get_exceptions()) or truncated
+            return {"columns": columns, "row_count": row_count, "batch_count": batch_count, "truncated": truncated}
+    finally:
+        _kusto_request_seconds.observe(time.perf_counter() - started, ClientBackend.SYNC.value)
+
+def _stream_export(
+    database: str,
+    query: str,
+    properties: Optional["ClientRequestProperties"],
+    path: str,
+    export_format: str,
+    max_rows: Optional[int],
+    stop: threading.Event
+) -> Dict[str, Any]:
+    """
+    Stream a query's primary result into an export file.
+
+    Each batch read by _stream_query is written as a record batch as soon as
+    it arrives, so no more than one batch of rows is held in memory. The file
+    is discarded if the export fails or ``stop`` is set.
+
+    Returns:
+        The ExportWriter summary with whether the result was truncated
+    """
+    writers: List[ExportWriter] = []
+
+    def write_batch(columns: List[Dict[str, str]], rows: List[list]) -> None:
+        if not writers:
+            writers.append(ExportWriter(path, export_format, [(col["name"], col["type"]) for col in columns]))
+        writers[0].write(rows)
+
+    try:
+        result = _stream_query(database, query, properties, DEFAULT_BATCH_ROWS, max_rows, write_batch, stop)
+        if stop.is_set():
+            # The tool call was cancelled; a partial file must not take the destination name
+            raise RuntimeError("Export cancelled before the result was read")
+        if not writers:
+            writers.append(ExportWriter(path, export_format, [(col["name"], col["type"]) for col in result["columns"]]))
+    except BaseException:
+        if writers:
+            writers[0].abort()
         raise
+    summary = writers[0].close()
+    summary["truncated"] = result["truncated"]
+    return summary
+
+# Metrics are always recorded (a lock and a dict update per call) and exposed
+# at ADX_METRICS_PATH when the server runs with an HTTP transport.
+_metrics = MetricsRegistry()
+_tool_seconds = _metrics.histogram("adx_tool_duration_seconds", "Duration of MCP tool calls.", ("tool",))
+_tool_errors = _metrics.counter("adx_tool_errors_total", "MCP tool calls that raised, by exception type.", ("tool", "exception_type"))
+_tool_response_bytes = _metrics.histogram(
+    "adx_tool_response_bytes", "Size of MCP tool responses.", ("tool",), buckets=DEFAULT_SIZE_BUCKETS
+)
+_kusto_request_seconds = _metrics.histogram(
+    "adx_kusto_request_duration_seconds", "Round-trip time of Kusto requests, excluding queueing and formatting.", ("backend",)
+)
+_format_seconds = _metrics.histogram("adx_format_duration_seconds", "Time spent formatting query results.", ("output_format",))
+_result_rows = _metrics.histogram("adx_result_rows", "Rows returned per formatted query result.", buckets=DEFAULT_SIZE_BUCKETS)
+_executor_wait_seconds = _metrics.histogram(
+    "adx_executor_queue_wait_seconds", "Time Kusto calls waited for a worker thread, by lane.", ("executor",)
+)
+_queries_in_flight = _metrics.gauge("adx_queries_in_flight", "Kusto requests queued or running.")
+_preflight_checks = _metrics.counter("adx_preflight_checks_total", "execute_query preflight cost checks, by outcome.", ("outcome",))
+
+def _collect_component_metrics():
+    """Read cache, executor, coalescing, admission and token state when the metrics endpoint is scraped."""
+    caches = {"metadata": _metadata_cache, "query": _query_cache, "result_store": _result_store}
+    cache_stats = {name: cache.stats() for name, cache in caches.items() if cache is not None}
+    for key, kind, documentation in (
+        ("hits", "counter", "Cache lookups that found a live entry."),
+        ("misses", "counter", "Cache lookups that found no live entry."),
+        ("evictions", "counter", "Cache entries evicted to stay within limits."),
+        ("entries", "gauge", "Entries currently cached."),
+    ):
+        name = f"adx_cache_{key}_total" if kind == "counter" else f"adx_cache_{key}"
+        yield name, kind, documentation, [({"cache": cache}, stats[key]) for cache, stats in cache_stats.items()]
+
+    executor_stats = [executor.stats() for executor in list(_executors.values())]
+    if executor_stats:
+        for key, name, documentation, scale in (
+            ("queued", "adx_executor_queued", "Kusto calls waiting for a worker thread, by lane.", 1),
+            ("running", "adx_executor_running", "Kusto calls running on worker threads, by lane.", 1),
+            ("max_wait_ms", "adx_executor_max_wait_seconds", "Longest time a Kusto call waited for a worker thread, by lane.", 1000),
+        ):
+            yield name, "gauge", documentation, [({"executor": stats["executor"]}, stats[key] / scale) for stats in executor_stats]
+
+    single_flight = _single_flight
+    if single_flight is not None:
+        stats = single_flight.stats()
+        yield "adx_queries_coalesced_total", "counter", "Queries answered by an identical in-flight query.", [({}, stats["coalesced"])]
+
+    admission = _admission_controller
+    if admission is not None:
+        stats = admission.stats()
+        yield "adx_admission_in_flight", "gauge", "Tool calls admitted and running.", [({}, stats["in_flight"])]
+        yield "adx_admission_queued", "gauge", "Tool calls waiting for admission.", [({}, stats["queued"])]
+        yield "adx_admission_rejected_total", "counter", "Tool calls rejected by admission control, by reason.", [
+            ({"reason": reason}, count) for reason, count in stats["rejected"].items()
+        ]
+        yield "adx_admission_max_wait_seconds", "gauge", "Longest time a tool call waited for admission.", [({}, stats["max_wait_ms"] / 1000)]
+
+    log_writer = _log_writer
+    if log_writer is not None:
+        stats = log_writer.stats()
+        yield "adx_log_lines_queued", "gauge", "Log lines waiting for the background writer.", [({}, stats["queued"])]
+        yield "adx_log_lines_dropped_total", "counter", "Log lines dropped because the log queue was full.", [({}, stats["dropped"])]
+
+    token_stats = _client_registry.token_stats()
+    if token_stats is not None and token_stats["tokens"]:
+        yield "adx_token_age_seconds", "gauge", "Age of the oldest cached Kusto access token.", [({}, token_stats["token_age_seconds"])]
+        yield "adx_token_expires_in_seconds", "gauge", "Time until the soonest cached Kusto access token expires.", [({}, token_stats["expires_in_seconds"])]
+        yield "adx_token_refreshes_total", "counter", "Kusto access token acquisitions.", [({}, token_stats["refreshes"])]
+        yield "adx_token_refresh_failures_total", "counter", "Failed background token refreshes.", [({}, token_stats["refresh_failures"])]
+        yield "adx_token_last_refresh_seconds", "gauge", "Duration of the last token acquisition.", [({}, token_stats["last_refresh_ms"] / 1000)]
+
+_metrics.add_collector(_collect_component_metrics)
+
+class ToolMetricsMiddleware(Middleware):
+    """Record duration, response size and errors of every MCP tool call."""
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        started = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except Exception as e:
+            # fastmcp wraps tool exceptions in ToolError; count the original type
+            _tool_errors.inc(1, tool, type(e.__cause__ or e).__name__)
+            raise
+        finally:
+            _tool_seconds.observe(time.perf_counter() - started, tool)
+        _tool_response_bytes.observe(sum(len(getattr(item, "text", "") or "") for item in result.content), tool)
+        return result
+
+class ToolTracingMiddleware(Middleware):
+    """Open a span around every MCP tool call; Kusto and formatting spans nest inside it."""
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        with span(f"execute_tool {tool}", {"gen_ai.tool.name": tool}):
+            return await call_next(context)
+
+class ToolDeadlineMiddleware(Middleware):
+    """
+    Give every MCP tool call a deadline.
+
+    Kusto requests made by the call get the time left as their servertimeout.
+    A call still running at the deadline is cancelled, which cancels its
+    running queries on the cluster, and fails with a ToolError.
+    """
+
+    def __init__(self, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+
+    async def on_call_tool(self, context, call_next):
+        token = _tool_deadline.set(time.monotonic() + self.timeout_seconds)
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                return await call_next(context)
+        except TimeoutError as e:
+            logger.warning("Tool call deadline exceeded", tool=context.message.name, timeout_seconds=self.timeout_seconds)
+            raise ToolError(
+                f"Tool call '{context.message.name}' did not finish within ADX_TOOL_TIMEOUT_SECONDS ({self.timeout_seconds}s)"
+            ) from e
+        finally:
+            _tool_deadline.reset(token)
+
+def enable_tool_deadline(timeout_seconds: float) -> None:
+    """Apply a deadline of ``timeout_seconds`` to every MCP tool call."""
+    mcp.add_middleware(ToolDeadlineMiddleware(timeout_seconds))
+
+def admission_client_key(fastmcp_context: Optional[Context]) -> str:
+    """
+    Identify the client a tool call counts against for admission quotas.
+
+    Calls carrying a bearer token are keyed by a hash of the token, so one
+    caller's sessions share a quota; other calls are keyed by MCP session.
+    """
+    authorization = get_http_headers(include={"authorization"}).get("authorization")
+    if authorization:
+        return "token:" + hashlib.sha256(authorization.encode()).hexdigest()[:16]
+    if fastmcp_context is not None and fastmcp_context.request_context is not None:
+        return f"session:{fastmcp_context.session_id}"
+    return "anonymous"
+
+class AdmissionMiddleware(Middleware):
+    """
+    Admit tool calls through an AdmissionController; rejected calls fail fast with a retry-after hint.
+
+    Queued metadata tool calls are admitted ahead of queued queries.
+    """
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+
+    async def on_call_tool(self, context, call_next):
+        client = admission_client_key(context.fastmcp_context)
+        priority = Lane.values().index(tool_lane(context.message.name))
+        try:
+            await self.controller.acquire(client, priority)
+        except AdmissionRejected as e:
+            logger.warning(
+                "Tool call rejected by admission control",
+                tool=context.message.name,
+                reason=e.reason,
+                retry_after_seconds=e.retry_after
+            )
+            raise ToolError(str(e)) from e
+        try:
+            return await call_next(context)
+        finally:
+            self.controller.release(client)
+
+_admission_controller: Optional[AdmissionController] = None
+
+def admission_control_configured() -> bool:
+    """Check whether any global or per-client admission limit is set."""
+    return bool(config.admission_max_in_flight or config.client_max_in_flight or config.client_rate_per_second)
+
+def enable_admission_control() -> AdmissionController:
+    """Put the configured admission limits in front of every MCP tool call."""
+    global _admission_controller
+    _admission_controller = AdmissionController(
+        max_in_flight=config.admission_max_in_flight,
+        max_queue=config.admission_max_queue,
+        queue_timeout=config.admission_queue_timeout_seconds,
+        client_max_in_flight=config.client_max_in_flight,
+        client_rate=config.client_rate_per_second,
+        client_burst=config.client_burst
+    )
+    mcp.add_middleware(AdmissionMiddleware(_admission_controller))
+    return _admission_controller
+
+def enable_tracing() -> bool:
+    """Create OpenTelemetry spans for tool calls, client acquisition, Kusto requests and formatting."""
+    if not configure_tracing():
+        return False
+    mcp.add_middleware(ToolTracingMiddleware())
+    return True
+
+async def metrics_endpoint(request) -> Response:
+    """Serve the metrics in the Prometheus text exposition format."""
+    return Response(_metrics.render(), media_type=CONTENT_TYPE)
+
+def enable_metrics(path: str = "/metrics") -> None:
+    """Record per-tool metrics and serve all metrics at ``path`` on the HTTP transport."""
+    mcp.add_middleware(ToolMetricsMiddleware())
+    mcp.custom_route(path, methods=["GET"], include_in_schema=False)(metrics_endpoint)
+
+def build_request_properties(max_rows: Optional[int] = None, max_bytes: Optional[int] = None) -> Optional["ClientRequestProperties"]:
+    """
+    Build Kusto request properties that make the cluster enforce result limits.
+
+    One extra record beyond max_rows is requested so that truncation can be
+    detected from the row count. Partial query failures are deferred so that a
+    truncated result is returned instead of raised.
+
+    Returns:
+        ClientRequestProperties, or None when no limit or timeout applies
+    """
+    if max_rows is None and max_bytes is None and config.server_timeout_seconds is None:
+        return None
+
+    _load_azure_sdk()
+    properties = ClientRequestProperties()
+    if max_rows is not None or max_bytes is not None:
+        properties.set_option(ClientRequestProperties.results_defer_partial_query_failures_option_name, True)
+    if max_rows is not None:
+        properties.set_option("truncationmaxrecords", max_rows + 1)
+    if max_bytes is not None:
+        properties.set_option("truncationmaxsize", max_bytes)
+    if config.server_timeout_seconds is not None:
+        properties.set_option(ClientRequestProperties.request_timeout_option_name, timedelta(seconds=config.server_timeout_seconds))
+    return properties
 
 def format_query_results(result_set) -> List[Dict[str, Any]]:
     """
     Format Kusto query results into a list of dictionaries.
 
+    Values are kept as Kusto returned them, so they are JSON-native:
+    datetimes are ISO 8601 strings with 100ns precision, timespans use the
+    Kusto ``[d.]hh:mm:ss[.fffffff]`` form, and decimals and GUIDs are strings.
+
     Args:
         result_set: Raw result set from KustoClient
 
@@ -153,15 +1417,16 @@ def format_query_results(result_set) -> List[Dict[str, Any]]:
     try:
         primary_result = result_set.primary_results[0]
         columns = [col.column_name for col in primary_result.columns]
+        # Raw rows hold the values as Kusto sent them; the SDK's typed rows would parse every
+        # datetime, timespan and decimal only for them to be serialized back to strings
+        converters = column_converters([col.column_type for col in primary_result.columns])
 
-        formatted_results = []
-        for row in primary_result.rows:
-            record = {}
-            for i, value in enumerate(row):
-                record[columns[i]] = value
-            formatted_results.append(record)
+        if converters:
+            formatted_results = [dict(zip(columns, _convert_row(row, converters))) for row in primary_result.raw_rows]
+        else:
+            formatted_results = [dict(zip(columns, row)) for row in primary_result.raw_rows]
 
-        logger.debug("Query results formatted", row_count=len(formatted_results), columns=columns)
+        logger.debug("Query results formatted", row_count=len(formatted_results), column_count=len(columns))
         return formatted_results
     except Exception as e:
         logger.error(
@@ -171,6 +1436,552 @@ def format_query_results(result_set) -> List[Dict[str, Any]]:
         )
         raise
 
+def format_query_results_columnar(result_set) -> Dict[str, Any]:
+    """
+    Format Kusto query results as a column list plus one array per row.
+
+    Rows are taken straight from the raw response, so column names are not
+    repeated per row and no per-row dictionaries are allocated.
+
+    Args:
+        result_set: Raw result set from KustoClient
+
+    Returns:
+        Dictionary with "columns" (name and Kusto type) and "rows" (value arrays)
+    """
+    if not result_set or not result_set.primary_results:
+        logger.debug("Empty or null result set received")
+        return {"columns": [], "rows": []}
+
+    primary_result = result_set.primary_results[0]
+    return {
+        "columns": [{"name": col.column_name, "type": col.column_type} for col in primary_result.columns],
+        "rows": primary_result.raw_rows,
+    }
+
+def _delimited_value_converter(column_type: str):
+    """Pick a per-column converter for values that csv.writer does not render as Kusto does."""
+    if column_type == "bool":
+        return lambda value: value if value is None else str(value).lower()
+    if column_type == "dynamic":
+        return lambda value: value if value is None or isinstance(value, str) else json.dumps(value, separators=(",", ":"))
+    return None
+
+def format_query_results_delimited(result_set, delimiter: str = ",") -> str:
+    """
+    Format Kusto query results as CSV/TSV text with a header row.
+
+    Args:
+        result_set: Raw result set from KustoClient
+        delimiter: Field delimiter ("," for CSV, "\t" for TSV)
+
+    Returns:
+        Delimited text, or an empty string for an empty result set
+    """
+    if not result_set or not result_set.primary_results:
+        logger.debug("Empty or null result set received")
+        return ""
+
+    primary_result = result_set.primary_results[0]
+    converters = [
+        (index, converter)
+        for index, converter in enumerate(_delimited_value_converter(col.column_type) for col in primary_result.columns)
+        if converter is not None
+    ]
+    rows = primary_result.raw_rows
+    if converters:
+        rows = (_convert_row(row, converters) for row in rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter, lineterminator="\n")
+    writer.writerow([col.column_name for col in primary_result.columns])
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+def _convert_row(row: list, converters) -> list:
+    """Apply the per-column converters to a copy of a raw row."""
+    row = list(row)
+    for index, converter in converters:
+        row[index] = converter(row[index])
+    return row
+
+def format_results(result_set, output_format: str = OutputFormat.RECORDS.value) -> Union[List[Dict[str, Any]], Dict[str, Any], str]:
+    """Format Kusto query results in the requested output format."""
+    started = time.perf_counter()
+    with span("kusto.format_results", {"adx.output_format": output_format}) as current_span:
+        if output_format == OutputFormat.COLUMNAR.value:
+            results = format_query_results_columnar(result_set)
+        elif output_format == OutputFormat.CSV.value:
+            results = format_query_results_delimited(result_set, ",")
+        elif output_format == OutputFormat.TSV.value:
+            results = format_query_results_delimited(result_set, "\t")
+        else:
+            results = format_query_results(result_set)
+        row_count = _result_row_count(results)
+        current_span.set_attribute("adx.row_count", row_count)
+    _format_seconds.observe(time.perf_counter() - started, output_format)
+    _result_rows.observe(row_count)
+    return results
+
+def _result_row_count(results: Union[List[Dict[str, Any]], Dict[str, Any], str]) -> int:
+    """Count the rows in a formatted result for logging."""
+    if isinstance(results, str):
+        return max(results.count("\n") - 1, 0)
+    if isinstance(results, dict):
+        return len(results.get("rows", []))
+    return len(results)
+
+class _PageTable:
+    """One page of a stored primary result, shaped like the SDK's KustoResultTable."""
+
+    def __init__(self, columns: list, raw_rows: list):
+        self.columns = columns
+        self.raw_rows = raw_rows
+
+class _PageResultSet:
+    """Result-set view over a single page, accepted by every formatter."""
+
+    def __init__(self, columns: list, raw_rows: list):
+        self.primary_results = [_PageTable(columns, raw_rows)]
+
+@dataclass
+class _StoredResult:
+    """A query result held server-side while its pages are fetched."""
+    columns: list
+    raw_rows: list
+    output_format: str
+
+_result_store: Optional[TTLCache] = None
+
+def get_result_store() -> TTLCache:
+    """Get the bounded, TTL-evicted store of paginated results, creating it on first use."""
+    global _result_store
+    if _result_store is None:
+        _result_store = TTLCache(config.result_store_max_entries, config.result_store_ttl_seconds)
+    return _result_store
+
+def _encode_cursor(result_id: str, offset: int, page_size: int) -> str:
+    """Encode an opaque pagination cursor."""
+    payload = json.dumps({"id": result_id, "offset": offset, "size": page_size}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def _decode_cursor(cursor: str) -> tuple[str, int, int]:
+    """Decode a pagination cursor into (result_id, offset, page_size)."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        result_id, offset, page_size = payload["id"], int(payload["offset"]), int(payload["size"])
+    except (binascii.Error, ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError("Invalid cursor. Use the next_cursor value returned by execute_query or fetch_page.")
+    if offset < 0 or page_size <= 0:
+        raise ValueError("Invalid cursor. Use the next_cursor value returned by execute_query or fetch_page.")
+    return result_id, offset, page_size
+
+def _format_page(result_id: str, stored: _StoredResult, offset: int, page_size: int) -> Dict[str, Any]:
+    """Format one page of a stored result and build the cursor for the next one."""
+    page_rows = stored.raw_rows[offset:offset + page_size]
+    next_offset = offset + len(page_rows)
+    if next_offset < len(stored.raw_rows):
+        next_cursor = _encode_cursor(result_id, next_offset, page_size)
+    else:
+        # Last page served: free the stored rows instead of waiting for the TTL
+        next_cursor = None
+        get_result_store().pop(result_id)
+
+    return {
+        "results": format_results(_PageResultSet(stored.columns, page_rows), stored.output_format),
+        "row_count": len(stored.raw_rows),
+        "offset": offset,
+        "next_cursor": next_cursor,
+    }
+
+def paginate_results(result_set, output_format: str, page_size: int) -> Dict[str, Any]:
+    """
+    Return the first page of a result and keep the remainder for fetch_page.
+
+    Args:
+        result_set: Raw result set from KustoClient
+        output_format: Output format applied to every page
+        page_size: Maximum number of rows per page
+
+    Returns:
+        Dictionary with the formatted page ("results"), the total "row_count",
+        the page "offset" and a "next_cursor" (None on the last page)
+    """
+    if result_set and result_set.primary_results:
+        primary_result = result_set.primary_results[0]
+        stored = _StoredResult(primary_result.columns, primary_result.raw_rows, output_format)
+    else:
+        stored = _StoredResult([], [], output_format)
+
+    result_id = secrets.token_urlsafe(16)
+    if len(stored.raw_rows) > page_size:
+        get_result_store().set(result_id, stored)
+    return _format_page(result_id, stored, 0, page_size)
+
+_TRUNCATION_ERROR_CODE = "E_QUERY_RESULT_SET_TOO_LARGE"
+
+def raise_partial_failures(errors: List[str]) -> bool:
+    """
+    Raise the deferred partial query failures of a response, except truncation.
+
+    Returns:
+        Whether the result was truncated by a result-set-too-large failure
+    """
+    failures = [error for error in errors if _TRUNCATION_ERROR_CODE not in error]
+    if failures:
+        _load_azure_sdk()
+        raise KustoServiceError(failures if len(failures) > 1 else failures[0])
+    return len(errors) > 0
+
+def limit_results(result_set, max_rows: Optional[int]) -> tuple[Any, Dict[str, Any]]:
+    """
+    Apply max_rows to a result fetched with build_request_properties and report truncation.
+
+    Truncation is detected from the extra record requested beyond max_rows or
+    from a deferred result-set-too-large failure (e.g. max_bytes). Any other
+    deferred partial failure is raised.
+
+    Returns:
+        Tuple of (result set to format, {"truncated", "total_row_count"}); the
+        total row count is None when the result was truncated
+    """
+    if not result_set or not result_set.primary_results:
+        return result_set, {"truncated": False, "total_row_count": 0}
+
+    truncated = raise_partial_failures(result_set.get_exceptions())
+
+    primary_result = result_set.primary_results[0]
+    raw_rows = primary_result.raw_rows
+    if max_rows is not None and len(raw_rows) > max_rows:
+        truncated = True
+        result_set = _PageResultSet(primary_result.columns, raw_rows[:max_rows])
+
+    return result_set, {"truncated": truncated, "total_row_count": None if truncated else len(raw_rows)}
+
+_metadata_cache: Optional[TTLCache] = None
+
+def get_metadata_cache() -> Optional[TTLCache]:
+    """Get the metadata cache, creating it on first use. Returns None when caching is disabled."""
+    global _metadata_cache
+    if _metadata_cache is None and config.metadata_cache_ttl_seconds > 0:
+        _metadata_cache = TTLCache(config.metadata_cache_max_entries, config.metadata_cache_ttl_seconds)
+    return _metadata_cache
+
+def _metadata_cache_key(kind: str, table_name: Optional[str] = None) -> tuple:
+    """Build a metadata cache key scoped to the current cluster and database."""
+    target = current_target()
+    return (kind, target.cluster_url, target.database, table_name)
+
+async def _get_metadata(kind: str, query: str, table_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Run a metadata query, answering from the metadata cache when possible."""
+    cache = get_metadata_cache()
+    key = _metadata_cache_key(kind, table_name)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug("Metadata cache hit", kind=kind, table_name=table_name)
+            return cached
+
+    result_set = await _run_query(current_target().database, query, lane=Lane.METADATA.value)
+    results = format_query_results(result_set)
+    if cache is not None:
+        cache.set(key, results)
+    return results
+
+# Last catalog seen per target, reused while the schema version is unchanged
+_known_catalogs: Dict[QueryTarget, SchemaCatalog] = {}
+
+
+def load_persisted_catalog() -> Optional[SchemaCatalog]:
+    """
+    Load the persisted schema catalog of the configured database, if any.
+
+    The catalog becomes the known catalog for version checks; it is not
+    trusted for lookups until a version probe confirms it is current.
+    """
+    target = current_target()
+    if not config.schema_cache_dir or not target.cluster_url or not target.database:
+        return None
+    path = catalog_file_path(config.schema_cache_dir, target.cluster_url, target.database)
+    started = time.monotonic()
+    try:
+        catalog = load_catalog(path, target.cluster_url, target.database)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring persisted schema catalog", path=path, error=str(e), exception_type=type(e).__name__)
+        return None
+    if catalog is not None:
+        _known_catalogs[target] = catalog
+        logger.info(
+            "Schema catalog loaded from disk",
+            path=path,
+            table_count=len(catalog.tables),
+            version=catalog.version,
+            duration_ms=round((time.monotonic() - started) * 1000, 2)
+        )
+    return catalog
+
+def _persist_catalog(catalog: SchemaCatalog) -> None:
+    """Write a freshly fetched catalog to the schema cache directory, if configured."""
+    if not config.schema_cache_dir:
+        return
+    target = current_target()
+    path = catalog_file_path(config.schema_cache_dir, target.cluster_url, target.database)
+    try:
+        save_catalog(path, target.cluster_url, catalog)
+    except OSError as e:
+        logger.warning("Failed to persist schema catalog", path=path, error=str(e), exception_type=type(e).__name__)
+
+async def _probe_schema_version() -> Optional[str]:
+    """Return the current schema version of the configured database, or None if it cannot be read."""
+    try:
+        result_set = await _run_query(current_target().database, SCHEMA_VERSION_QUERY, lane=Lane.METADATA.value)
+        return str(result_set.primary_results[0].raw_rows[0][0])
+    except Exception as e:
+        logger.warning("Schema version probe failed", error=str(e), exception_type=type(e).__name__)
+        return None
+
+async def get_schema_catalog(refresh: bool = False) -> SchemaCatalog:
+    """
+    Get the schema catalog of the configured database.
+
+    The catalog is kept in the metadata cache, so it shares its TTL and
+    invalidation. On a cache miss, a known catalog (from an earlier fetch or
+    from disk) is revalidated with a cheap schema version probe; only when the
+    version changed is the full catalog fetched with a single
+    ``.show database schema as json`` call and persisted.
+
+    Args:
+        refresh: Fetch a new catalog even if one is cached or known
+    """
+    cache = get_metadata_cache()
+    key = _metadata_cache_key("catalog")
+    if cache is not None and not refresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    target = current_target()
+    known = None if refresh else _known_catalogs.get(target)
+    if known is not None and known.version and await _probe_schema_version() == known.version:
+        logger.debug("Schema catalog is current", version=known.version)
+        catalog = known
+    else:
+        result_set = await _run_query(target.database, SCHEMA_QUERY, lane=Lane.METADATA.value)
+        if not result_set or not result_set.primary_results or not result_set.primary_results[0].raw_rows:
+            raise ValueError("Empty response to database schema query")
+        catalog = SchemaCatalog.from_schema_json(target.database, result_set.primary_results[0].raw_rows[0][0])
+        logger.info("Schema catalog loaded", database=target.database, table_count=len(catalog.tables), version=catalog.version)
+        _known_catalogs[target] = catalog
+        _persist_catalog(catalog)
+
+    if cache is not None:
+        cache.set(key, catalog)
+        cache.pop(_metadata_cache_key("catalog_unavailable"))
+    return catalog
+
+async def _revalidate_schema_catalog() -> None:
+    """Bring a catalog loaded from disk up to date in the background after startup."""
+    try:
+        await get_schema_catalog()
+    except Exception as e:
+        logger.warning("Schema catalog warm-up failed", error=str(e), exception_type=type(e).__name__)
+
+async def _catalog_for_lookup() -> Optional[SchemaCatalog]:
+    """
+    Get the schema catalog for answering per-table tools, or None to query per table.
+
+    The catalog is only used while the metadata cache is enabled. If it cannot
+    be loaded, that is remembered for the cache TTL so each call does not pay
+    for a failing catalog query before its own.
+    """
+    cache = get_metadata_cache()
+    if cache is None or cache.get(_metadata_cache_key("catalog_unavailable")):
+        return None
+    try:
+        return await get_schema_catalog()
+    except Exception as e:
+        logger.warning(
+            "Schema catalog unavailable, falling back to per-table queries",
+            error=str(e),
+            exception_type=type(e).__name__
+        )
+        cache.set(_metadata_cache_key("catalog_unavailable"), True)
+        return None
+
+def invalidate_metadata_cache(table_name: Optional[str] = None) -> int:
+    """
+    Invalidate cached metadata.
+
+    Args:
+        table_name: Only drop the schema and details of this table (and the
+            table list); None drops every entry
+
+    Returns:
+        Number of entries removed
+    """
+    cache = get_metadata_cache()
+    if cache is None:
+        return 0
+    if table_name is None:
+        removed = cache.clear()
+    else:
+        keys = [
+            _metadata_cache_key("tables"),
+            _metadata_cache_key("catalog"),
+            _metadata_cache_key("catalog_unavailable"),
+            _metadata_cache_key("schema", table_name),
+            _metadata_cache_key("details", table_name),
+            _metadata_cache_key("table_stats"),
+        ]
+        removed = sum(1 for key in keys if cache.pop(key) is not None)
+    logger.info("Metadata cache invalidated", table_name=table_name, removed=removed)
+    return removed
+
+_query_cache: Optional[TTLCache] = None
+
+def get_query_cache() -> Optional[TTLCache]:
+    """Get the execute_query result cache, creating it on first use. Returns None when caching is disabled."""
+    global _query_cache
+    if _query_cache is None and config.query_cache_ttl_seconds > 0:
+        _query_cache = TTLCache(config.query_cache_max_entries, config.query_cache_ttl_seconds, config.query_cache_max_bytes)
+    return _query_cache
+
+# String literals are kept verbatim; runs of whitespace and // comments outside them collapse to one space
+_QUERY_TOKEN_PATTERN = re.compile(
+    r"""(```.*?```|@'[^']*'|@"[^"]*"|'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")|((?:\s|//[^\n]*)+)""",
+    re.DOTALL
+)
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a KQL query for use as a cache key.
+
+    Comments are removed and whitespace is collapsed outside of string
+    literals, so formatting-only differences map to the same key.
+    """
+    return _QUERY_TOKEN_PATTERN.sub(lambda match: match.group(1) or " ", query).strip()
+
+def _query_cache_key(database: str, query: str, properties: Optional["ClientRequestProperties"]) -> tuple:
+    """Build a query cache key from the target, the normalized query and the request options."""
+    return (current_target().cluster_url, database, normalize_query(query), properties.to_json() if properties else None)
+
+def _estimate_result_size(result_set) -> int:
+    """Estimate the in-memory size in bytes of a result set's primary result rows."""
+    if not result_set or not result_set.primary_results:
+        return 0
+    size = 0
+    for table in result_set.primary_results:
+        for row in table.raw_rows:
+            size += sys.getsizeof(row) + sum(map(sys.getsizeof, row))
+    return size
+
+_single_flight: Optional[SingleFlight] = None
+
+def get_single_flight() -> SingleFlight:
+    """Get the coalescer that deduplicates identical concurrent queries, creating it on first use."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
+
+async def _run_cached_query(database: str, query: str, properties: Optional["ClientRequestProperties"] = None, use_cache: bool = True):
+    """
+    Run a query through the result cache and in-flight coalescing.
+
+    Identical concurrent queries (same target, normalized query and request
+    options) share one call to the cluster. Results are stored in the query
+    cache within its byte budget; use_cache=False skips the cache lookup.
+    Management commands bypass both, since they may have side effects.
+    """
+    if query.lstrip().startswith("."):
+        return await _run_query(database, query, properties)
+
+    key = _query_cache_key(database, query, properties)
+    cache = get_query_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug("Query cache hit", database=database)
+            return cached
+
+    result_set = await get_single_flight().run(key, _run_query, database, query, properties)
+    if cache is not None:
+        size = _estimate_result_size(result_set)
+        if not cache.set(key, result_set, size):
+            logger.debug("Query result too large to cache", size_bytes=size, max_bytes=cache.max_bytes)
+    return result_set
+
+async def estimate_query(query: str) -> Optional[CostEstimate]:
+    """
+    Estimate what a query would scan from the cached ``.show tables details`` statistics.
+
+    Returns None when no estimate is possible: for management commands,
+    queries that reference no table of the database, or when the statistics
+    cannot be loaded.
+    """
+    if query.lstrip().startswith("."):
+        return None
+    try:
+        rows = await _get_metadata("table_stats", TABLE_STATS_QUERY)
+    except Exception as e:
+        logger.warning("Table statistics unavailable, skipping query preflight", error=str(e), exception_type=type(e).__name__)
+        return None
+    stats = {row["TableName"]: TableStats.from_row(row) for row in rows}
+    return estimate_query_cost(query, stats, datetime.now(timezone.utc))
+
+async def preflight_query(query: str) -> tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Check a query's estimated scan against ADX_PREFLIGHT_MAX_SCAN_BYTES.
+
+    Returns:
+        The query to run, with a take added when it was limited, and the
+        estimate to return to the caller when the budget was exceeded
+
+    Raises:
+        ValueError: If the query is over the budget and ADX_PREFLIGHT_ACTION is
+            "reject", or is "limit" but a take would not lower the scan
+    """
+    estimate = await estimate_query(query)
+    budget = config.preflight_max_scan_bytes
+    if estimate is None:
+        _preflight_checks.inc(1, "skipped")
+        return query, None
+    if estimate.bytes <= budget:
+        _preflight_checks.inc(1, "passed")
+        return query, None
+
+    preflight = {**estimate.to_dict(), "budget_bytes": budget}
+    tables = [table.table for table in estimate.tables]
+    limited = None
+    if config.preflight_action == PreflightAction.LIMIT.value:
+        limited = limit_query(query, config.preflight_limit_rows, tables)
+    if limited is None:
+        _preflight_checks.inc(1, "rejected")
+        logger.warning("Query rejected by preflight", estimated_bytes=estimate.bytes, budget_bytes=budget, tables=tables)
+        hint = "" if config.preflight_action == PreflightAction.REJECT.value else (
+            " It cannot be limited to fewer rows because a take would not stop its scan early"
+            " (it aggregates, sorts or joins, or does not read a table directly)."
+        )
+        raise ValueError(
+            f"Query rejected: it would scan an estimated {estimate.bytes} bytes in {estimate.extents} extents "
+            f"of {', '.join(tables)}, over the budget of {budget} bytes.{hint} Add or narrow a time filter "
+            f"(e.g. '| where Timestamp > ago(1d)') or query fewer tables. Estimate: {dumps(preflight)}"
+        )
+    _preflight_checks.inc(1, "limited")
+    logger.info("Query limited by preflight", estimated_bytes=estimate.bytes, budget_bytes=budget, max_rows=config.preflight_limit_rows, tables=tables)
+    preflight["limited_to_rows"] = config.preflight_limit_rows
+    return limited, preflight
+
+def invalidate_query_cache() -> int:
+    """Drop every cached query result. Returns the number of entries removed."""
+    cache = get_query_cache()
+    return cache.clear() if cache is not None else 0
+
+def _is_schema_changing_command(query: str) -> bool:
+    """Check whether a query is a management command that may change table metadata."""
+    query = query.lstrip()
+    return query.startswith(".") and not query.startswith(".show")
+
 _TABLE_NAME_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*(\.[a-zA-Z_][a-zA-Z0-9_]*)*$')
 
 def validate_table_name(table_name: str) -> str:
@@ -196,115 +2007,521 @@ def validate_sample_size(sample_size: int) -> int:
         raise ValueError(f"sample_size must be a positive integer, got: {sample_size}")
     return sample_size
 
-@mcp.tool(description="Executes a Kusto Query Language (KQL) query against the configured Azure Data Explorer database and returns the results as a list of dictionaries.")
-async def execute_query(query: str) -> List[Dict[str, Any]]:
+def validate_page_size(page_size: Optional[int]) -> Optional[int]:
+    """Validate page_size is either None (no pagination) or a positive integer."""
+    if page_size is not None and (not isinstance(page_size, int) or page_size <= 0):
+        raise ValueError(f"page_size must be a positive integer, got: {page_size}")
+    return page_size
+
+def validate_limit(name: str, value: Optional[int]) -> Optional[int]:
+    """Validate an optional result limit is either None or a positive integer."""
+    if value is not None and (not isinstance(value, int) or value <= 0):
+        raise ValueError(f"{name} must be a positive integer, got: {value}")
+    return value
+
+def validate_queries(queries: List[str]) -> List[str]:
+    """Validate a batch is a non-empty list of non-empty queries within ADX_BATCH_MAX_QUERIES."""
+    if not isinstance(queries, list) or not queries:
+        raise ValueError("queries must be a non-empty list of KQL queries")
+    if len(queries) > config.batch_max_queries:
+        raise ValueError(f"A batch may contain at most {config.batch_max_queries} queries, got: {len(queries)}")
+    for index, query in enumerate(queries):
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError(f"Query at index {index} must be a non-empty string")
+    return queries
+
+def validate_export_format(export_format: str) -> str:
+    """Validate export_format is one of the supported export file formats."""
+    if export_format not in ExportFormat.values():
+        raise ValueError(
+            f"Invalid export_format: '{export_format}'. "
+            f"Supported formats: {', '.join(ExportFormat.values())}"
+        )
+    return export_format
+
+_EXPORT_FILE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+def export_file_path(file_name: Optional[str], export_format: str) -> str:
+    """
+    Resolve the file an export is written to inside ADX_EXPORT_DIR.
+
+    Without a file name, a unique one is generated. A given name must be a plain
+    file name (no directories); the format's extension is added if missing.
+    The name is reserved by creating an empty file exclusively, so existing
+    files, and exports running at the same time, are never overwritten; the
+    caller removes the reservation if the export does not complete.
+
+    Raises:
+        ValueError: If exports are disabled, the file name is not allowed or
+            the file already exists
+    """
+    if not config.export_dir:
+        raise ValueError("export_query is disabled. Set ADX_EXPORT_DIR to the directory export files are written to.")
+    extension = FILE_EXTENSIONS[export_format]
+    if file_name is None:
+        file_name = f"export-{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}{extension}"
+    elif not _EXPORT_FILE_NAME.match(file_name):
+        raise ValueError(f"Invalid file_name: '{file_name}'. Use letters, digits, '.', '_' and '-' only, without directories.")
+    elif not file_name.endswith(extension):
+        file_name += extension
+    os.makedirs(config.export_dir, exist_ok=True)
+    path = os.path.join(os.path.abspath(config.export_dir), file_name)
+    try:
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+    except FileExistsError:
+        raise ValueError(f"Export file '{os.path.basename(path)}' already exists. Choose another file_name, or omit it to have a unique name generated.") from None
+    return path
+
+def validate_output_format(output_format: str) -> str:
+    """Validate output_format is one of the supported result formats."""
+    if output_format not in OutputFormat.values():
+        raise ValueError(
+            f"Invalid output_format: '{output_format}'. "
+            f"Supported formats: {', '.join(OutputFormat.values())}"
+        )
+    return output_format
+
+class EncodedResultTool(FunctionTool):
+    """
+    A tool whose text content is encoded by ``serialization.dumps``.
+
+    fastmcp's default conversion walks a result with pydantic several times to
+    build the text content and the structured content. Tool results here are
+    already JSON-native, so the text is encoded directly (with orjson when
+    installed) and the result is passed through as the structured content,
+    which pydantic still serializes once with the rest of the response.
+    """
+
+    def convert_result(self, raw_value: Any) -> ToolResult:
+        if not isinstance(raw_value, (dict, list, str)):
+            return super().convert_result(raw_value)
+        content = [TextContent(type="text", text=raw_value if isinstance(raw_value, str) else dumps(raw_value))]
+        if self.output_schema is None:
+            return ToolResult(content=content, structured_content=raw_value if isinstance(raw_value, dict) else None)
+        wrap_result = self.output_schema.get("x-fastmcp-wrap-result")
+        return ToolResult(
+            content=content,
+            structured_content={"result": raw_value} if wrap_result else raw_value,
+            meta={"fastmcp": {"wrap_result": True}} if wrap_result else None
+        )
+
+def result_tool(description: str):
+    """Register the decorated function as an MCP tool that returns its result pre-encoded."""
+    def register(fn):
+        mcp.add_tool(EncodedResultTool.from_function(fn, description=description))
+        return fn
+    return register
+
+_TARGET_DESCRIPTION = " Optional cluster (URL or short name) and database arguments run the call against another allowed cluster or database instead of the configured default."
+
+@result_tool(description="Executes a Kusto Query Language (KQL) query against the configured Azure Data Explorer database. The output_format parameter selects the result shape: 'records' (default, list of dictionaries), 'columnar' (column list plus row arrays), 'csv' or 'tsv' (delimited text with a header row). Prefer 'columnar' or 'csv' for wide or large results. Set page_size to receive only the first page plus a next_cursor for fetch_page. Set max_rows and/or max_bytes to have the cluster stop producing data at that limit; the response then wraps the results with a truncated flag and the total_row_count when known. When the server's query cache is enabled, repeated queries are answered from it; set use_cache to false to force a fresh read. When the server has a scan budget, queries estimated to scan more are rejected with the estimate, or limited to a number of rows with the estimate under 'preflight'; add a time filter to stay within it." + _TARGET_DESCRIPTION)
+async def execute_query(
+    query: str,
+    output_format: str = "records",
+    page_size: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    use_cache: bool = True,
+    cluster: Optional[str] = None,
+    database: Optional[str] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any], str]:
     """Execute a KQL query against the configured ADX database."""
-    logger.info("Executing KQL query", database=config.database, query_preview=query[:100])
+    target = select_target(cluster, database)
+    output_format = validate_output_format(output_format)
+    page_size = validate_page_size(page_size)
+    max_rows = validate_limit("max_rows", max_rows if max_rows is not None else config.max_rows)
+    max_bytes = validate_limit("max_bytes", max_bytes if max_bytes is not None else config.max_bytes)
+    limited = max_rows is not None or max_bytes is not None
+    logger.info("Executing KQL query", database=target.database, query_preview=query[:100], output_format=output_format)
 
-    if not config.cluster_url or not config.database:
+    if not target.cluster_url or not target.database:
         logger.error("Missing ADX configuration")
         raise ValueError("Azure Data Explorer configuration is missing. Please set ADX_CLUSTER_URL and ADX_DATABASE environment variables.")
 
     try:
-        client = get_kusto_client()
-        result_set = client.execute(config.database, query)
-        results = format_query_results(result_set)
-        logger.info("Query executed successfully", row_count=len(results))
+        preflight = None
+        if config.preflight_max_scan_bytes is not None:
+            query, preflight = await preflight_query(query)
+        properties = build_request_properties(max_rows, max_bytes)
+        result_set = await _run_cached_query(target.database, query, properties, use_cache)
+        if _is_schema_changing_command(query):
+            invalidate_metadata_cache()
+            invalidate_query_cache()
+        truncation = None
+        if limited:
+            result_set, truncation = limit_results(result_set, max_rows)
+
+        if page_size is not None:
+            page = paginate_results(result_set, output_format, page_size)
+            if truncation:
+                page.update(truncation)
+            if preflight:
+                page["preflight"] = preflight
+            logger.info("Query executed successfully", row_count=page["row_count"], page_size=page_size, truncated=bool(truncation and truncation["truncated"]))
+            return page
+
+        results = format_results(result_set, output_format)
+        row_count = _result_row_count(results)
+        if truncation or preflight:
+            logger.info("Query executed successfully", row_count=row_count, truncated=bool(truncation and truncation["truncated"]))
+            response = {"results": results, "row_count": row_count, **(truncation or {})}
+            if preflight:
+                response["preflight"] = preflight
+            return response
+        logger.info("Query executed successfully", row_count=row_count)
         return results
     except Exception as e:
         logger.error(
             "Query execution failed",
             error=str(e),
             exception_type=type(e).__name__,
-            database=config.database
+            database=target.database
         )
         raise
 
-@mcp.tool(description="Retrieves a list of all tables available in the configured Azure Data Explorer database, including their names, folders, and database associations.")
-async def list_tables() -> List[Dict[str, Any]]:
+@result_tool(description="Executes several independent KQL queries concurrently and returns one entry per query, in input order. Each entry has the query's index, status ('ok' or 'error'), duration_ms, and either its results or the error message; one failing query does not affect the others. Use this instead of many sequential execute_query calls for small independent queries such as counts per table. output_format, max_rows, max_bytes and use_cache apply to every query as in execute_query." + _TARGET_DESCRIPTION)
+async def execute_queries(
+    queries: List[str],
+    output_format: str = "records",
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    use_cache: bool = True,
+    cluster: Optional[str] = None,
+    database: Optional[str] = None
+) -> Dict[str, Any]:
+    """Execute a batch of KQL queries with bounded parallelism."""
+    queries = validate_queries(queries)
+    output_format = validate_output_format(output_format)
+    validate_limit("max_rows", max_rows)
+    validate_limit("max_bytes", max_bytes)
+    target = select_target(cluster, database)
+    logger.info("Executing query batch", database=target.database, query_count=len(queries), parallelism=config.batch_max_parallelism)
+
+    semaphore = asyncio.Semaphore(config.batch_max_parallelism)
+
+    async def run_one(index: int, query: str) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                results = await execute_query(
+                    query,
+                    output_format=output_format,
+                    max_rows=max_rows,
+                    max_bytes=max_bytes,
+                    use_cache=use_cache,
+                    cluster=cluster,
+                    database=database
+                )
+                entry = {"index": index, "status": "ok", "results": results}
+            except Exception as e:
+                entry = {"index": index, "status": "error", "error": str(e), "exception_type": type(e).__name__}
+            entry["duration_ms"] = round((time.monotonic() - started) * 1000, 2)
+            return entry
+
+    started = time.monotonic()
+    entries = await asyncio.gather(*[run_one(index, query) for index, query in enumerate(queries)])
+    failed = sum(1 for entry in entries if entry["status"] == "error")
+    duration_ms = round((time.monotonic() - started) * 1000, 2)
+    logger.info("Query batch executed", query_count=len(entries), failed=failed, duration_ms=duration_ms)
+    return {"results": entries, "succeeded": len(entries) - failed, "failed": failed, "duration_ms": duration_ms}
+
+@result_tool(description="Fetches the next page of a paginated execute_query result. Pass the next_cursor value returned by execute_query or a previous fetch_page call; the response has the same shape and includes the following next_cursor (null on the last page).")
+async def fetch_page(cursor: str) -> Dict[str, Any]:
+    """Fetch a page of a stored query result."""
+    result_id, offset, page_size = _decode_cursor(cursor)
+    stored = get_result_store().get(result_id)
+    if stored is None:
+        logger.warning("Result cursor expired or unknown", offset=offset)
+        raise ValueError("Cursor has expired or is unknown. Re-run the query with page_size to paginate again.")
+
+    page = _format_page(result_id, stored, offset, page_size)
+    logger.info("Result page fetched", offset=offset, page_size=page_size, row_count=page["row_count"])
+    return page
+
+@result_tool(description="Runs a KQL query and writes its primary result to a Parquet or Arrow IPC file in the server's export directory instead of returning the rows. Returns the file path, format, row_count, size in bytes and the columns with their Kusto and Arrow types, so the file can be read or memory-mapped directly. Use this for results too large to return inline. export_format is 'parquet' (default) or 'arrow' (Arrow IPC file). file_name optionally names the file inside the export directory and must not exist yet; by default a unique name is generated. The cluster's default result size limit is lifted unless max_rows is set. The server's scan budget applies as in execute_query, with any estimate under 'preflight'." + _TARGET_DESCRIPTION)
+async def export_query(
+    query: str,
+    export_format: str = "parquet",
+    file_name: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    cluster: Optional[str] = None,
+    database: Optional[str] = None
+) -> Dict[str, Any]:
+    """Execute a KQL query and write the primary result to a Parquet or Arrow IPC file."""
+    target = select_target(cluster, database)
+    export_format = validate_export_format(export_format)
+    max_rows = validate_limit("max_rows", max_rows)
+    logger.info("Exporting KQL query", database=target.database, query_preview=query[:100], export_format=export_format)
+
+    if not target.cluster_url or not target.database:
+        logger.error("Missing ADX configuration")
+        raise ValueError("Azure Data Explorer configuration is missing. Please set ADX_CLUSTER_URL and ADX_DATABASE environment variables.")
+    path = export_file_path(file_name, export_format)
+
+    properties = build_request_properties(max_rows)
+    if max_rows is None:
+        _load_azure_sdk()
+        properties = properties or ClientRequestProperties()
+        properties.set_option("notruncation", True)
+
+    stop = threading.Event()
+    summary = None
+    _queries_in_flight.inc()
+    try:
+        preflight = None
+        if config.preflight_max_scan_bytes is not None:
+            query, preflight = await preflight_query(query)
+        properties = _with_client_request_id(properties)
+        try:
+            with span("adx.export", {"adx.export_format": export_format}):
+                # Rows are read, converted to Arrow and written on the worker thread as they arrive
+                summary = await get_query_executor().run(
+                    _stream_export, target.database, query, properties, path, export_format, max_rows, stop
+                )
+        except asyncio.CancelledError:
+            cancel_abandoned_request(target.database, properties.client_request_id)
+            raise
+        if max_rows is None:
+            summary.pop("truncated")
+        if preflight:
+            summary["preflight"] = preflight
+        logger.info("Query exported", row_count=summary["row_count"], bytes=summary["bytes"], path=path)
+        return summary
+    except Exception as e:
+        logger.error(
+            "Query export failed",
+            error=str(e),
+            exception_type=type(e).__name__,
+            database=target.database
+        )
+        raise
+    finally:
+        # A cancelled call leaves the worker reading; tell it to stop at the next row
+        stop.set()
+        _queries_in_flight.dec()
+        if summary is None:
+            # Free the name reserved by export_file_path
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _progress_token(ctx: Optional[Context]) -> Any:
+    """Return the progress token of the current MCP request, or None when the client did not send one."""
+    request_context = ctx.request_context if ctx is not None else None
+    if request_context is None or not request_context.meta:
+        return None
+    return request_context.meta.get("progressToken")
+
+@result_tool(description="Executes a KQL query and streams its primary result as MCP progress notifications while the query runs, instead of returning all rows at the end. Each notification's message is a JSON object with the batch number, the rows of that batch as value arrays, and (in the first batch) the columns with their Kusto types; its progress value is the number of rows sent so far. The final response has the columns, row_count, batch_count and a truncated flag. Use this for large results to see the first rows early. batch_size sets the rows per notification. max_bytes has the cluster stop the result at that size; truncated is then set. The cluster's default result size limit is lifted unless max_rows or max_bytes is set. Clients that do not send a progress token receive the rows inline under 'rows'. The server's scan budget applies as in execute_query, with any estimate under 'preflight'." + _TARGET_DESCRIPTION)
+async def execute_streaming_query(
+    query: str,
+    batch_size: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    cluster: Optional[str] = None,
+    database: Optional[str] = None,
+    ctx: Optional[Context] = None
+) -> Dict[str, Any]:
+    """Execute a KQL query and stream the primary result in batches as progress notifications."""
+    target = select_target(cluster, database)
+    batch_size = validate_limit("batch_size", batch_size if batch_size is not None else config.stream_batch_rows)
+    max_rows = validate_limit("max_rows", max_rows if max_rows is not None else config.max_rows)
+    max_bytes = validate_limit("max_bytes", max_bytes if max_bytes is not None else config.max_bytes)
+    streamed = _progress_token(ctx) is not None
+    logger.info("Executing streaming query", database=target.database, query_preview=query[:100], batch_size=batch_size, streamed=streamed)
+
+    if not target.cluster_url or not target.database:
+        logger.error("Missing ADX configuration")
+        raise ValueError("Azure Data Explorer configuration is missing. Please set ADX_CLUSTER_URL and ADX_DATABASE environment variables.")
+
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+    inline_rows: List[list] = []
+    sent = {"batches": 0, "rows": 0}
+
+    def send_batch(columns: List[Dict[str, str]], rows: List[list]) -> None:
+        # Runs on the worker thread; waiting for each notification to be sent
+        # keeps the reader from getting ahead of a slow client
+        if not streamed:
+            inline_rows.extend(rows)
+            return
+        message = {"batch": sent["batches"], "rows": rows}
+        if sent["batches"] == 0:
+            message["columns"] = columns
+        sent["batches"] += 1
+        sent["rows"] += len(rows)
+        asyncio.run_coroutine_threadsafe(ctx.report_progress(progress=sent["rows"], message=dumps(message)), loop).result()
+
+    properties = build_request_properties(max_rows, max_bytes)
+    if max_rows is None and max_bytes is None and streamed:
+        # Only one batch is held at a time, so the cluster's result size limit is not needed
+        _load_azure_sdk()
+        properties = properties or ClientRequestProperties()
+        properties.set_option("notruncation", True)
+
+    _queries_in_flight.inc()
+    try:
+        preflight = None
+        if config.preflight_max_scan_bytes is not None:
+            query, preflight = await preflight_query(query)
+        properties = _with_client_request_id(properties)
+        try:
+            # The reader runs on a worker thread, so it uses the sync client pool even with the async backend
+            summary = await get_query_executor().run(
+                _stream_query, target.database, query, properties, batch_size, max_rows, send_batch, stop
+            )
+        except asyncio.CancelledError:
+            cancel_abandoned_request(target.database, properties.client_request_id)
+            raise
+        summary["streamed"] = streamed
+        if not streamed:
+            summary["rows"] = inline_rows
+        if preflight:
+            summary["preflight"] = preflight
+        _result_rows.observe(summary["row_count"])
+        logger.info("Streaming query completed", row_count=summary["row_count"], batch_count=summary["batch_count"], truncated=summary["truncated"])
+        return summary
+    except Exception as e:
+        logger.error(
+            "Streaming query failed",
+            error=str(e),
+            exception_type=type(e).__name__,
+            database=target.database
+        )
+        raise
+    finally:
+        # A cancelled call leaves the worker reading; tell it to stop at the next row
+        stop.set()
+        _queries_in_flight.dec()
+
+@result_tool(description="Retrieves a list of all tables available in the configured Azure Data Explorer database, including their names, folders, and database associations." + _TARGET_DESCRIPTION)
+async def list_tables(cluster: Optional[str] = None, database: Optional[str] = None) -> List[Dict[str, Any]]:
     """List all tables in the configured ADX database."""
-    logger.info("Listing tables", database=config.database)
+    target = select_target(cluster, database)
+    logger.info("Listing tables", database=target.database)
 
-    if not config.cluster_url or not config.database:
+    if not target.cluster_url or not target.database:
         logger.error("Missing ADX configuration")
         raise ValueError("Azure Data Explorer configuration is missing. Please set ADX_CLUSTER_URL and ADX_DATABASE environment variables.")
 
     try:
-        client = get_kusto_client()
-        query = ".show tables | project TableName, Folder, DatabaseName"
-        result_set = client.execute(config.database, query)
-        results = format_query_results(result_set)
+        catalog = await _catalog_for_lookup()
+        if catalog is not None:
+            results = catalog.list_tables()
+        else:
+            query = ".show tables | project TableName, Folder, DatabaseName"
+            results = await _get_metadata("tables", query)
         logger.info("Tables listed successfully", table_count=len(results))
         return results
     except Exception as e:
         logger.error("Failed to list tables", error=str(e), exception_type=type(e).__name__)
         raise
 
-@mcp.tool(description="Retrieves the schema information for a specified table in the Azure Data Explorer database, including column names, data types, and other schema-related metadata.")
-async def get_table_schema(table_name: str) -> List[Dict[str, Any]]:
+@result_tool(description="Retrieves the schema information for a specified table in the Azure Data Explorer database, including column names, data types, and other schema-related metadata." + _TARGET_DESCRIPTION)
+async def get_table_schema(table_name: str, cluster: Optional[str] = None, database: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get schema information for a specific table."""
+    target = select_target(cluster, database)
     table_name = validate_table_name(table_name)
-    logger.info("Getting table schema", table_name=table_name, database=config.database)
+    logger.info("Getting table schema", table_name=table_name, database=target.database)
 
-    if not config.cluster_url or not config.database:
+    if not target.cluster_url or not target.database:
         logger.error("Missing ADX configuration")
         raise ValueError("Azure Data Explorer configuration is missing. Please set ADX_CLUSTER_URL and ADX_DATABASE environment variables.")
 
     try:
-        client = get_kusto_client()
-        query = f"{table_name} | getschema"
-        result_set = client.execute(config.database, query)
-        results = format_query_results(result_set)
+        catalog = await _catalog_for_lookup()
+        results = catalog.table_schema(table_name) if catalog is not None else None
+        if results is None:
+            # Not a plain table of this database (e.g. a view, function or qualified name)
+            query = f"{table_name} | getschema"
+            results = await _get_metadata("schema", query, table_name)
         logger.info("Schema retrieved successfully", table_name=table_name, column_count=len(results))
         return results
     except Exception as e:
         logger.error("Failed to get table schema", table_name=table_name, error=str(e), exception_type=type(e).__name__)
         raise
 
-@mcp.tool(description="Retrieves a random sample of rows from the specified table in the Azure Data Explorer database. The sample_size parameter controls how many rows to return (default: 10).")
-async def sample_table_data(table_name: str, sample_size: int = 10) -> List[Dict[str, Any]]:
+@result_tool(description="Retrieves a random sample of rows from the specified table in the Azure Data Explorer database. The sample_size parameter controls how many rows to return (default: 10). The output_format parameter accepts 'records' (default), 'columnar', 'csv' or 'tsv'." + _TARGET_DESCRIPTION)
+async def sample_table_data(
+    table_name: str,
+    sample_size: int = 10,
+    output_format: str = "records",
+    cluster: Optional[str] = None,
+    database: Optional[str] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any], str]:
     """Get sample data from a table."""
+    target = select_target(cluster, database)
     table_name = validate_table_name(table_name)
     sample_size = validate_sample_size(sample_size)
-    logger.info("Sampling table data", table_name=table_name, sample_size=sample_size, database=config.database)
+    output_format = validate_output_format(output_format)
+    logger.info("Sampling table data", table_name=table_name, sample_size=sample_size, database=target.database)
 
-    if not config.cluster_url or not config.database:
+    if not target.cluster_url or not target.database:
         logger.error("Missing ADX configuration")
         raise ValueError("Azure Data Explorer configuration is missing. Please set ADX_CLUSTER_URL and ADX_DATABASE environment variables.")
 
     try:
-        client = get_kusto_client()
         query = f"{table_name} | sample {sample_size}"
-        result_set = client.execute(config.database, query)
-        results = format_query_results(result_set)
-        logger.info("Sample data retrieved successfully", table_name=table_name, row_count=len(results))
+        result_set = await _run_query(target.database, query, build_request_properties())
+        results = format_results(result_set, output_format)
+        logger.info("Sample data retrieved successfully", table_name=table_name, row_count=_result_row_count(results))
         return results
     except Exception as e:
         logger.error("Failed to sample table data", table_name=table_name, error=str(e), exception_type=type(e).__name__)
         raise
 
-@mcp.tool(description="Retrieves table details including TotalRowCount, HotExtentSize")
-async def get_table_details(table_name: str) -> List[Dict[str, Any]]:
+@result_tool(description="Retrieves table details including TotalRowCount, HotExtentSize" + _TARGET_DESCRIPTION)
+async def get_table_details(table_name: str, cluster: Optional[str] = None, database: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get detailed statistics and metadata for a table."""
+    target = select_target(cluster, database)
     table_name = validate_table_name(table_name)
-    logger.info("Getting table details", table_name=table_name, database=config.database)
+    logger.info("Getting table details", table_name=table_name, database=target.database)
 
-    if not config.cluster_url or not config.database:
+    if not target.cluster_url or not target.database:
         logger.error("Missing ADX configuration")
         raise ValueError("Azure Data Explorer configuration is missing. Please set ADX_CLUSTER_URL and ADX_DATABASE environment variables.")
 
     try:
-        client = get_kusto_client()
         query = f".show table {table_name} details"
-        result_set = client.execute(config.database, query)
-        results = format_query_results(result_set)
+        results = await _get_metadata("details", query, table_name)
         logger.info("Table details retrieved successfully", table_name=table_name)
         return results
     except Exception as e:
         logger.error("Failed to get table details", table_name=table_name, error=str(e), exception_type=type(e).__name__)
         raise
 
+@result_tool(description="Retrieves the schema of every table in the configured Azure Data Explorer database in a single call: table names, folders, docstrings and ordered columns with their KQL types. Prefer this over calling get_table_schema for many tables. Set refresh to true to bypass the cached catalog." + _TARGET_DESCRIPTION)
+async def get_database_schema(refresh: bool = False, cluster: Optional[str] = None, database: Optional[str] = None) -> Dict[str, Any]:
+    """Get the schema catalog of the configured ADX database."""
+    target = select_target(cluster, database)
+    logger.info("Getting database schema", database=target.database, refresh=refresh)
+
+    if not target.cluster_url or not target.database:
+        logger.error("Missing ADX configuration")
+        raise ValueError("Azure Data Explorer configuration is missing. Please set ADX_CLUSTER_URL and ADX_DATABASE environment variables.")
+
+    try:
+        catalog = await get_schema_catalog(refresh=refresh)
+        logger.info("Database schema retrieved successfully", table_count=len(catalog.tables))
+        return catalog.to_dict()
+    except Exception as e:
+        logger.error("Failed to get database schema", error=str(e), exception_type=type(e).__name__)
+        raise
+
+@result_tool(description="Clears cached table metadata so that list_tables, get_table_schema, get_table_details and get_database_schema fetch fresh data from the cluster. Pass table_name to clear only that table's entries. Returns the number of entries removed and cache hit/miss statistics." + _TARGET_DESCRIPTION)
+async def clear_metadata_cache(table_name: Optional[str] = None, cluster: Optional[str] = None, database: Optional[str] = None) -> Dict[str, Any]:
+    """Invalidate the metadata cache."""
+    select_target(cluster, database)
+    if table_name is not None:
+        table_name = validate_table_name(table_name)
+    removed = invalidate_metadata_cache(table_name)
+    cache = get_metadata_cache()
+    return {"removed": removed, "stats": cache.stats() if cache is not None else None}
+
 
 if __name__ == "__main__":
     print(f"Starting Azure Data Explorer MCP Server...")
+    configure_logging()
+    load_config()
     mcp.run()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Request Coalescing
+Deduplicates identical concurrent queries so only one reaches the cluster.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+import structlog
+
+logger = structlog.get_logger()
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key onto one in-flight task.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still running await the same task instead of starting their own. Each
+    caller awaits through a shield, so cancelling one caller does not cancel
+    the shared call for the others; once every caller has been cancelled,
+    the shared call is cancelled too. The key is released as soon as the call
+    finishes, so later callers always start a fresh call.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Await ``fn(*args)``, sharing the call with concurrent callers using the same ``key``."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+            logger.debug("Coalesced with in-flight call", in_flight=len(self._in_flight))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            remaining = self._waiters.get(task, 1) - 1
+            if remaining > 0:
+                self._waiters[task] = remaining
+            else:
+                self._waiters.pop(task, None)
+                if not task.done():
+                    # No caller is left to receive the result
+                    task.cancel()
+
+    def _release(self, key: Hashable, task: asyncio.Future) -> None:
+        """Forget a finished call and mark its exception as retrieved."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Every caller may have been cancelled; avoid "exception was never retrieved"
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of in-flight, executed and coalesced calls."""
+        return {
+            "in_flight": len(self._in_flight),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
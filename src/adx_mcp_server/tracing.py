@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Azure Data Explorer MCP Server - Tracing
+Optional OpenTelemetry spans around tool calls, client acquisition, Kusto
+requests and result formatting, with a no-op fallback when disabled.
+"""
+
+from typing import Any, Dict, Optional
+
+import structlog
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover - depends on the optional tracing extras
+    trace = None
+
+from adx_mcp_server import __version__
+
+logger = structlog.get_logger()
+
+TRACER_NAME = "adx_mcp_server"
+SERVICE_NAME = "adx-mcp-server"
+
+class _NoOpSpan:
+    """Stands in for a span and its context manager while tracing is disabled."""
+
+    def __enter__(self) -> "_NoOpSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        return None
+
+    def is_recording(self) -> bool:
+        return False
+
+_NOOP_SPAN = _NoOpSpan()
+
+# None while tracing is disabled; span() then costs one global lookup
+_tracer = None
+# Provider created by configure_tracing, flushed by shutdown_tracing
+_owned_provider = None
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Return a context manager that opens a span named ``name`` as the current span.
+
+    Spans nest through context variables, so a span opened in a tool call is
+    the parent of spans opened in the worker thread that runs its query.
+    """
+    if _tracer is None:
+        return _NOOP_SPAN
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+def tracing_enabled() -> bool:
+    """Return True if spans are being created."""
+    return _tracer is not None
+
+def _create_otlp_provider():
+    """Build an SDK tracer provider exporting over OTLP, or None if the SDK or exporter is missing."""
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError as e:
+        logger.warning(
+            "OpenTelemetry SDK or OTLP exporter not installed, spans go to the globally configured provider",
+            error=str(e),
+            install="pip install 'adx_mcp_server[tracing]'"
+        )
+        return None
+    # The exporter reads OTEL_EXPORTER_OTLP_* (endpoint, headers, ...) from the environment
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME, "service.version": __version__}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    return provider
+
+def configure_tracing(tracer_provider: Any = None) -> bool:
+    """
+    Start creating spans.
+
+    Args:
+        tracer_provider: Provider to create spans with. When omitted, an
+            application-wide provider (e.g. from ``opentelemetry-instrument``)
+            is used if one is set; otherwise an OTLP-exporting SDK provider is
+            created when the SDK is installed.
+
+    Returns:
+        bool: True if tracing was enabled, False if OpenTelemetry is not installed
+    """
+    global _tracer, _owned_provider
+    if trace is None:  # pragma: no cover - depends on the optional tracing extras
+        logger.warning("Tracing requested but opentelemetry-api is not installed", install="pip install 'adx_mcp_server[tracing]'")
+        return False
+
+    if tracer_provider is None:
+        tracer_provider = trace.get_tracer_provider()
+        if isinstance(tracer_provider, trace.ProxyTracerProvider):
+            provider = _create_otlp_provider()
+            if provider is not None:
+                trace.set_tracer_provider(provider)
+                tracer_provider = _owned_provider = provider
+    _tracer = tracer_provider.get_tracer(TRACER_NAME, __version__)
+    logger.info("OpenTelemetry tracing enabled", provider=type(tracer_provider).__name__)
+    return True
+
+def shutdown_tracing() -> None:
+    """Stop creating spans and flush spans buffered by a provider this module created."""
+    global _tracer, _owned_provider
+    provider, _owned_provider = _owned_provider, None
+    _tracer = None
+    if provider is not None:
+        provider.shutdown()
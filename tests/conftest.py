@@ -1,9 +1,14 @@
 #!/usr/bin/env python
 
+import dataclasses
 import os
 import sys
 import pytest
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from azure.kusto.data._models import KustoResultTable
 
 # Add the source directory to the path so we can import the modules
 src_dir = Path(__file__).parent.parent / "src"
@@ -13,3 +18,69 @@ sys.path.insert(0, str(src_dir / "adx_mcp_server"))
 # Import server module for direct access
 import adx_mcp_server.server
 
+
+
+@pytest.fixture(autouse=True)
+def reset_server_state():
+    """Give each test empty client registries and stores so server state does not leak between tests."""
+    adx_mcp_server.server._client_registry.close()
+    adx_mcp_server.server._async_client_registry = None
+    adx_mcp_server.server._result_store = None
+    adx_mcp_server.server._metadata_cache = None
+    adx_mcp_server.server._query_cache = None
+    adx_mcp_server.server._single_flight = None
+    adx_mcp_server.server._known_catalogs.clear()
+    adx_mcp_server.server._last_idle_sweep = 0.0
+    adx_mcp_server.server._current_target.set(None)
+    adx_mcp_server.server._reload_caches_on_sighup = False
+    yield
+    adx_mcp_server.server._client_registry.close()
+    adx_mcp_server.server._async_client_registry = None
+
+
+@pytest.fixture
+def make_result_set():
+    """Factory for result sets whose primary result is a real KustoResultTable."""
+    def _make(columns, rows):
+        table = KustoResultTable({
+            "TableName": "PrimaryResult",
+            "Columns": [{"ColumnName": name, "ColumnType": column_type} for name, column_type in columns],
+            "Rows": rows,
+        })
+        result_set = MagicMock()
+        result_set.primary_results = [table]
+        result_set.get_exceptions.return_value = []
+        return result_set
+    return _make
+
+
+@pytest.fixture
+def make_streaming_response():
+    """Factory for fake KustoStreamingResponseDataSets whose primary result yields raw rows one at a time."""
+    def _make(columns, rows, errors=()):
+        table = SimpleNamespace(
+            columns=[SimpleNamespace(column_name=name, column_type=column_type) for name, column_type in columns],
+            raw_rows=iter(rows),
+        )
+        response = MagicMock()
+        response.iter_primary_results.return_value = iter([table])
+        response.get_exceptions.return_value = list(errors)
+        return response
+    return _make
+
+
+@pytest.fixture
+def adx_config():
+    """Point the server config at a test cluster and database over stdio, restoring every field afterwards."""
+    config = adx_mcp_server.server.config
+    original = dataclasses.replace(config)
+    config.cluster_url = "https://testcluster.region.kusto.windows.net"
+    config.database = "testdb"
+    config.mcp_server_config = adx_mcp_server.server.MCPServerConfig(
+        mcp_server_transport="stdio",
+        mcp_bind_host="127.0.0.1",
+        mcp_bind_port=8080
+    )
+    yield config
+    for field in dataclasses.fields(config):
+        setattr(config, field.name, getattr(original, field.name))
@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+"""
+Tests for admission control: global and per-client limits, rate quotas and the wait queue.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+
+from fastmcp import FastMCP
+from fastmcp.client import Client
+from fastmcp.exceptions import ToolError
+
+from adx_mcp_server import server
+from adx_mcp_server.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def _settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def admission_controller():
+    """Reset the server's admission controller after the test."""
+    yield
+    server._admission_controller = None
+
+
+class TestTokenBucket:
+    """Tests for the per-client rate quota."""
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2.0, burst=2, now=0.0)
+
+        assert bucket.take(0.0) == 0
+        assert bucket.take(0.0) == 0
+        assert bucket.take(0.0) == pytest.approx(0.5)
+        assert bucket.take(0.5) == 0
+        assert not bucket.is_full(0.5)
+        assert bucket.is_full(10.0)
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController."""
+
+    @pytest.mark.parametrize("kwargs", [
+        {"max_in_flight": -1}, {"max_queue": -1}, {"client_max_in_flight": 1.5},
+        {"queue_timeout": 0}, {"client_rate": -1.0}, {"client_rate": 1.0, "client_burst": 0},
+    ])
+    def test_invalid_settings(self, kwargs):
+        with pytest.raises(ValueError):
+            AdmissionController(**kwargs)
+
+    @pytest.mark.asyncio
+    async def test_calls_within_limits_are_admitted_at_once(self):
+        controller = AdmissionController(max_in_flight=2)
+
+        await controller.acquire("a")
+        await controller.acquire("b")
+
+        assert controller.stats()["in_flight"] == 2
+        controller.release("a")
+        controller.release("b")
+        assert controller.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_overflow_waits_in_fifo_order(self):
+        controller = AdmissionController(max_in_flight=1)
+        admitted = []
+        await controller.acquire("a")
+
+        async def call(client):
+            await controller.acquire(client)
+            admitted.append(client)
+
+        waiters = [asyncio.create_task(call(client)) for client in ("b", "c")]
+        await _settle()
+        assert controller.stats()["queued"] == 2
+
+        controller.release("a")
+        await _settle()
+        assert admitted == ["b"]
+        controller.release("b")
+        await asyncio.gather(*waiters)
+        assert admitted == ["b", "c"]
+        assert controller.stats()["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_lower_priority_number_is_admitted_first(self):
+        controller = AdmissionController(max_in_flight=1)
+        admitted = []
+        await controller.acquire("a")
+
+        async def call(client, priority):
+            await controller.acquire(client, priority)
+            admitted.append(client)
+
+        waiters = [asyncio.create_task(call(client, priority)) for client, priority in (("q1", 1), ("m1", 0), ("q2", 1), ("m2", 0))]
+        await _settle()
+
+        for client in ("a", "m1", "m2", "q1"):
+            controller.release(client)
+            await _settle()
+        await asyncio.gather(*waiters)
+        assert admitted == ["m1", "m2", "q1", "q2"]
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_skips_the_fast_path_only_behind_its_own_priority(self):
+        controller = AdmissionController(max_in_flight=2, client_max_in_flight=1)
+        await controller.acquire("a")
+        blocked = asyncio.create_task(controller.acquire("a", 1))
+        await _settle()
+
+        # Only a lower-priority call is queued, so this one starts at once
+        await asyncio.wait_for(controller.acquire("b", 0), 1)
+
+        assert controller.stats()["in_flight"] == 2
+        controller.release("a")
+        controller.release("b")
+        await asyncio.wait_for(blocked, 1)
+
+    @pytest.mark.asyncio
+    async def test_client_at_its_limit_does_not_block_others(self):
+        controller = AdmissionController(max_in_flight=3, client_max_in_flight=1)
+        await controller.acquire("greedy")
+
+        second_greedy = asyncio.create_task(controller.acquire("greedy"))
+        await _settle()
+        # Global capacity is free, so another client passes the queued call
+        await asyncio.wait_for(controller.acquire("polite"), 1)
+
+        assert not second_greedy.done()
+        controller.release("greedy")
+        await asyncio.wait_for(second_greedy, 1)
+        assert controller.stats()["in_flight"] == 2
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_rejected_with_retry_after(self):
+        controller = AdmissionController(max_in_flight=1, max_queue=1)
+        await controller.acquire("a")
+        waiter = asyncio.create_task(controller.acquire("b"))
+        await _settle()
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire("c")
+
+        assert excinfo.value.reason == "queue_full"
+        assert excinfo.value.retry_after >= 1
+        assert "Retry after" in str(excinfo.value)
+        controller.release("a")
+        await waiter
+        assert controller.stats()["rejected"]["queue_full"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        controller = AdmissionController(max_in_flight=1, queue_timeout=0.05)
+        await controller.acquire("a")
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire("b")
+
+        assert excinfo.value.reason == "queue_timeout"
+        stats = controller.stats()
+        assert stats["queued"] == 0
+        assert stats["rejected"]["queue_timeout"] == 1
+        assert stats["max_wait_ms"] >= 50
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        controller = AdmissionController(max_in_flight=1)
+        await controller.acquire("a")
+        waiter = asyncio.create_task(controller.acquire("b"))
+        await _settle()
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert controller.stats()["queued"] == 0
+        controller.release("a")
+        assert controller.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waiter_cancelled_after_admission_gives_its_slot_back(self):
+        controller = AdmissionController(max_in_flight=1)
+        await controller.acquire("a")
+        waiter = asyncio.create_task(controller.acquire("b"))
+        await _settle()
+
+        controller.release("a")
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert controller.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limit(self):
+        clock = FakeClock()
+        controller = AdmissionController(client_rate=1.0, client_burst=2, clock=clock)
+
+        for _ in range(2):
+            await controller.acquire("a")
+            controller.release("a")
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire("a")
+        # Other clients have their own bucket
+        await controller.acquire("b")
+
+        assert excinfo.value.reason == "rate_limited"
+        assert excinfo.value.retry_after == 1.0
+        clock.now = 1.0
+        await controller.acquire("a")
+
+    @pytest.mark.asyncio
+    async def test_idle_clients_are_pruned(self):
+        controller = AdmissionController(client_rate=100.0, client_burst=1)
+        with patch('adx_mcp_server.admission._PRUNE_THRESHOLD', 3):
+            for index in range(3):
+                await controller.acquire(f"client-{index}")
+                controller.release(f"client-{index}")
+            await asyncio.sleep(0.05)
+            await controller.acquire("busy")
+
+        assert controller.stats()["clients"] == 1
+
+
+class TestAdmissionMiddleware:
+    """Tests for the middleware, exercised through an in-memory MCP client."""
+
+    @pytest.fixture
+    def gate(self):
+        return asyncio.Event()
+
+    @pytest.fixture
+    def app(self, gate):
+        app = FastMCP("admission-test")
+        app.add_middleware(server.AdmissionMiddleware(AdmissionController(max_in_flight=1, max_queue=0)))
+
+        @app.tool
+        async def slow() -> str:
+            await gate.wait()
+            return "done"
+
+        return app
+
+    @pytest.mark.asyncio
+    async def test_overload_is_rejected_fast(self, app, gate):
+        with patch('adx_mcp_server.server.logger') as mock_logger:
+            async with Client(app) as client:
+                first = asyncio.create_task(client.call_tool("slow", {}))
+                await asyncio.sleep(0.1)
+                with pytest.raises(ToolError, match="queue is full. Retry after"):
+                    await client.call_tool("slow", {})
+                gate.set()
+                assert (await first).data == "done"
+
+        assert mock_logger.warning.call_args.kwargs["reason"] == "queue_full"
+
+    @pytest.mark.asyncio
+    async def test_metadata_tools_are_queued_ahead_of_queries(self, gate):
+        controller = AdmissionController(max_in_flight=1)
+        app = FastMCP("admission-priority-test")
+        app.add_middleware(server.AdmissionMiddleware(controller))
+        priorities = []
+        original_acquire = controller.acquire
+
+        async def acquire(client, priority=0):
+            priorities.append(priority)
+            await original_acquire(client, priority)
+
+        controller.acquire = acquire
+
+        @app.tool
+        async def execute_query() -> str:
+            return "rows"
+
+        @app.tool
+        async def list_tables() -> str:
+            return "tables"
+
+        async with Client(app) as client:
+            await client.call_tool("execute_query", {})
+            await client.call_tool("list_tables", {})
+
+        assert priorities == [1, 0]
+
+    @pytest.mark.asyncio
+    async def test_slot_is_released_after_each_call(self, app, gate):
+        gate.set()
+        async with Client(app) as client:
+            for _ in range(3):
+                assert (await client.call_tool("slow", {})).data == "done"
+
+
+class TestAdmissionClientKey:
+    """Tests for identifying the client a call counts against."""
+
+    def test_bearer_token_is_hashed(self):
+        with patch('adx_mcp_server.server.get_http_headers', return_value={"authorization": "Bearer secret"}):
+            key = server.admission_client_key(None)
+
+        assert key.startswith("token:")
+        assert "secret" not in key
+
+    def test_session(self):
+        context = MagicMock()
+        context.session_id = "abc"
+
+        with patch('adx_mcp_server.server.get_http_headers', return_value={}):
+            assert server.admission_client_key(context) == "session:abc"
+
+    def test_anonymous(self):
+        assert server.admission_client_key(None) == "anonymous"
+
+
+class TestEnableAdmissionControl:
+    """Tests for the server wiring."""
+
+    def test_configured(self, adx_config):
+        assert server.admission_control_configured() is False
+        adx_config.client_rate_per_second = 5.0
+        assert server.admission_control_configured() is True
+
+    def test_enable_registers_middleware_and_metrics(self, adx_config, admission_controller):
+        adx_config.admission_max_in_flight = 4
+        adx_config.client_max_in_flight = 2
+
+        with patch('adx_mcp_server.server.mcp') as mock_mcp:
+            controller = server.enable_admission_control()
+
+        middleware = mock_mcp.add_middleware.call_args.args[0]
+        assert isinstance(middleware, server.AdmissionMiddleware)
+        assert middleware.controller is controller
+        assert controller.max_in_flight == 4
+        assert controller.client_max_in_flight == 2
+        text = server._metrics.render()
+        assert "adx_admission_in_flight 0" in text
+        assert 'adx_admission_rejected_total{reason="queue_full"} 0' in text
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+"""
+Tests for the native asyncio Kusto client backend.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import ANY, patch, MagicMock, AsyncMock
+
+pytest.importorskip("azure.kusto.data.aio")
+
+from azure.core.exceptions import ClientAuthenticationError
+
+from adx_mcp_server import server
+from adx_mcp_server.aio import AsyncKustoClientRegistry
+from adx_mcp_server.server import config, ClientBackend
+
+
+@pytest.fixture
+def mock_aio_sdk(monkeypatch):
+    """Patch the aio SDK constructors used by the async registry."""
+    monkeypatch.delenv('AZURE_TENANT_ID', raising=False)
+    monkeypatch.delenv('AZURE_CLIENT_ID', raising=False)
+    with patch('adx_mcp_server.aio.DefaultAzureCredential') as mock_dac, \
+            patch('adx_mcp_server.aio.KustoConnectionStringBuilder'), \
+            patch('adx_mcp_server.aio.KustoClient') as mock_client, \
+            patch('adx_mcp_server.aio.logger'):
+        mock_dac.return_value = AsyncMock()
+        mock_client.side_effect = lambda kcsb: AsyncMock()
+        yield mock_dac, mock_client
+
+
+@pytest.fixture
+def async_backend():
+    """Select the async backend against a test cluster for the duration of a test."""
+    original = (config.cluster_url, config.database, config.client_backend)
+    config.cluster_url = "https://testcluster.region.kusto.windows.net"
+    config.database = "testdb"
+    config.client_backend = ClientBackend.ASYNC.value
+    yield
+    config.cluster_url, config.database, config.client_backend = original
+
+
+class TestAsyncKustoClientRegistry:
+    """Tests for AsyncKustoClientRegistry."""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused(self, mock_aio_sdk):
+        """The aio client and credential are created once per cluster."""
+        mock_dac, mock_client = mock_aio_sdk
+        registry = AsyncKustoClientRegistry()
+
+        first = await registry.get_client("https://a.kusto.windows.net")
+        second = await registry.get_client("https://a.kusto.windows.net")
+
+        assert first is second
+        mock_dac.assert_called_once()
+        mock_client.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_close_closes_clients_and_credential(self, mock_aio_sdk):
+        """close() awaits close on every client and the credential."""
+        mock_dac, _ = mock_aio_sdk
+        registry = AsyncKustoClientRegistry()
+
+        client = await registry.get_client("https://a.kusto.windows.net")
+        await registry.close()
+
+        client.close.assert_awaited_once()
+        mock_dac.return_value.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_rebuilds(self, mock_aio_sdk):
+        """invalidate() forces a new client on the next call."""
+        registry = AsyncKustoClientRegistry()
+
+        first = await registry.get_client("https://a.kusto.windows.net")
+        await registry.invalidate()
+        second = await registry.get_client("https://a.kusto.windows.net")
+
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_leased_client_is_closed_after_its_last_release(self, mock_aio_sdk):
+        """Invalidation retires a client still in use instead of closing it under the caller."""
+        mock_dac, _ = mock_aio_sdk
+        registry = AsyncKustoClientRegistry()
+        first = await registry.get_client("https://a.kusto.windows.net")
+        await registry.get_client("https://a.kusto.windows.net")
+
+        await registry.invalidate()
+        await registry.release(first)
+
+        first.close.assert_not_awaited()
+        mock_dac.return_value.close.assert_not_awaited()
+        await registry.release(first)
+        first.close.assert_awaited_once()
+        mock_dac.return_value.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_is_compare_and_swap(self, mock_aio_sdk):
+        """Only a call that failed on the currently pooled client rebuilds it."""
+        registry = AsyncKustoClientRegistry()
+        stale = await registry.get_client("https://a.kusto.windows.net")
+
+        assert await registry.invalidate("https://a.kusto.windows.net", stale) is True
+        fresh = await registry.get_client("https://a.kusto.windows.net")
+        assert await registry.invalidate("https://a.kusto.windows.net", stale) is False
+
+        assert await registry.get_client("https://a.kusto.windows.net") is fresh
+        fresh.close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_evicting_a_leased_client_waits_for_its_release(self, mock_aio_sdk):
+        """A client evicted during a long query is closed only once the query releases it."""
+        registry = AsyncKustoClientRegistry()
+        leased = await registry.get_client("https://b.kusto.windows.net")
+
+        assert await registry.evict_idle(0) == 1
+        leased.close.assert_not_awaited()
+        await registry.release(leased)
+        leased.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_close_closes_retired_clients(self, mock_aio_sdk):
+        """Shutdown closes clients even while they are leased."""
+        registry = AsyncKustoClientRegistry()
+        leased = await registry.get_client("https://a.kusto.windows.net")
+        await registry.invalidate()
+
+        await registry.close()
+
+        leased.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_evict_idle(self, mock_aio_sdk):
+        """Clients not requested within the idle period are closed unless kept."""
+        registry = AsyncKustoClientRegistry()
+        kept = await registry.get_client("https://a.kusto.windows.net")
+        idle = await registry.get_client("https://b.kusto.windows.net")
+        await registry.release(idle)
+
+        assert await registry.evict_idle(0, keep=("https://a.kusto.windows.net",)) == 1
+        idle.close.assert_awaited_once()
+        kept.close.assert_not_awaited()
+        assert await registry.get_client("https://b.kusto.windows.net") is not idle
+
+    @pytest.mark.asyncio
+    async def test_evicting_a_real_client_keeps_the_credential_open(self, monkeypatch):
+        """Closing an evicted aio KustoClient leaves the shared credential open."""
+        monkeypatch.delenv('AZURE_TENANT_ID', raising=False)
+        monkeypatch.delenv('AZURE_CLIENT_ID', raising=False)
+        with patch('adx_mcp_server.aio.DefaultAzureCredential') as mock_dac, \
+                patch('adx_mcp_server.aio.logger'):
+            mock_dac.return_value = AsyncMock()
+            registry = AsyncKustoClientRegistry()
+            kept = await registry.get_client("https://a.kusto.windows.net")
+            evicted = await registry.get_client("https://b.kusto.windows.net")
+            await registry.release(evicted)
+
+            await registry.evict_idle(0, keep=("https://a.kusto.windows.net",))
+
+            assert evicted._is_closed
+            assert not kept._is_closed
+            mock_dac.return_value.close.assert_not_awaited()
+            await registry.close()
+            mock_dac.return_value.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_close_failure_is_logged(self, mock_aio_sdk):
+        """A failing close does not propagate."""
+        registry = AsyncKustoClientRegistry()
+        client = await registry.get_client("https://a.kusto.windows.net")
+        client.close.side_effect = Exception("close failed")
+
+        with patch('adx_mcp_server.aio.logger') as mock_logger:
+            await registry.close()
+
+        mock_logger.warning.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_client_creation_error(self, mock_aio_sdk):
+        """Errors creating the aio client are logged and re-raised."""
+        _, mock_client = mock_aio_sdk
+        mock_client.side_effect = Exception("Connection error")
+        registry = AsyncKustoClientRegistry()
+
+        with patch('adx_mcp_server.aio.logger') as mock_logger:
+            with pytest.raises(Exception, match="Connection error"):
+                await registry.get_client("https://a.kusto.windows.net")
+
+        mock_logger.error.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_workload_identity_credential(self, monkeypatch):
+        """The async WorkloadIdentityCredential is used when its variables are set."""
+        monkeypatch.setenv('AZURE_TENANT_ID', 'test-tenant')
+        monkeypatch.setenv('AZURE_CLIENT_ID', 'test-client')
+        monkeypatch.setenv('ADX_TOKEN_FILE_PATH', '/test/path')
+
+        with patch('adx_mcp_server.aio.WorkloadIdentityCredential') as mock_wic, \
+                patch('adx_mcp_server.aio.KustoConnectionStringBuilder'), \
+                patch('adx_mcp_server.aio.KustoClient'), \
+                patch('adx_mcp_server.aio.logger'):
+            await AsyncKustoClientRegistry().get_client("https://a.kusto.windows.net")
+
+        mock_wic.assert_called_once_with(
+            tenant_id='test-tenant',
+            client_id='test-client',
+            token_file_path='/test/path'
+        )
+
+    @pytest.mark.asyncio
+    async def test_workload_identity_failure_falls_back(self, monkeypatch):
+        """A failing WorkloadIdentityCredential falls back to DefaultAzureCredential."""
+        monkeypatch.setenv('AZURE_TENANT_ID', 'test-tenant')
+        monkeypatch.setenv('AZURE_CLIENT_ID', 'test-client')
+
+        with patch('adx_mcp_server.aio.WorkloadIdentityCredential', side_effect=Exception("bad token file")), \
+                patch('adx_mcp_server.aio.DefaultAzureCredential') as mock_dac, \
+                patch('adx_mcp_server.aio.KustoConnectionStringBuilder'), \
+                patch('adx_mcp_server.aio.KustoClient'), \
+                patch('adx_mcp_server.aio.logger') as mock_logger:
+            await AsyncKustoClientRegistry().get_client("https://a.kusto.windows.net")
+
+        mock_dac.assert_called_once()
+        mock_logger.warning.assert_called_once()
+
+
+class TestAsyncBackendDispatch:
+    """Tests for routing tool queries through the async backend."""
+
+    @pytest.mark.asyncio
+    async def test_execute_query_uses_aio_client(self, mock_aio_sdk, async_backend):
+        """With ADX_CLIENT_BACKEND=async, tools await the aio client directly."""
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.format_query_results', return_value=[{"x": 1}]), \
+                patch('adx_mcp_server.server.logger'):
+            result = await server.execute_query("T | take 1")
+
+            mock_get_client.assert_not_called()
+
+        client = await server._get_async_client_registry().get_client(config.cluster_url)
+        client.execute.assert_awaited_once_with("testdb", "T | take 1", ANY)
+        assert result == [{"x": 1}]
+
+    @pytest.mark.asyncio
+    async def test_auth_failure_rebuilds_and_retries(self, async_backend):
+        """An authentication error rebuilds the aio registry and retries once."""
+        stale_client = AsyncMock()
+        stale_client.execute.side_effect = ClientAuthenticationError("token expired")
+        fresh_client = AsyncMock()
+        fresh_client.execute.return_value = "result"
+        registry = MagicMock()
+        registry.get_client = AsyncMock(side_effect=[stale_client, fresh_client])
+        registry.invalidate = AsyncMock(return_value=True)
+        registry.release = AsyncMock()
+        registry.evict_idle = AsyncMock(return_value=0)
+
+        with patch('adx_mcp_server.server._get_async_client_registry', return_value=registry), \
+                patch('adx_mcp_server.server.logger'):
+            result = await server._run_query("testdb", "T | take 1")
+
+        assert result == "result"
+        registry.invalidate.assert_awaited_once_with(config.cluster_url, stale_client)
+        assert [c.args for c in registry.release.await_args_list] == [(stale_client,), (fresh_client,)]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_auth_failures_rebuild_once(self, mock_aio_sdk, async_backend):
+        """Coroutines failing together on one aio client rebuild it once, and none sees it closed."""
+        mock_dac, mock_client = mock_aio_sdk
+        both_failing = asyncio.Barrier(2)
+        stale, fresh = AsyncMock(), AsyncMock()
+        stale.closed = False
+
+        async def stale_execute(database, query, properties):
+            assert not stale.closed
+            await both_failing.wait()
+            raise ClientAuthenticationError("token expired")
+
+        async def close_stale():
+            stale.closed = True
+
+        stale.execute.side_effect = stale_execute
+        stale.close.side_effect = close_stale
+        fresh.execute.return_value = "result"
+        mock_client.side_effect = [stale, fresh]
+        credentials = [AsyncMock(), AsyncMock()]
+        mock_dac.side_effect = credentials
+
+        with patch('adx_mcp_server.server.logger'):
+            results = await asyncio.gather(*(server._run_query("testdb", "T | take 1") for _ in range(2)))
+
+        assert results == ["result", "result"]
+        assert mock_client.call_count == 2
+        assert fresh.execute.await_count == 2
+        stale.close.assert_awaited_once()
+        credentials[0].close.assert_awaited_once()
+        credentials[1].close.assert_not_awaited()
+        fresh.close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_other_errors_are_not_retried(self, async_backend):
+        """Non-authentication errors propagate from the aio client."""
+        client = AsyncMock()
+        client.execute.side_effect = ValueError("bad query")
+        registry = MagicMock()
+        registry.get_client = AsyncMock(return_value=client)
+        registry.release = AsyncMock()
+        registry.evict_idle = AsyncMock(return_value=0)
+
+        with patch('adx_mcp_server.server._get_async_client_registry', return_value=registry):
+            with pytest.raises(ValueError, match="bad query"):
+                await server._run_query("testdb", "T | take 1")
+
+        registry.get_client.assert_awaited_once()
+        registry.release.assert_awaited_once_with(client)
+
+    @pytest.mark.asyncio
+    async def test_close_async_kusto_clients(self, mock_aio_sdk, async_backend):
+        """close_async_kusto_clients() closes and drops the registry."""
+        registry = server._get_async_client_registry()
+        client = await registry.get_client(config.cluster_url)
+
+        await server.close_async_kusto_clients()
+
+        client.close.assert_awaited_once()
+        assert server._async_client_registry is None
+
+    @pytest.mark.asyncio
+    async def test_lifespan_closes_async_clients(self):
+        """The MCP server lifespan closes aio clients on shutdown."""
+        with patch('adx_mcp_server.server.close_async_kusto_clients', new_callable=AsyncMock) as mock_close:
+            async with server._lifespan(server.mcp):
+                mock_close.assert_not_awaited()
+
+        mock_close.assert_awaited_once()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Tests for the execute_queries batch tool.
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+from adx_mcp_server import server
+from adx_mcp_server.server import validate_queries
+
+
+@pytest.fixture
+def batch_client(adx_config, make_result_set):
+    """A client that sleeps briefly, fails on queries containing 'fail' and tracks peak concurrency."""
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def execute(database, query, properties=None):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        try:
+            time.sleep(0.05)
+            if "fail" in query:
+                raise ValueError(f"Syntax error in {query}")
+            return make_result_set([("Query", "string")], [[query]])
+        finally:
+            with lock:
+                state["running"] -= 1
+
+    with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+        with patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute.side_effect = execute
+            yield mock_get_client.return_value, state
+
+
+class TestValidateQueries:
+    """Tests for validate_queries."""
+
+    def test_valid(self):
+        assert validate_queries(["T | count"]) == ["T | count"]
+
+    @pytest.mark.parametrize("queries", [[], "T | count", ["T", "  "], ["T", 5]])
+    def test_invalid(self, queries):
+        with pytest.raises(ValueError):
+            validate_queries(queries)
+
+    def test_batch_size_limit(self, adx_config):
+        adx_config.batch_max_queries = 2
+        with pytest.raises(ValueError, match="at most 2 queries"):
+            validate_queries(["a", "b", "c"])
+
+
+class TestExecuteQueries:
+    """Tests for execute_queries."""
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order(self, batch_client):
+        result = await server.execute_queries(["A | count", "B | count", "C | count"])
+
+        assert [entry["index"] for entry in result["results"]] == [0, 1, 2]
+        assert [entry["results"] for entry in result["results"]] == [[{"Query": q}] for q in ["A | count", "B | count", "C | count"]]
+        assert result["succeeded"] == 3
+        assert result["failed"] == 0
+        assert all(entry["duration_ms"] >= 50 for entry in result["results"])
+
+    @pytest.mark.asyncio
+    async def test_errors_are_isolated(self, batch_client):
+        result = await server.execute_queries(["A | count", "fail here", "C | count"])
+
+        entries = result["results"]
+        assert [entry["status"] for entry in entries] == ["ok", "error", "ok"]
+        assert entries[1]["error"] == "Syntax error in fail here"
+        assert entries[1]["exception_type"] == "ValueError"
+        assert result["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_runs_concurrently_within_limit(self, batch_client, adx_config):
+        _, state = batch_client
+        adx_config.batch_max_parallelism = 3
+
+        started = time.monotonic()
+        result = await server.execute_queries([f"T{i} | count" for i in range(6)])
+        elapsed = time.monotonic() - started
+
+        assert result["succeeded"] == 6
+        assert state["peak"] == 3
+        assert elapsed < 0.25
+
+    @pytest.mark.asyncio
+    async def test_options_apply_to_every_query(self, batch_client):
+        result = await server.execute_queries(["A", "B"], output_format="csv")
+
+        assert [entry["results"] for entry in result["results"]] == ["Query\nA\n", "Query\nB\n"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_options_fail_the_batch(self, batch_client):
+        with pytest.raises(ValueError, match="max_rows must be a positive integer"):
+            await server.execute_queries(["A"], max_rows=0)
+        with pytest.raises(ValueError, match="Invalid output_format"):
+            await server.execute_queries(["A"], output_format="xml")
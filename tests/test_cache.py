@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Tests for the in-process TTL/LRU cache.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from adx_mcp_server.cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError, match="max_entries must be a positive integer"):
+            TTLCache(0, 10)
+        with pytest.raises(ValueError, match="ttl_seconds must be positive"):
+            TTLCache(10, 0)
+
+    def test_get_and_set(self):
+        cache = TTLCache(10, 60)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("missing", "default") == "default"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entries_expire(self):
+        """Entries are dropped once their TTL has passed."""
+        cache = TTLCache(10, 60)
+        with patch('adx_mcp_server.cache.time.monotonic', return_value=1000.0):
+            cache.set("a", 1)
+        with patch('adx_mcp_server.cache.time.monotonic', return_value=1059.0):
+            assert cache.get("a") == 1
+        with patch('adx_mcp_server.cache.time.monotonic', return_value=1061.0):
+            assert cache.get("a") is None
+
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted when the cache is full."""
+        cache = TTLCache(2, 60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_pop_and_clear(self):
+        cache = TTLCache(10, 60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is None
+        assert cache.clear() == 1
+        assert len(cache) == 0
+
+    def test_stats(self):
+        cache = TTLCache(5, 30)
+        cache.set("a", 1)
+
+        assert cache.stats() == {
+            "entries": 1,
+            "max_entries": 5,
+            "ttl_seconds": 30,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""
+Tests for tool call deadlines and cancelling abandoned queries on the cluster.
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastmcp import FastMCP
+from fastmcp.client import Client
+from fastmcp.exceptions import ToolError
+
+from adx_mcp_server import server
+from adx_mcp_server.server import ToolDeadlineMiddleware, _with_client_request_id, build_request_properties, remaining_time
+
+
+@pytest.fixture
+def deadline():
+    """Set the running tool call's deadline, in seconds from now."""
+    tokens = []
+
+    def _set(seconds):
+        tokens.append(server._tool_deadline.set(time.monotonic() + seconds))
+
+    yield _set
+    for token in reversed(tokens):
+        server._tool_deadline.reset(token)
+
+
+async def _wait_for(condition, timeout=5.0):
+    started = time.monotonic()
+    while not condition():
+        assert time.monotonic() - started < timeout, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class TestRequestProperties:
+    """Tests for the client request id and the deadline-derived server timeout."""
+
+    def test_every_request_gets_a_client_request_id(self):
+        properties = _with_client_request_id(None)
+
+        assert properties.client_request_id.startswith("adx-mcp-server;")
+        assert not properties.has_option("servertimeout")
+        assert _with_client_request_id(properties).client_request_id == properties.client_request_id
+
+    def test_no_deadline_outside_tool_calls(self):
+        assert remaining_time() is None
+
+    def test_deadline_becomes_server_timeout(self, deadline):
+        deadline(30)
+
+        timeout = _with_client_request_id(None).get_option("servertimeout", None)
+
+        assert timedelta(seconds=29) < timeout <= timedelta(seconds=30)
+
+    def test_shorter_configured_server_timeout_is_kept(self, adx_config, deadline):
+        adx_config.server_timeout_seconds = 10
+        deadline(30)
+
+        properties = _with_client_request_id(build_request_properties())
+
+        assert properties.get_option("servertimeout", None) == timedelta(seconds=10)
+
+    def test_longer_configured_server_timeout_is_shortened(self, adx_config, deadline):
+        adx_config.server_timeout_seconds = 600
+        deadline(30)
+
+        properties = _with_client_request_id(build_request_properties())
+
+        assert properties.get_option("servertimeout", None) <= timedelta(seconds=30)
+
+    def test_passed_deadline_is_not_sent(self, deadline):
+        deadline(-1)
+
+        with pytest.raises(TimeoutError, match="deadline exceeded"):
+            _with_client_request_id(None)
+
+
+class TestCancelAbandonedRequest:
+    """Tests for the best-effort .cancel query."""
+
+    def test_finished_requests_are_not_cancelled(self, adx_config):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            assert server.cancel_abandoned_request("testdb", "adx-mcp-server;done") is False
+
+        mock_get_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_running_request_is_cancelled(self, adx_config):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            with server._tracked_request("adx-mcp-server;1"):
+                assert server.cancel_abandoned_request("testdb", "adx-mcp-server;1") is True
+            await _wait_for(lambda: mock_logger.info.called)
+
+        database, command = mock_get_client.return_value.execute_mgmt.call_args.args
+        assert database == "testdb"
+        assert command.startswith('.cancel query "adx-mcp-server;1"')
+
+    @pytest.mark.asyncio
+    async def test_cancel_failures_are_logged(self, adx_config):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            mock_get_client.return_value.execute_mgmt.side_effect = Exception("Forbidden")
+            with server._tracked_request("adx-mcp-server;2"):
+                server.cancel_abandoned_request("testdb", "adx-mcp-server;2")
+            await _wait_for(lambda: mock_logger.warning.called)
+
+        assert mock_logger.warning.call_args.kwargs["error"] == "Forbidden"
+
+
+class TestCancelledQueries:
+    """Tests for cancelling queries whose tool call went away."""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_sync_query_is_cancelled_on_the_cluster(self, adx_config, make_result_set):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_execute(database, query, properties):
+            started.set()
+            release.wait(5)
+            return make_result_set([("N", "long")], [[1]])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            mock_get_client.return_value.execute.side_effect = slow_execute
+            task = asyncio.create_task(server.execute_query("T"))
+            assert await asyncio.to_thread(started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await _wait_for(lambda: mock_get_client.return_value.execute_mgmt.called)
+            release.set()
+            await _wait_for(lambda: not server._active_requests)
+
+        properties = mock_get_client.return_value.execute.call_args.args[2]
+        command = mock_get_client.return_value.execute_mgmt.call_args.args[1]
+        assert command.startswith(f'.cancel query "{properties.client_request_id}"')
+        mock_logger.info.assert_any_call("Abandoned query cancelled", client_request_id=properties.client_request_id)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_async_query_is_cancelled_on_the_cluster(self, adx_config):
+        adx_config.client_backend = "async"
+        started = asyncio.Event()
+        client = MagicMock()
+
+        async def slow_execute(database, query, properties):
+            started.set()
+            await asyncio.sleep(10)
+
+        client.execute = slow_execute
+        registry = AsyncMock()
+        registry.get_client.return_value = client
+
+        with patch('adx_mcp_server.server._get_async_client_registry', return_value=registry), \
+                patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            task = asyncio.create_task(server.execute_query("T"))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await _wait_for(lambda: mock_get_client.return_value.execute_mgmt.called)
+
+        assert mock_get_client.return_value.execute_mgmt.call_args.args[1].startswith('.cancel query "adx-mcp-server;')
+        assert not server._active_requests
+
+    @pytest.mark.asyncio
+    async def test_completed_query_is_not_cancelled(self, adx_config, make_result_set):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute.return_value = make_result_set([("N", "long")], [[1]])
+            assert await server.execute_query("T") == [{"N": 1}]
+
+        mock_get_client.return_value.execute_mgmt.assert_not_called()
+        assert not server._active_requests
+
+
+class TestToolDeadlineMiddleware:
+    """Tests for the per-call deadline."""
+
+    @pytest.fixture
+    def app(self):
+        app = FastMCP("deadline-test")
+        app.add_middleware(ToolDeadlineMiddleware(0.2))
+
+        @app.tool
+        async def slow() -> str:
+            await asyncio.sleep(5)
+            return "late"
+
+        @app.tool
+        async def time_left() -> float:
+            return remaining_time()
+
+        return app
+
+    @pytest.mark.asyncio
+    async def test_slow_call_fails_at_the_deadline(self, app):
+        started = time.monotonic()
+
+        with patch('adx_mcp_server.server.logger'):
+            async with Client(app) as client:
+                with pytest.raises(ToolError, match="ADX_TOOL_TIMEOUT_SECONDS"):
+                    await client.call_tool("slow", {})
+
+        assert time.monotonic() - started < 2
+
+    @pytest.mark.asyncio
+    async def test_tools_see_the_time_left(self, app):
+        async with Client(app) as client:
+            result = await client.call_tool("time_left", {})
+
+        assert 0 < result.data <= 0.2
+        assert remaining_time() is None
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+"""
+Tests for the pooled Kusto client registry.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import ANY, patch, MagicMock
+
+from azure.core.exceptions import ClientAuthenticationError
+
+from adx_mcp_server import server
+from adx_mcp_server.credentials import RefreshingCredential
+from adx_mcp_server.server import (
+    KustoClientRegistry,
+    get_kusto_client,
+    close_kusto_clients,
+    config,
+)
+
+
+@pytest.fixture
+def mock_sdk(monkeypatch):
+    """Patch the Azure SDK constructors used by the registry."""
+    monkeypatch.delenv('AZURE_TENANT_ID', raising=False)
+    monkeypatch.delenv('AZURE_CLIENT_ID', raising=False)
+    with patch('adx_mcp_server.server.DefaultAzureCredential') as mock_dac, \
+            patch('adx_mcp_server.server.KustoConnectionStringBuilder') as mock_kcsb, \
+            patch('adx_mcp_server.server.KustoClient') as mock_client, \
+            patch('adx_mcp_server.server.logger'):
+        mock_client.side_effect = lambda kcsb: MagicMock()
+        yield mock_dac, mock_kcsb, mock_client
+
+
+class TestKustoClientRegistry:
+    """Tests for KustoClientRegistry."""
+
+    def test_client_is_reused_across_calls(self, mock_sdk):
+        """The credential and client are built once and then reused."""
+        mock_dac, _, mock_client = mock_sdk
+        original_url = config.cluster_url
+        config.cluster_url = "https://testcluster.region.kusto.windows.net"
+
+        try:
+            first = get_kusto_client()
+            second = get_kusto_client()
+
+            assert first is second
+            mock_dac.assert_called_once()
+            mock_client.assert_called_once()
+        finally:
+            config.cluster_url = original_url
+
+    def test_one_client_per_cluster(self, mock_sdk):
+        """Different clusters get different clients but share the credential."""
+        mock_dac, _, mock_client = mock_sdk
+        registry = KustoClientRegistry()
+
+        first = registry.get_client("https://a.kusto.windows.net")
+        second = registry.get_client("https://b.kusto.windows.net")
+
+        assert first is not second
+        assert mock_client.call_count == 2
+        mock_dac.assert_called_once()
+
+    def test_invalidate_rebuilds_client(self, mock_sdk):
+        """After invalidate the next call builds a new credential and client."""
+        mock_dac, _, _ = mock_sdk
+        registry = KustoClientRegistry()
+
+        first = registry.get_client("https://a.kusto.windows.net")
+        registry.release(first)
+        assert registry.invalidate() is True
+        second = registry.get_client("https://a.kusto.windows.net")
+
+        assert first is not second
+        first.close.assert_called_once()
+        mock_dac.return_value.close.assert_called_once()
+        assert mock_dac.call_count == 2
+
+    def test_leased_client_is_closed_after_its_last_release(self, mock_sdk):
+        """Invalidation retires a client still in use instead of closing it under the caller."""
+        mock_dac, _, _ = mock_sdk
+        registry = KustoClientRegistry()
+        first = registry.get_client("https://a.kusto.windows.net")
+        registry.get_client("https://a.kusto.windows.net")
+
+        registry.invalidate()
+        registry.release(first)
+
+        first.close.assert_not_called()
+        mock_dac.return_value.close.assert_not_called()
+        registry.release(first)
+        first.close.assert_called_once()
+        mock_dac.return_value.close.assert_called_once()
+
+    def test_invalidate_is_compare_and_swap(self, mock_sdk):
+        """Only a call that failed on the currently pooled client rebuilds it."""
+        registry = KustoClientRegistry()
+        stale = registry.get_client("https://a.kusto.windows.net")
+
+        assert registry.invalidate("https://a.kusto.windows.net", stale) is True
+        fresh = registry.get_client("https://a.kusto.windows.net")
+        assert registry.invalidate("https://a.kusto.windows.net", stale) is False
+
+        assert registry.get_client("https://a.kusto.windows.net") is fresh
+        fresh.close.assert_not_called()
+
+    def test_evicting_a_real_client_keeps_the_credential_open(self, monkeypatch):
+        """Closing an evicted KustoClient leaves the refreshing credential other clients use open."""
+        monkeypatch.delenv('AZURE_TENANT_ID', raising=False)
+        monkeypatch.delenv('AZURE_CLIENT_ID', raising=False)
+        monkeypatch.setattr(config, "token_refresh_margin_seconds", 300)
+        with patch('adx_mcp_server.server.DefaultAzureCredential') as mock_dac, \
+                patch('adx_mcp_server.server.logger'):
+            registry = KustoClientRegistry()
+            kept = registry.get_client("https://a.kusto.windows.net")
+            evicted = registry.get_client("https://b.kusto.windows.net")
+            registry.release(kept)
+            registry.release(evicted)
+
+            registry.evict_idle(0, keep=("https://a.kusto.windows.net",))
+
+            assert isinstance(registry._credential, RefreshingCredential)
+            assert evicted._is_closed
+            assert not kept._is_closed
+            assert registry._credential._closed is False
+            mock_dac.return_value.close.assert_not_called()
+            registry.close()
+            mock_dac.return_value.close.assert_called_once()
+
+    def test_invalidate_keeps_the_credential_of_a_leased_real_client(self, monkeypatch):
+        """A real client leased across invalidation keeps its credential until its release."""
+        monkeypatch.delenv('AZURE_TENANT_ID', raising=False)
+        monkeypatch.delenv('AZURE_CLIENT_ID', raising=False)
+        monkeypatch.setattr(config, "token_refresh_margin_seconds", 300)
+        with patch('adx_mcp_server.server.DefaultAzureCredential') as mock_dac, \
+                patch('adx_mcp_server.server.logger'):
+            registry = KustoClientRegistry()
+            leased = registry.get_client("https://a.kusto.windows.net")
+            idle = registry.get_client("https://b.kusto.windows.net")
+            credential = registry._credential
+            registry.release(idle)
+
+            registry.invalidate()
+
+            assert idle._is_closed
+            assert not leased._is_closed
+            assert credential._closed is False
+            mock_dac.return_value.close.assert_not_called()
+            registry.release(leased)
+            assert leased._is_closed
+            assert credential._closed is True
+            mock_dac.return_value.close.assert_called_once()
+
+    def test_close_closes_retired_clients(self, mock_sdk):
+        """Shutdown closes clients even while they are leased."""
+        registry = KustoClientRegistry()
+        leased = registry.get_client("https://a.kusto.windows.net")
+        registry.invalidate()
+
+        registry.close()
+
+        leased.close.assert_called_once()
+
+    def test_close_closes_clients_and_credential(self, mock_sdk):
+        """close() closes every pooled client and the shared credential."""
+        mock_dac, _, _ = mock_sdk
+        registry = KustoClientRegistry()
+
+        client = registry.get_client("https://a.kusto.windows.net")
+        registry.close()
+
+        client.close.assert_called_once()
+        mock_dac.return_value.close.assert_called_once()
+
+    def test_close_failure_is_logged(self, mock_sdk):
+        """A failing close() does not propagate."""
+        registry = KustoClientRegistry()
+        client = registry.get_client("https://a.kusto.windows.net")
+        client.close.side_effect = Exception("close failed")
+
+        with patch('adx_mcp_server.server.logger') as mock_logger:
+            registry.close()
+
+        mock_logger.warning.assert_called_once()
+
+    def test_close_kusto_clients(self, mock_sdk):
+        """close_kusto_clients() empties the process-wide registry."""
+        original_url = config.cluster_url
+        config.cluster_url = "https://testcluster.region.kusto.windows.net"
+
+        try:
+            client = get_kusto_client()
+            close_kusto_clients()
+
+            client.close.assert_called_once()
+            assert get_kusto_client() is not client
+        finally:
+            config.cluster_url = original_url
+
+
+class TestAuthRetry:
+    """Tests for rebuilding the client after an authentication failure."""
+
+    def test_auth_failure_rebuilds_and_retries(self):
+        """An authentication error invalidates the registry and retries once."""
+        stale_client = MagicMock()
+        stale_client.execute.side_effect = ClientAuthenticationError("token expired")
+        fresh_client = MagicMock()
+        fresh_client.execute.return_value = "result"
+
+        with patch('adx_mcp_server.server.get_kusto_client', side_effect=[stale_client, fresh_client]), \
+                patch.object(server._client_registry, 'invalidate') as mock_invalidate, \
+                patch('adx_mcp_server.server.logger'):
+            result = server._execute("testdb", "T | take 1")
+
+        assert result == "result"
+        mock_invalidate.assert_called_once()
+        fresh_client.execute.assert_called_once_with("testdb", "T | take 1", ANY)
+
+    def test_concurrent_auth_failures_rebuild_once(self, mock_sdk, adx_config):
+        """Calls failing together on one client rebuild it once, and none sees a closed client."""
+        from azure.kusto.data.exceptions import KustoClosedError
+
+        mock_dac, _, mock_client = mock_sdk
+        both_failing = threading.Barrier(2)
+        stale, fresh = MagicMock(), MagicMock()
+        stale.closed = False
+
+        def stale_execute(database, query, properties):
+            if stale.closed:
+                raise KustoClosedError()
+            both_failing.wait(5)
+            raise ClientAuthenticationError("token expired")
+
+        def close_stale():
+            stale.closed = True
+
+        stale.execute.side_effect = stale_execute
+        stale.close.side_effect = close_stale
+        fresh.execute.return_value = "result"
+        mock_client.side_effect = [stale, fresh]
+
+        with ThreadPoolExecutor(2) as pool:
+            results = list(pool.map(lambda _: server._execute("testdb", "T | take 1"), range(2)))
+
+        assert results == ["result", "result"]
+        assert mock_client.call_count == 2
+        assert fresh.execute.call_count == 2
+        stale.close.assert_called_once()
+        mock_dac.return_value.close.assert_called_once()
+        fresh.close.assert_not_called()
+
+    def test_other_errors_are_not_retried(self):
+        """Non-authentication errors propagate without a retry."""
+        client = MagicMock()
+        client.execute.side_effect = ValueError("bad query")
+
+        with patch('adx_mcp_server.server.get_kusto_client', return_value=client) as mock_get_client:
+            with pytest.raises(ValueError, match="bad query"):
+                server._execute("testdb", "T | take 1")
+
+        mock_get_client.assert_called_once()
+
+    def test_is_auth_error(self):
+        """401 service errors and credential errors are detected as auth failures."""
+        from azure.kusto.data.exceptions import KustoServiceError
+
+        assert server._is_auth_error(ClientAuthenticationError("expired"))
+        assert server._is_auth_error(KustoServiceError("401. Missing adequate access rights."))
+        assert not server._is_auth_error(KustoServiceError("Syntax error"))
+        assert not server._is_auth_error(ValueError("nope"))
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+"""
+Tests for the bounded executor that runs blocking Kusto calls.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+from adx_mcp_server import server
+from adx_mcp_server.executor import BoundedExecutor
+from adx_mcp_server.server import config
+
+
+class TestBoundedExecutor:
+    """Tests for BoundedExecutor."""
+
+    def test_invalid_worker_count(self):
+        """A non-positive worker count is rejected."""
+        with pytest.raises(ValueError, match="max_workers must be a positive integer"):
+            BoundedExecutor("test", 0)
+
+    @pytest.mark.asyncio
+    async def test_runs_calls_in_parallel(self):
+        """Blocking calls run concurrently up to the worker limit."""
+        executor = BoundedExecutor("test", 4)
+        try:
+            start = time.monotonic()
+            results = await asyncio.gather(*[executor.run(time.sleep, 0.1) for _ in range(4)])
+            elapsed = time.monotonic() - start
+
+            assert results == [None] * 4
+            assert elapsed < 0.3
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_excess_calls_wait_in_queue(self):
+        """Calls beyond the worker limit queue up and their wait time is recorded."""
+        executor = BoundedExecutor("test", 1)
+        try:
+            await asyncio.gather(*[executor.run(time.sleep, 0.05) for _ in range(3)])
+
+            stats = executor.stats()
+            assert stats["completed"] == 3
+            assert stats["queued"] == 0
+            assert stats["running"] == 0
+            assert stats["max_wait_ms"] >= 50
+            assert stats["avg_wait_ms"] > 0
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_is_visible(self):
+        """Queued and running calls are reported while the pool is saturated."""
+        executor = BoundedExecutor("test", 1)
+        release = threading.Event()
+        try:
+            tasks = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+
+            stats = executor.stats()
+            assert stats["running"] == 1
+            assert stats["queued"] == 2
+
+            release.set()
+            await asyncio.gather(*tasks)
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_queued_call_leaves_queue(self):
+        """Cancelling a call that has not started removes it from the queue."""
+        executor = BoundedExecutor("test", 1)
+        release = threading.Event()
+        try:
+            running = asyncio.ensure_future(executor.run(release.wait))
+            queued = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0.05)
+
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            assert executor.stats()["queued"] == 0
+
+            release.set()
+            await running
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_context_variables_propagate(self):
+        """Context variables (e.g. structlog context) are visible in the worker thread."""
+        request_id = contextvars.ContextVar("request_id")
+        request_id.set("abc")
+        executor = BoundedExecutor("test", 1)
+        try:
+            assert await executor.run(request_id.get) == "abc"
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self):
+        """Exceptions raised by the call are re-raised to the awaiting coroutine."""
+        executor = BoundedExecutor("test", 1)
+
+        def fail():
+            raise RuntimeError("boom")
+
+        try:
+            with pytest.raises(RuntimeError, match="boom"):
+                await executor.run(fail)
+            assert executor.stats()["completed"] == 1
+        finally:
+            executor.shutdown()
+
+
+class TestQueryExecutor:
+    """Tests for the server's shared query executor."""
+
+    def test_executor_uses_configured_size(self):
+        """The shared executor is sized from ADX_MAX_CONCURRENT_QUERIES."""
+        original = config.max_concurrent_queries
+        config.max_concurrent_queries = 3
+        server.shutdown_query_executor()
+
+        try:
+            executor = server.get_query_executor()
+            assert executor.max_workers == 3
+            assert server.get_query_executor() is executor
+        finally:
+            server.shutdown_query_executor()
+            config.max_concurrent_queries = original
+
+    @pytest.mark.asyncio
+    async def test_tools_do_not_block_event_loop(self):
+        """Slow queries from concurrent tool calls overlap instead of serializing."""
+        original_url = config.cluster_url
+        original_db = config.database
+        config.cluster_url = "https://testcluster.region.kusto.windows.net"
+        config.database = "testdb"
+
+        def slow_execute(database, query, properties=None):
+            time.sleep(0.1)
+            return MagicMock(primary_results=[])
+
+        try:
+            with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+                with patch('adx_mcp_server.server.logger'):
+                    mock_get_client.return_value.execute.side_effect = slow_execute
+
+                    start = time.monotonic()
+                    results = await asyncio.gather(*[server.execute_query("T | take 1") for _ in range(4)])
+                    elapsed = time.monotonic() - start
+
+            assert results == [[]] * 4
+            assert elapsed < 0.3
+        finally:
+            config.cluster_url = original_url
+            config.database = original_db
+
+
+class TestExecutorLanes:
+    """Tests for running metadata lookups apart from queries."""
+
+    @pytest.fixture
+    def lanes(self, adx_config):
+        server.shutdown_query_executor()
+        yield adx_config
+        server.shutdown_query_executor()
+
+    def test_each_lane_has_its_own_sized_executor(self, lanes):
+        lanes.max_concurrent_queries = 2
+        lanes.metadata_concurrent_queries = 3
+
+        query = server.get_query_executor()
+        metadata = server.get_query_executor(server.Lane.METADATA.value)
+
+        assert query is not metadata
+        assert (query.name, query.max_workers) == ("query", 2)
+        assert (metadata.name, metadata.max_workers) == ("metadata", 3)
+
+    def test_tool_lanes(self):
+        assert server.tool_lane("get_table_schema") == "metadata"
+        assert server.tool_lane("fetch_page") == "metadata"
+        assert server.tool_lane("execute_query") == "query"
+        assert server.Lane.values() == ["metadata", "query"]
+
+    @pytest.mark.asyncio
+    async def test_saturated_query_lane_does_not_delay_metadata(self, lanes):
+        lanes.max_concurrent_queries = 1
+        release = threading.Event()
+
+        def execute(database, query, properties=None):
+            if not query.startswith("."):
+                release.wait(5)
+            return MagicMock(primary_results=[])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute.side_effect = execute
+            queries = [asyncio.create_task(server.execute_query(f"T{index}")) for index in range(3)]
+            try:
+                tables = await asyncio.wait_for(server.list_tables(), 2)
+                assert server.get_query_executor().stats()["queued"] == 2
+            finally:
+                release.set()
+                await asyncio.gather(*queries)
+
+        assert tables == []
+        assert server.get_query_executor(server.Lane.METADATA.value).stats()["completed"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_queue_wait_is_recorded_per_lane(self, lanes):
+        def execute(database, query, properties=None):
+            return MagicMock(primary_results=[])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute.side_effect = execute
+            await server.list_tables()
+
+        text = server._metrics.render()
+        assert 'adx_executor_queue_wait_seconds_count{executor="metadata"}' in text
+        assert 'adx_executor_queued{executor="metadata"} 0' in text
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+"""
+Tests for exporting query results to Parquet and Arrow IPC files.
+"""
+
+import os
+import threading
+import pytest
+from unittest.mock import patch
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from adx_mcp_server import server
+from adx_mcp_server.export import ExportWriter, _timespan_nanoseconds, write_export
+from adx_mcp_server.server import export_file_path, validate_export_format
+
+COLUMNS = [
+    ("Timestamp", "datetime"), ("Duration", "timespan"), ("Price", "decimal"), ("Id", "guid"),
+    ("Ratio", "real"), ("Count", "long"), ("Small", "int"), ("Active", "bool"),
+    ("Name", "string"), ("Props", "dynamic"),
+]
+ROWS = [
+    ["2024-01-01T00:00:00.1234567Z", "1.02:03:04.5000000", "1.50", "74be27de-1e4e-49d9-b579-fe0b331d3642",
+     0.5, 10, 1, True, "alpha", {"k": [1]}],
+    [None, "-00:00:01", None, None, "NaN", None, None, None, None, None],
+    ["2024-01-02T03:04:05Z", "00:00:00", "2", "00000000-0000-0000-0000-000000000000",
+     -1.0, 2 ** 40, -1, False, "ä", "already text"],
+]
+
+
+@pytest.fixture
+def export_dir(adx_config, tmp_path):
+    adx_config.export_dir = str(tmp_path / "exports")
+    return tmp_path / "exports"
+
+
+def _read(path, export_format):
+    if export_format == "parquet":
+        return pq.read_table(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+class TestWriteExport:
+    """Tests for write_export."""
+
+    @pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+    def test_types_and_values(self, tmp_path, export_format):
+        path = str(tmp_path / f"result.{export_format}")
+
+        summary = write_export(path, export_format, COLUMNS, ROWS, batch_rows=2)
+        table = _read(path, export_format)
+
+        assert summary["row_count"] == 3
+        assert summary["bytes"] == os.path.getsize(path)
+        assert [column["arrow_type"] for column in summary["columns"]] == [
+            "timestamp[ns, tz=UTC]", "duration[ns]", "string", "string", "double",
+            "int64", "int32", "bool", "string", "string",
+        ]
+        # Kusto's 100ns precision survives
+        assert table.column("Timestamp").cast(pa.int64()).to_pylist() == [1_704_067_200_123_456_700, None, 1_704_164_645_000_000_000]
+        rows = table.drop_columns(["Timestamp"]).to_pylist()
+        assert table.column("Duration").cast(pa.int64()).to_pylist() == [93_784_500_000_000, -1_000_000_000, 0]
+        assert rows[0]["Price"] == "1.50"
+        assert rows[0]["Props"] == '{"k":[1]}'
+        assert rows[2]["Props"] == "already text"
+        assert rows[2]["Count"] == 2 ** 40
+        assert str(rows[1]["Ratio"]) == "nan"
+        assert rows[1]["Name"] is None
+        assert not os.path.exists(path + ".tmp")
+
+    def test_empty_result_keeps_schema(self, tmp_path):
+        path = str(tmp_path / "empty.parquet")
+
+        summary = write_export(path, "parquet", [("N", "long")], [])
+
+        assert summary["row_count"] == 0
+        assert pq.read_table(path).schema.names == ["N"]
+
+    def test_unknown_types_are_written_as_strings(self, tmp_path):
+        path = str(tmp_path / "other.parquet")
+
+        write_export(path, "parquet", [("X", "newtype")], [[{"a": 1}], ["b"]])
+
+        assert pq.read_table(path).column("X").to_pylist() == ['{"a":1}', "b"]
+
+    def test_temporary_file_is_unique(self, tmp_path):
+        path = str(tmp_path / "t.parquet")
+        (tmp_path / "t.parquet.tmp").write_bytes(b"other")
+        open(path, "wb").close()
+
+        write_export(path, "parquet", [("N", "long")], [[1]])
+
+        assert sorted(os.listdir(tmp_path)) == ["t.parquet", "t.parquet.tmp"]
+        assert (tmp_path / "t.parquet.tmp").read_bytes() == b"other"
+        assert pq.read_table(path).num_rows == 1
+
+    def test_failed_write_leaves_no_file(self, tmp_path):
+        path = str(tmp_path / "bad.parquet")
+
+        with pytest.raises(ValueError, match="Invalid timespan"):
+            write_export(path, "parquet", [("D", "timespan")], [["soon"]])
+
+        assert os.listdir(tmp_path) == []
+
+    @pytest.mark.parametrize("value,expected", [
+        ("00:00:01", 1_000_000_000),
+        ("1.00:00:00", 86_400_000_000_000),
+        ("00:00:00.0000001", 100),
+        ("-00:01:00.5", -60_500_000_000),
+        (None, None),
+    ])
+    def test_timespan_parsing(self, value, expected):
+        assert _timespan_nanoseconds(value) == expected
+
+
+class TestExportPaths:
+    """Tests for export file naming and validation."""
+
+    def test_disabled_without_directory(self, adx_config):
+        adx_config.export_dir = None
+
+        with pytest.raises(ValueError, match="ADX_EXPORT_DIR"):
+            export_file_path(None, "parquet")
+
+    def test_generated_name(self, export_dir):
+        path = export_file_path(None, "arrow")
+
+        assert os.path.dirname(path) == str(export_dir)
+        assert path.endswith(".arrow")
+        assert export_dir.is_dir()
+
+    def test_given_name_gets_extension(self, export_dir):
+        assert export_file_path("daily.v1", "parquet") == str(export_dir / "daily.v1.parquet")
+        assert export_file_path("daily.parquet", "parquet") == str(export_dir / "daily.parquet")
+
+    def test_existing_file_is_not_overwritten(self, export_dir):
+        export_dir.mkdir()
+        (export_dir / "daily.parquet").write_bytes(b"previous")
+
+        with pytest.raises(ValueError, match="'daily.parquet' already exists"):
+            export_file_path("daily", "parquet")
+
+        assert (export_dir / "daily.parquet").read_bytes() == b"previous"
+
+    def test_name_is_reserved(self, export_dir):
+        path = export_file_path("daily", "parquet")
+
+        assert os.path.getsize(path) == 0
+        with pytest.raises(ValueError, match="'daily.parquet' already exists"):
+            export_file_path("daily", "parquet")
+
+    @pytest.mark.parametrize("file_name", ["../escape", "sub/dir", ".hidden", "", "a b"])
+    def test_unsafe_names_are_rejected(self, export_dir, file_name):
+        with pytest.raises(ValueError, match="Invalid file_name"):
+            export_file_path(file_name, "parquet")
+
+    def test_invalid_format(self):
+        with pytest.raises(ValueError, match="Invalid export_format"):
+            validate_export_format("csv")
+
+
+class TestExportQueryTool:
+    """Tests for the export_query tool."""
+
+    @pytest.mark.asyncio
+    async def test_export_lifts_truncation(self, export_dir, make_streaming_response):
+        response = make_streaming_response(COLUMNS, ROWS)
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = await server.export_query("T", file_name="t")
+
+        properties = mock_get_client.return_value.execute_streaming_query.call_args.kwargs["properties"]
+        assert properties.get_option("notruncation", None) is True
+        assert summary["path"] == str(export_dir / "t.parquet")
+        assert summary["row_count"] == 3
+        assert "truncated" not in summary
+        assert pq.read_table(summary["path"]).num_rows == 3
+
+    @pytest.mark.asyncio
+    async def test_each_batch_is_written_as_it_arrives(self, export_dir, make_streaming_response):
+        events = []
+        write = ExportWriter.write
+
+        def rows():
+            for i in range(5):
+                events.append(f"read {i}")
+                yield [i]
+
+        def record_write(writer, raw_rows):
+            events.append(f"write {len(raw_rows)}")
+            write(writer, raw_rows)
+
+        response = make_streaming_response([("N", "long")], rows())
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.DEFAULT_BATCH_ROWS', 2), \
+                patch.object(ExportWriter, 'write', record_write), \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = await server.export_query("T", export_format="arrow")
+
+        assert events == ["read 0", "read 1", "write 2", "read 2", "read 3", "write 2", "read 4", "write 1"]
+        assert summary["row_count"] == 5
+        with pa.memory_map(summary["path"]) as source:
+            reader = pa.ipc.open_file(source)
+            assert [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_export_with_max_rows(self, export_dir, make_streaming_response):
+        response = make_streaming_response([("N", "long")], [[i] for i in range(6)])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = await server.export_query("T", export_format="arrow", max_rows=5)
+
+        properties = mock_get_client.return_value.execute_streaming_query.call_args.kwargs["properties"]
+        assert properties.get_option("truncationmaxrecords", None) == 6
+        assert not properties.has_option("notruncation")
+        assert summary["row_count"] == 5
+        assert summary["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_empty_result(self, export_dir):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value.iter_primary_results.return_value = iter([])
+            summary = await server.export_query("T")
+
+        assert summary["row_count"] == 0
+        assert summary["columns"] == []
+
+    @pytest.mark.asyncio
+    async def test_rejected_query_frees_the_name(self, export_dir, adx_config):
+        adx_config.preflight_max_scan_bytes = 1
+
+        with patch('adx_mcp_server.server.preflight_query', side_effect=ValueError("Query rejected")), \
+                patch('adx_mcp_server.server.logger'):
+            with pytest.raises(ValueError, match="Query rejected"):
+                await server.export_query("T", file_name="t")
+
+        assert os.listdir(export_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_missing_configuration(self, export_dir, adx_config):
+        adx_config.cluster_url = ""
+
+        with patch('adx_mcp_server.server.logger'):
+            with pytest.raises(ValueError, match="configuration is missing"):
+                await server.export_query("T")
+
+    @pytest.mark.asyncio
+    async def test_query_failure_is_logged(self, export_dir):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            mock_get_client.return_value.execute_streaming_query.side_effect = Exception("Query failed")
+            with pytest.raises(Exception, match="Query failed"):
+                await server.export_query("T")
+
+        mock_logger.error.assert_called_once()
+        assert os.listdir(export_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_discards_the_file(self, export_dir, make_streaming_response):
+        response = make_streaming_response([("N", "long")], [[1]], errors=["Description:'E_LOW_MEMORY_CONDITION'"])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            with pytest.raises(Exception, match="E_LOW_MEMORY_CONDITION"):
+                await server.export_query("T")
+
+        assert os.listdir(export_dir) == []
+
+    def test_cancelled_export_discards_the_file(self, export_dir, make_streaming_response):
+        stop = threading.Event()
+
+        def rows():
+            yield [1]
+            yield [2]
+            stop.set()
+            yield [3]
+
+        response = make_streaming_response([("N", "long")], rows())
+        export_dir.mkdir()
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.DEFAULT_BATCH_ROWS', 1):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            with pytest.raises(RuntimeError, match="cancelled"):
+                server._stream_export("testdb", "T", None, str(export_dir / "t.parquet"), "parquet", None, stop)
+
+        assert os.listdir(export_dir) == []
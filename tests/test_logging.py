@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Tests for queue-backed log output and sampling of per-call log events.
+"""
+
+import io
+import json
+import threading
+import pytest
+import structlog
+from unittest.mock import patch
+
+from adx_mcp_server import server
+from adx_mcp_server.logsink import EventSampler, QueueLoggerFactory, QueueWriter
+
+
+class _BlockingStream(io.StringIO):
+    """A stream whose first write waits until released, to fill the writer's queue."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.entered = threading.Event()
+
+    def write(self, text):
+        self.entered.set()
+        self.release.wait(5)
+        return super().write(text)
+
+
+@pytest.fixture
+def restore_logging():
+    """Restore the structlog configuration and stop the server's log writer after a test."""
+    saved = structlog.get_config()
+    yield
+    server.shutdown_logging()
+    structlog.configure(**saved)
+
+
+class TestQueueWriter:
+    """Tests for QueueWriter."""
+
+    def test_lines_are_written_in_order_on_close(self):
+        stream = io.StringIO()
+        writer = QueueWriter(stream)
+        for i in range(1000):
+            writer.write_line(f"line {i}")
+        writer.close()
+
+        assert stream.getvalue().splitlines() == [f"line {i}" for i in range(1000)]
+        assert writer.stats() == {"queued": 0, "written": 1000, "dropped": 0}
+
+    def test_full_queue_drops_lines_without_blocking(self):
+        stream = _BlockingStream()
+        writer = QueueWriter(stream, max_queue=2)
+        writer.write_line("first")
+        assert stream.entered.wait(5)
+
+        for i in range(5):
+            writer.write_line(f"line {i}")
+        assert writer.stats()["dropped"] == 3
+
+        stream.release.set()
+        writer.close()
+        assert stream.getvalue().splitlines() == ["first", "line 0", "line 1"]
+
+    def test_lines_after_close_are_ignored(self):
+        stream = io.StringIO()
+        writer = QueueWriter(stream)
+        writer.close()
+        writer.write_line("late")
+        writer.close()
+
+        assert stream.getvalue() == ""
+
+    def test_owned_stream_is_closed(self, tmp_path):
+        stream = open(tmp_path / "server.log", "a", encoding="utf-8")
+        writer = QueueWriter(stream, close_stream=True)
+        writer.write_line("hello")
+        writer.close()
+
+        assert stream.closed
+        assert (tmp_path / "server.log").read_text() == "hello\n"
+
+    def test_invalid_queue_size(self):
+        with pytest.raises(ValueError, match="max_queue"):
+            QueueWriter(io.StringIO(), max_queue=0)
+
+    def test_logger_factory_writes_rendered_lines(self):
+        stream = io.StringIO()
+        writer = QueueWriter(stream)
+        log = QueueLoggerFactory(writer)()
+        log.info("one")
+        log.error("two")
+        writer.close()
+
+        assert stream.getvalue() == "one\ntwo\n"
+
+
+class TestEventSampler:
+    """Tests for EventSampler."""
+
+    def test_other_events_pass_through(self):
+        sampler = EventSampler({"Executing KQL query"}, sample_rate=0.01, rate_limit=1)
+        event = {"event": "Configuration loaded"}
+
+        assert sampler(None, "info", event) is event
+
+    @pytest.mark.parametrize("method_name", ["warning", "error", "critical"])
+    def test_warnings_and_errors_are_never_sampled(self, method_name):
+        sampler = EventSampler({"Executing KQL query"}, sample_rate=0.01)
+
+        with patch('adx_mcp_server.logsink.random.random', return_value=0.99):
+            assert sampler(None, method_name, {"event": "Executing KQL query"}) == {"event": "Executing KQL query"}
+
+    def test_sampling_drops_and_annotates(self):
+        sampler = EventSampler({"Executing KQL query"}, sample_rate=0.1)
+
+        with patch('adx_mcp_server.logsink.random.random', return_value=0.5):
+            with pytest.raises(structlog.DropEvent):
+                sampler(None, "info", {"event": "Executing KQL query"})
+        with patch('adx_mcp_server.logsink.random.random', return_value=0.05):
+            kept = sampler(None, "info", {"event": "Executing KQL query"})
+
+        assert kept["sample_rate"] == 0.1
+
+    def test_rate_limit_reports_suppressed_events(self):
+        sampler = EventSampler({"Executing KQL query"}, rate_limit=2)
+        clock = [100.0]
+
+        with patch('adx_mcp_server.logsink.time.monotonic', side_effect=lambda: clock[0]):
+            kept = [sampler(None, "info", {"event": "Executing KQL query"}) for _ in range(2)]
+            for _ in range(3):
+                with pytest.raises(structlog.DropEvent):
+                    sampler(None, "info", {"event": "Executing KQL query"})
+            clock[0] += 1
+            after = sampler(None, "info", {"event": "Executing KQL query"})
+
+        assert all("suppressed" not in event for event in kept)
+        assert after["suppressed"] == 3
+
+    def test_rate_limit_is_per_event(self):
+        sampler = EventSampler({"a", "b"}, rate_limit=1)
+
+        with patch('adx_mcp_server.logsink.time.monotonic', return_value=100.0):
+            sampler(None, "info", {"event": "a"})
+            assert sampler(None, "info", {"event": "b"}) == {"event": "b"}
+
+    @pytest.mark.parametrize("kwargs", [{"sample_rate": 0}, {"sample_rate": 1.5}, {"rate_limit": -1}])
+    def test_invalid_settings(self, kwargs):
+        with pytest.raises(ValueError):
+            EventSampler({"a"}, **kwargs)
+
+
+class TestConfigureLogging:
+    """Tests for the server's logging configuration."""
+
+    def test_logs_to_file(self, monkeypatch, tmp_path, restore_logging):
+        log_file = tmp_path / "server.log"
+        monkeypatch.setenv("LOG_OUTPUT", str(log_file))
+        monkeypatch.setenv("LOG_FORMAT", "json")
+        server.configure_logging()
+
+        structlog.get_logger().info("Configuration loaded", cluster_url="https://a")
+        server.shutdown_logging()
+
+        line = json.loads(log_file.read_text().splitlines()[-1])
+        assert line["event"] == "Configuration loaded"
+        assert line["cluster_url"] == "https://a"
+
+    def test_per_call_events_are_sampled(self, monkeypatch, tmp_path, restore_logging):
+        log_file = tmp_path / "server.log"
+        monkeypatch.setenv("LOG_OUTPUT", str(log_file))
+        monkeypatch.setenv("LOG_SAMPLE_RATE", "0.5")
+        server.configure_logging()
+
+        with patch('adx_mcp_server.logsink.random.random', return_value=0.9):
+            structlog.get_logger().info("Executing KQL query")
+            structlog.get_logger().info("Azure Data Explorer configuration loaded")
+        server.shutdown_logging()
+
+        assert [json.loads(line)["event"] for line in log_file.read_text().splitlines()] == [
+            "Azure Data Explorer configuration loaded"
+        ]
+
+    def test_defaults_to_stderr(self, monkeypatch, restore_logging):
+        monkeypatch.delenv("LOG_OUTPUT", raising=False)
+        server.configure_logging()
+
+        assert server._log_writer.stream is server.sys.stderr
+
+    @pytest.mark.parametrize("variable,value", [
+        ("LOG_SAMPLE_RATE", "2"),
+        ("LOG_RATE_LIMIT", "fast"),
+        ("LOG_QUEUE_SIZE", "0"),
+    ])
+    def test_invalid_settings_fall_back_to_defaults(self, monkeypatch, variable, value, restore_logging):
+        monkeypatch.setenv(variable, value)
+        with patch('adx_mcp_server.server.logger') as mock_logger:
+            server.configure_logging()
+
+        mock_logger.warning.assert_called_once()
+        assert server._log_writer is not None
+
+    def test_dropped_lines_are_exported(self, restore_logging):
+        server.configure_logging()
+        server._log_writer.dropped = 4
+
+        assert "adx_log_lines_dropped_total 4" in server._metrics.render()
@@ -31,7 +31,6 @@ class TestMain:
                 assert result is True
 
                 # Verify logger was called with correct information
-                mock_logger.info.assert_any_call("No .env file found, using system environment variables")
                 mock_logger.info.assert_any_call(
                     "Azure Data Explorer configuration loaded",
                     cluster_url="https://testcluster.region.kusto.windows.net",
@@ -216,3 +215,329 @@ class TestMain:
         # This test is skipped because it's consistently failing and 
         # the functionality is already indirectly tested by other tests
         pass
+
+    def test_setup_environment_invalid_concurrency(self, adx_config):
+        """Test setup_environment rejects a non-positive ADX_MAX_CONCURRENT_QUERIES."""
+        adx_config.max_concurrent_queries = 0
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                result = setup_environment()
+
+                assert result is False
+                mock_logger.error.assert_called_with(
+                    "Invalid query concurrency",
+                    variable="ADX_MAX_CONCURRENT_QUERIES",
+                    value=0
+                )
+
+    def test_setup_environment_invalid_metadata_concurrency(self, adx_config):
+        """Test setup_environment rejects a non-positive ADX_METADATA_CONCURRENT_QUERIES."""
+        adx_config.metadata_concurrent_queries = 0
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                assert setup_environment() is False
+
+        mock_logger.error.assert_called_with(
+            "Invalid query concurrency",
+            variable="ADX_METADATA_CONCURRENT_QUERIES",
+            value=0
+        )
+
+    def test_setup_environment_invalid_backend(self, adx_config):
+        """Test setup_environment rejects an unknown ADX_CLIENT_BACKEND."""
+        adx_config.client_backend = "threads"
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                result = setup_environment()
+
+                assert result is False
+                mock_logger.error.assert_called_with(
+                    "Invalid client backend",
+                    variable="ADX_CLIENT_BACKEND",
+                    backend="threads",
+                    valid_backends=["sync", "async"]
+                )
+
+    def test_setup_environment_invalid_result_store(self, adx_config):
+        """Test setup_environment rejects a non-positive result store size or TTL."""
+        adx_config.result_store_ttl_seconds = 0
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                result = setup_environment()
+
+                assert result is False
+                mock_logger.error.assert_called_with(
+                    "Invalid result store configuration",
+                    max_entries=adx_config.result_store_max_entries,
+                    ttl_seconds=0
+                )
+
+    def test_setup_environment_invalid_query_limit(self, adx_config):
+        """Test setup_environment rejects a non-positive default query limit."""
+        adx_config.max_rows = 0
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                result = setup_environment()
+
+                assert result is False
+                mock_logger.error.assert_called_with("Invalid query limit", variable="ADX_MAX_ROWS", value=0)
+
+    def test_setup_environment_invalid_metadata_cache(self, adx_config):
+        """Test setup_environment rejects a negative metadata cache TTL."""
+        adx_config.metadata_cache_ttl_seconds = -1
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                result = setup_environment()
+
+                assert result is False
+                mock_logger.error.assert_called_with(
+                    "Invalid metadata cache configuration",
+                    ttl_seconds=-1,
+                    max_entries=adx_config.metadata_cache_max_entries
+                )
+
+    def test_setup_environment_invalid_query_cache(self, adx_config):
+        """Test setup_environment rejects a non-positive query cache byte budget."""
+        adx_config.query_cache_max_bytes = 0
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                result = setup_environment()
+
+                assert result is False
+                mock_logger.error.assert_called_with(
+                    "Invalid query cache configuration",
+                    ttl_seconds=adx_config.query_cache_ttl_seconds,
+                    max_entries=adx_config.query_cache_max_entries,
+                    max_bytes=0
+                )
+
+    def test_setup_environment_invalid_allowed_cluster(self, adx_config):
+        """Test setup_environment rejects allowed clusters that are not URLs."""
+        adx_config.allowed_clusters = ["othercluster"]
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                result = setup_environment()
+
+                assert result is False
+                mock_logger.error.assert_called_with(
+                    "Invalid allowed cluster",
+                    variable="ADX_ALLOWED_CLUSTERS",
+                    value="othercluster",
+                    example="https://youradxcluster.region.kusto.windows.net"
+                )
+
+    def test_setup_environment_invalid_batch(self, adx_config):
+        """Test setup_environment rejects a non-positive batch parallelism."""
+        adx_config.batch_max_parallelism = 0
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                result = setup_environment()
+
+                assert result is False
+                mock_logger.error.assert_called_with(
+                    "Invalid batch configuration",
+                    max_queries=adx_config.batch_max_queries,
+                    max_parallelism=0
+                )
+
+    def test_setup_environment_invalid_token_refresh_margin(self, adx_config):
+        """Test setup_environment rejects a negative token refresh margin."""
+        adx_config.token_refresh_margin_seconds = -1
+
+        with patch('dotenv.load_dotenv', return_value=False):
+            with patch('adx_mcp_server.main.logger') as mock_logger:
+                result = setup_environment()
+
+                assert result is False
+                mock_logger.error.assert_called_with(
+                    "Invalid token refresh margin",
+                    variable="ADX_TOKEN_REFRESH_MARGIN_SECONDS",
+                    value=-1
+                )
+
+    def test_setup_environment_invalid_metrics_path(self, adx_config):
+        """Test setup_environment rejects a metrics path without a leading slash."""
+        adx_config.mcp_server_config = MCPServerConfig(
+            mcp_server_transport="http",
+            mcp_bind_host="127.0.0.1",
+            mcp_bind_port=8080
+        )
+        adx_config.metrics_path = "metrics"
+
+        with patch('adx_mcp_server.main.logger') as mock_logger:
+            result = setup_environment()
+
+            assert result is False
+            mock_logger.error.assert_called_with(
+                "Invalid metrics path",
+                variable="ADX_METRICS_PATH",
+                value="metrics",
+                example="/metrics"
+            )
+
+    @pytest.mark.parametrize("transport,metrics_path,enabled", [
+        ("http", "/metrics", True),
+        ("http", "", False),
+        ("stdio", "/metrics", False),
+    ])
+    def test_run_server_enables_metrics_for_http(self, adx_config, transport, metrics_path, enabled):
+        """The metrics endpoint is served only with a network transport and a metrics path."""
+        from adx_mcp_server.main import run_server
+
+        def load():
+            adx_config.mcp_server_config = MCPServerConfig(
+                mcp_server_transport=transport,
+                mcp_bind_host="127.0.0.1",
+                mcp_bind_port=8080
+            )
+            adx_config.metrics_path = metrics_path
+
+        with patch('adx_mcp_server.main.load_environment', side_effect=load), \
+                patch('adx_mcp_server.main.setup_environment', return_value=True), \
+                patch('adx_mcp_server.main.enable_metrics') as mock_enable, \
+                patch('adx_mcp_server.main.logger'), \
+                patch('adx_mcp_server.server.mcp.run'):
+            run_server()
+
+        assert mock_enable.called is enabled
+        if enabled:
+            mock_enable.assert_called_once_with("/metrics")
+
+    def test_run_server_reloads_caches_on_sighup(self, adx_config):
+        """run_server asks the lifespan to install the SIGHUP cache reload on the event loop."""
+        from adx_mcp_server.main import run_server
+
+        with patch('adx_mcp_server.main.load_environment'), \
+                patch('adx_mcp_server.main.setup_environment', return_value=True), \
+                patch('adx_mcp_server.main.enable_sighup_cache_reload') as mock_enable, \
+                patch('adx_mcp_server.main.logger'), \
+                patch('adx_mcp_server.server.mcp.run'):
+            run_server()
+
+        mock_enable.assert_called_once_with()
+
+    @pytest.mark.parametrize("enabled", [True, False])
+    def test_run_server_enables_tracing(self, adx_config, enabled):
+        """Tracing is enabled from ADX_TRACING_ENABLED and flushed on shutdown."""
+        from adx_mcp_server.main import run_server
+
+        def load():
+            adx_config.mcp_server_config = MCPServerConfig(
+                mcp_server_transport="stdio",
+                mcp_bind_host="127.0.0.1",
+                mcp_bind_port=8080
+            )
+            adx_config.tracing_enabled = enabled
+
+        with patch('adx_mcp_server.main.load_environment', side_effect=load), \
+                patch('adx_mcp_server.main.setup_environment', return_value=True), \
+                patch('adx_mcp_server.main.enable_tracing') as mock_enable, \
+                patch('adx_mcp_server.main.shutdown_tracing') as mock_shutdown, \
+                patch('adx_mcp_server.main.logger'), \
+                patch('adx_mcp_server.server.mcp.run'):
+            run_server()
+
+        assert mock_enable.called is enabled
+        mock_shutdown.assert_called_once()
+
+    @pytest.mark.parametrize("timeout_seconds", [30, None])
+    def test_run_server_enables_tool_deadline(self, adx_config, timeout_seconds):
+        """ADX_TOOL_TIMEOUT_SECONDS puts a deadline on every tool call."""
+        from adx_mcp_server.main import run_server
+
+        def load():
+            adx_config.mcp_server_config = MCPServerConfig(
+                mcp_server_transport="stdio",
+                mcp_bind_host="127.0.0.1",
+                mcp_bind_port=8080
+            )
+            adx_config.tool_timeout_seconds = timeout_seconds
+
+        with patch('adx_mcp_server.main.load_environment', side_effect=load), \
+                patch('adx_mcp_server.main.setup_environment', return_value=True), \
+                patch('adx_mcp_server.main.enable_tool_deadline') as mock_enable, \
+                patch('adx_mcp_server.main.logger'), \
+                patch('adx_mcp_server.server.mcp.run'):
+            run_server()
+
+        if timeout_seconds is None:
+            mock_enable.assert_not_called()
+        else:
+            mock_enable.assert_called_once_with(timeout_seconds)
+
+    def test_invalid_tool_timeout(self, adx_config):
+        """A non-positive ADX_TOOL_TIMEOUT_SECONDS fails setup."""
+        adx_config.tool_timeout_seconds = 0
+
+        with patch('adx_mcp_server.main.logger') as mock_logger:
+            assert setup_environment() is False
+
+        mock_logger.error.assert_called_with("Invalid query limit", variable="ADX_TOOL_TIMEOUT_SECONDS", value=0)
+
+    @pytest.mark.parametrize("action,limit_rows", [("truncate", 1000), ("limit", 0)])
+    def test_invalid_preflight(self, adx_config, action, limit_rows):
+        """An unknown ADX_PREFLIGHT_ACTION or a non-positive ADX_PREFLIGHT_LIMIT_ROWS fails setup."""
+        adx_config.preflight_action = action
+        adx_config.preflight_limit_rows = limit_rows
+
+        with patch('adx_mcp_server.main.logger') as mock_logger:
+            assert setup_environment() is False
+
+        mock_logger.error.assert_called_with(
+            "Invalid preflight configuration",
+            action=action,
+            valid_actions=["reject", "limit"],
+            limit_rows=limit_rows
+        )
+
+    @pytest.mark.parametrize("transport,max_in_flight,enabled", [
+        ("http", 8, True),
+        ("sse", 8, True),
+        ("http", 0, False),
+        ("stdio", 8, False),
+    ])
+    def test_run_server_enables_admission_control_for_http(self, adx_config, transport, max_in_flight, enabled):
+        """Admission control is applied only with a network transport and a configured limit."""
+        from adx_mcp_server.main import run_server
+
+        def load():
+            adx_config.mcp_server_config = MCPServerConfig(
+                mcp_server_transport=transport,
+                mcp_bind_host="127.0.0.1",
+                mcp_bind_port=8080
+            )
+            adx_config.admission_max_in_flight = max_in_flight
+
+        with patch('adx_mcp_server.main.load_environment', side_effect=load), \
+                patch('adx_mcp_server.main.setup_environment', return_value=True), \
+                patch('adx_mcp_server.main.enable_metrics'), \
+                patch('adx_mcp_server.main.enable_admission_control') as mock_enable, \
+                patch('adx_mcp_server.main.logger'), \
+                patch('adx_mcp_server.server.mcp.run'):
+            run_server()
+
+        assert mock_enable.called is enabled
+
+    @pytest.mark.parametrize("field,value", [
+        ("admission_max_in_flight", -1),
+        ("admission_queue_timeout_seconds", 0),
+        ("client_rate_per_second", -0.5),
+        ("client_burst", 0),
+    ])
+    def test_invalid_admission_configuration(self, adx_config, field, value):
+        """Negative limits, a non-positive queue timeout or burst fail setup."""
+        setattr(adx_config, field, value)
+
+        with patch('adx_mcp_server.main.logger') as mock_logger:
+            assert setup_environment() is False
+
+        assert mock_logger.error.call_args.args[0] == "Invalid admission control configuration"
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Tests for the TTL/LRU metadata cache behind the table discovery tools.
+"""
+
+import asyncio
+import os
+import signal
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from fastmcp.client import Client
+
+from adx_mcp_server import server
+from adx_mcp_server.server import get_metadata_cache, invalidate_metadata_cache
+
+
+@pytest.fixture
+def mock_client(adx_config, make_result_set):
+    """A pooled client whose every query returns a one-row schema result, with per-table queries."""
+    with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+        with patch('adx_mcp_server.server.logger'), \
+                patch('adx_mcp_server.server._catalog_for_lookup', new=AsyncMock(return_value=None)):
+            mock_get_client.return_value.execute.return_value = make_result_set(
+                [("ColumnName", "string"), ("ColumnType", "string")], [["Id", "long"]]
+            )
+            yield mock_get_client.return_value
+
+
+class TestMetadataCache:
+    """Tests for caching list_tables, get_table_schema and get_table_details."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_schema_calls_hit_cache(self, mock_client):
+        first = await server.get_table_schema("Events")
+        second = await server.get_table_schema("Events")
+
+        assert first == second == [{"ColumnName": "Id", "ColumnType": "long"}]
+        mock_client.execute.assert_called_once()
+        stats = get_metadata_cache().stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_entries_are_per_table_and_kind(self, mock_client):
+        await server.get_table_schema("Events")
+        await server.get_table_schema("Logs")
+        await server.get_table_details("Events")
+        await server.list_tables()
+        await server.list_tables()
+
+        assert mock_client.execute.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_entries_are_per_database(self, mock_client, adx_config):
+        await server.list_tables()
+        adx_config.database = "otherdb"
+        await server.list_tables()
+
+        assert mock_client.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_with_zero_ttl(self, mock_client, adx_config):
+        adx_config.metadata_cache_ttl_seconds = 0
+
+        await server.list_tables()
+        await server.list_tables()
+
+        assert get_metadata_cache() is None
+        assert mock_client.execute.call_count == 2
+        assert invalidate_metadata_cache() == 0
+
+    @pytest.mark.asyncio
+    async def test_invalidate_single_table(self, mock_client):
+        await server.get_table_schema("Events")
+        await server.get_table_schema("Logs")
+
+        assert invalidate_metadata_cache("Events") == 1
+        await server.get_table_schema("Events")
+        await server.get_table_schema("Logs")
+
+        assert mock_client.execute.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_clear_metadata_cache_tool(self, mock_client):
+        await server.list_tables()
+        await server.get_table_details("Events")
+
+        result = await server.clear_metadata_cache()
+
+        assert result["removed"] == 2
+        assert result["stats"]["entries"] == 0
+        await server.list_tables()
+        assert mock_client.execute.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_clear_metadata_cache_tool_validates_table(self):
+        with pytest.raises(ValueError, match="Invalid table name"):
+            await server.clear_metadata_cache("bad;name")
+
+    @pytest.mark.asyncio
+    async def test_management_command_invalidates(self, mock_client):
+        """Schema-changing management commands run through execute_query clear the cache."""
+        await server.list_tables()
+        await server.execute_query(".show tables")
+        await server.list_tables()
+        assert mock_client.execute.call_count == 2
+
+        await server.execute_query(".create table NewTable (Id: long)")
+        await server.list_tables()
+        assert mock_client.execute.call_count == 4
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="SIGHUP is POSIX only")
+    async def test_sighup_invalidates_on_the_event_loop(self, mock_client):
+        await server.list_tables()
+        invalidated = asyncio.Event()
+
+        def reload_caches():
+            server.invalidate_metadata_cache()
+            invalidated.set()
+
+        with patch('adx_mcp_server.server._reload_caches_on_sighup', True), \
+                patch('adx_mcp_server.server.reload_caches', side_effect=reload_caches), \
+                patch('adx_mcp_server.server.load_persisted_catalog', return_value=None), \
+                patch('adx_mcp_server.server.prefetch_kusto_token'):
+            async with Client(server.mcp):
+                os.kill(os.getpid(), signal.SIGHUP)
+                await asyncio.wait_for(invalidated.wait(), 5)
+
+        await server.list_tables()
+        assert mock_client.execute.call_count == 2
+
+    def test_enable_sighup_cache_reload(self):
+        with patch('adx_mcp_server.server._reload_caches_on_sighup', False):
+            server.enable_sighup_cache_reload()
+            assert server._reload_caches_on_sighup is True
+
+    def test_reload_caches_clears_both_caches(self):
+        with patch('adx_mcp_server.server.invalidate_metadata_cache') as mock_metadata, \
+                patch('adx_mcp_server.server.invalidate_query_cache') as mock_query:
+            server.reload_caches()
+
+        mock_metadata.assert_called_once_with()
+        mock_query.assert_called_once_with()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Tests for the Prometheus metrics and the /metrics endpoint.
+"""
+
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+from fastmcp import FastMCP
+from fastmcp.client import Client
+
+from adx_mcp_server import server
+from adx_mcp_server.metrics import CONTENT_TYPE, Counter, Gauge, Histogram, MetricsRegistry
+
+
+class TestMetricPrimitives:
+    """Tests for Counter, Gauge, Histogram and MetricsRegistry."""
+
+    def test_counter_with_labels(self):
+        counter = Counter("requests_total", "Requests.", ("tool",))
+        counter.inc(1, "a")
+        counter.inc(2, "a")
+        counter.inc(1, 'say "hi"\n')
+
+        assert counter.value("a") == 3
+        assert counter.render() == [
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            'requests_total{tool="a"} 3',
+            'requests_total{tool="say \\"hi\\"\\n"} 1',
+        ]
+
+    def test_gauge(self):
+        gauge = Gauge("in_flight", "In flight.")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        assert gauge.value() == 1
+        gauge.set(0.5)
+        assert gauge.render()[-1] == "in_flight 0.5"
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency.", ("tool",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value, "q")
+
+        assert histogram.count("q") == 4
+        assert histogram.render()[2:] == [
+            'latency_seconds_bucket{tool="q",le="0.1"} 2',
+            'latency_seconds_bucket{tool="q",le="1"} 3',
+            'latency_seconds_bucket{tool="q",le="+Inf"} 4',
+            'latency_seconds_sum{tool="q"} 5.65',
+            'latency_seconds_count{tool="q"} 4',
+        ]
+
+    @pytest.mark.parametrize("buckets", [(), (1.0, 0.5)])
+    def test_invalid_buckets(self, buckets):
+        with pytest.raises(ValueError, match="buckets must be"):
+            Histogram("h", "H.", buckets=buckets)
+
+    def test_registry_renders_metrics_and_collectors(self):
+        registry = MetricsRegistry()
+        registry.counter("a_total", "A.").inc()
+        registry.add_collector(lambda: [("b", "gauge", "B.", [({"cache": "x"}, 2)])])
+
+        assert registry.render() == (
+            "# HELP a_total A.\n# TYPE a_total counter\na_total 1\n"
+            '# HELP b B.\n# TYPE b gauge\nb{cache="x"} 2\n'
+        )
+
+    def test_per_call_cost(self):
+        """Recording a call costs a few microseconds, cheap enough to stay on in production."""
+        histogram = Histogram("h", "H.", ("tool",))
+        counter = Counter("c", "C.", ("tool",))
+        calls = 20000
+
+        started = time.perf_counter()
+        for _ in range(calls):
+            histogram.observe(0.02, "execute_query")
+            counter.inc(1, "execute_query")
+        per_call_us = (time.perf_counter() - started) / calls * 1e6
+
+        assert per_call_us < 50
+
+
+class TestServerMetrics:
+    """Tests for the metrics recorded by the server."""
+
+    @pytest.mark.asyncio
+    async def test_query_round_trip_and_in_flight(self, adx_config):
+        before = server._kusto_request_seconds.count("sync")
+
+        def execute(database, query, properties=None):
+            assert server._queries_in_flight.value() == 1
+            return MagicMock(primary_results=[])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute.side_effect = execute
+            await server._run_query("testdb", "T | take 1")
+
+        assert server._kusto_request_seconds.count("sync") == before + 1
+        assert server._queries_in_flight.value() == 0
+
+    def test_formatting_is_timed_separately(self, make_result_set):
+        before_format = server._format_seconds.count("csv")
+        before_rows = server._result_rows.count()
+
+        server.format_results(make_result_set([("x", "int")], [[1], [2]]), "csv")
+
+        assert server._format_seconds.count("csv") == before_format + 1
+        assert server._result_rows.count() == before_rows + 1
+
+    def test_component_metrics_are_collected(self, adx_config):
+        adx_config.query_cache_ttl_seconds = 60
+        cache = server.get_query_cache()
+        cache.set("k", "v")
+        cache.get("k")
+        cache.get("missing")
+        server.get_query_executor()
+
+        text = server._metrics.render()
+
+        assert 'adx_cache_hits_total{cache="query"} 1' in text
+        assert 'adx_cache_misses_total{cache="query"} 1' in text
+        assert 'adx_executor_queued{executor="query"} 0' in text
+        assert "# TYPE adx_tool_duration_seconds histogram" in text
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint(self):
+        response = await server.metrics_endpoint(MagicMock())
+
+        assert response.media_type == CONTENT_TYPE
+        assert b"adx_queries_in_flight" in response.body
+
+    def test_enable_metrics_registers_route_and_middleware(self):
+        with patch('adx_mcp_server.server.mcp') as mock_mcp:
+            server.enable_metrics("/custom-metrics")
+
+        assert isinstance(mock_mcp.add_middleware.call_args.args[0], server.ToolMetricsMiddleware)
+        mock_mcp.custom_route.assert_called_once_with("/custom-metrics", methods=["GET"], include_in_schema=False)
+
+
+class TestToolMetricsMiddleware:
+    """Tests for the per-tool middleware, exercised through an in-memory MCP client."""
+
+    @pytest.fixture
+    def app(self):
+        app = FastMCP("metrics-test")
+        app.add_middleware(server.ToolMetricsMiddleware())
+
+        @app.tool()
+        async def metrics_probe(fail: bool = False) -> dict:
+            if fail:
+                raise KeyError("boom")
+            return {"ok": True}
+
+        return app
+
+    @pytest.mark.asyncio
+    async def test_successful_call(self, app):
+        before = server._tool_seconds.count("metrics_probe")
+
+        async with Client(app) as client:
+            await client.call_tool("metrics_probe", {})
+
+        assert server._tool_seconds.count("metrics_probe") == before + 1
+        assert server._tool_response_bytes.count("metrics_probe") >= 1
+
+    @pytest.mark.asyncio
+    async def test_error_counted_by_original_type(self, app):
+        before = server._tool_errors.value("metrics_probe", "KeyError")
+
+        with patch('fastmcp.server.server.logger'):
+            async with Client(app) as client:
+                with pytest.raises(Exception):
+                    await client.call_tool("metrics_probe", {"fail": True})
+
+        assert server._tool_errors.value("metrics_probe", "KeyError") == before + 1
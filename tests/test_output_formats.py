@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Tests for the columnar and delimited output formats.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from adx_mcp_server import server
+from adx_mcp_server.server import (
+    config,
+    format_results,
+    format_query_results_columnar,
+    format_query_results_delimited,
+    validate_output_format,
+    OutputFormat,
+)
+
+
+@pytest.fixture
+def mixed_result_set(make_result_set):
+    return make_result_set(
+        [("Name", "string"), ("Count", "long"), ("Active", "bool"), ("Props", "dynamic"), ("Timestamp", "datetime")],
+        [
+            ["alpha", 1, True, {"k": "v"}, "2024-01-01T00:00:00Z"],
+            ["beta, gamma", 2, False, [1, 2], None],
+            ["delta", None, None, None, "2024-01-02T00:00:00Z"],
+        ],
+    )
+
+
+class TestColumnarFormat:
+    """Tests for format_query_results_columnar."""
+
+    def test_columnar_layout(self, mixed_result_set):
+        """Columns are listed once with their types and rows are plain arrays."""
+        result = format_query_results_columnar(mixed_result_set)
+
+        assert result["columns"] == [
+            {"name": "Name", "type": "string"},
+            {"name": "Count", "type": "long"},
+            {"name": "Active", "type": "bool"},
+            {"name": "Props", "type": "dynamic"},
+            {"name": "Timestamp", "type": "datetime"},
+        ]
+        assert result["rows"][0] == ["alpha", 1, True, {"k": "v"}, "2024-01-01T00:00:00Z"]
+        assert len(result["rows"]) == 3
+
+    def test_columnar_reuses_raw_rows(self, mixed_result_set):
+        """Rows come straight from the response without per-row copies."""
+        result = format_query_results_columnar(mixed_result_set)
+        assert result["rows"] is mixed_result_set.primary_results[0].raw_rows
+
+    def test_columnar_empty(self):
+        """An empty result set yields no columns and no rows."""
+        with patch('adx_mcp_server.server.logger'):
+            assert format_query_results_columnar(None) == {"columns": [], "rows": []}
+
+
+class TestDelimitedFormat:
+    """Tests for format_query_results_delimited."""
+
+    def test_csv(self, mixed_result_set):
+        """CSV output has a header, quotes delimiters and renders bool/dynamic like Kusto."""
+        result = format_query_results_delimited(mixed_result_set, ",")
+
+        assert result.splitlines() == [
+            "Name,Count,Active,Props,Timestamp",
+            'alpha,1,true,"{""k"":""v""}",2024-01-01T00:00:00Z',
+            '"beta, gamma",2,false,"[1,2]",',
+            "delta,,,,2024-01-02T00:00:00Z",
+        ]
+
+    def test_tsv(self, make_result_set):
+        """TSV output uses tabs and leaves columns without converters untouched."""
+        result_set = make_result_set([("Name", "string"), ("Count", "long")], [["a", 1], ["b", 2]])
+
+        assert format_query_results_delimited(result_set, "\t") == "Name\tCount\na\t1\nb\t2\n"
+
+    def test_delimited_empty(self):
+        """An empty result set yields an empty string."""
+        with patch('adx_mcp_server.server.logger'):
+            assert format_query_results_delimited(None) == ""
+
+
+class TestFormatDispatch:
+    """Tests for format_results and output format validation."""
+
+    @pytest.mark.parametrize("output_format", OutputFormat.values())
+    def test_validate_output_format(self, output_format):
+        assert validate_output_format(output_format) == output_format
+
+    def test_validate_output_format_invalid(self):
+        with pytest.raises(ValueError, match="Invalid output_format: 'xml'"):
+            validate_output_format("xml")
+
+    def test_format_results_dispatch(self, mixed_result_set):
+        """Each output format is routed to its formatter."""
+        assert isinstance(format_results(mixed_result_set, "records"), list)
+        assert isinstance(format_results(mixed_result_set, "columnar"), dict)
+        assert format_results(mixed_result_set, "csv").startswith("Name,Count")
+        assert format_results(mixed_result_set, "tsv").startswith("Name\tCount")
+
+    def test_result_row_count(self, mixed_result_set):
+        """Row counts are computed for every output shape."""
+        for output_format in OutputFormat.values():
+            assert server._result_row_count(format_results(mixed_result_set, output_format)) == 3
+        assert server._result_row_count("") == 0
+
+
+class TestToolOutputFormats:
+    """Tests for output_format on the query tools."""
+
+    @pytest.mark.asyncio
+    async def test_execute_query_csv(self, mixed_result_set):
+        original_url, original_db = config.cluster_url, config.database
+        config.cluster_url = "https://testcluster.region.kusto.windows.net"
+        config.database = "testdb"
+
+        try:
+            with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+                with patch('adx_mcp_server.server.logger'):
+                    mock_get_client.return_value.execute.return_value = mixed_result_set
+                    result = await server.execute_query("T", output_format="csv")
+
+            assert result.startswith("Name,Count,Active,Props,Timestamp\n")
+        finally:
+            config.cluster_url, config.database = original_url, original_db
+
+    @pytest.mark.asyncio
+    async def test_sample_table_data_columnar(self, mixed_result_set):
+        original_url, original_db = config.cluster_url, config.database
+        config.cluster_url = "https://testcluster.region.kusto.windows.net"
+        config.database = "testdb"
+
+        try:
+            with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+                with patch('adx_mcp_server.server.logger'):
+                    mock_get_client.return_value.execute.return_value = mixed_result_set
+                    result = await server.sample_table_data("T", 3, output_format="columnar")
+
+            assert [col["name"] for col in result["columns"]] == ["Name", "Count", "Active", "Props", "Timestamp"]
+            assert len(result["rows"]) == 3
+        finally:
+            config.cluster_url, config.database = original_url, original_db
+
+    @pytest.mark.asyncio
+    async def test_invalid_output_format_rejected(self):
+        with pytest.raises(ValueError, match="Invalid output_format"):
+            await server.execute_query("T", output_format="xml")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Tests for cursor-based pagination of execute_query results.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from adx_mcp_server import server
+from adx_mcp_server.server import paginate_results, get_result_store, validate_page_size
+
+
+@pytest.fixture
+def numbers_result_set(make_result_set):
+    return make_result_set([("N", "long"), ("Label", "string")], [[i, f"row{i}"] for i in range(5)])
+
+
+class TestPaginateResults:
+    """Tests for paginate_results and the result store."""
+
+    def test_first_page_and_cursor(self, numbers_result_set):
+        """The first page is returned with a cursor and the rest is stored."""
+        page = paginate_results(numbers_result_set, "records", 2)
+
+        assert page["results"] == [{"N": 0, "Label": "row0"}, {"N": 1, "Label": "row1"}]
+        assert page["row_count"] == 5
+        assert page["offset"] == 0
+        assert page["next_cursor"]
+        assert len(get_result_store()) == 1
+
+    def test_single_page_is_not_stored(self, numbers_result_set):
+        """Results that fit in one page need no cursor and no stored state."""
+        page = paginate_results(numbers_result_set, "records", 10)
+
+        assert len(page["results"]) == 5
+        assert page["next_cursor"] is None
+        assert len(get_result_store()) == 0
+
+    def test_empty_result(self):
+        with patch('adx_mcp_server.server.logger'):
+            page = paginate_results(None, "columnar", 10)
+
+        assert page["results"] == {"columns": [], "rows": []}
+        assert page["row_count"] == 0
+        assert page["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_fetch_all_pages(self, numbers_result_set):
+        """Following cursors returns every row once in the original format."""
+        page = paginate_results(numbers_result_set, "columnar", 2)
+        rows = list(page["results"]["rows"])
+
+        while page["next_cursor"]:
+            page = await server.fetch_page(page["next_cursor"])
+            rows.extend(page["results"]["rows"])
+
+        assert [row[0] for row in rows] == [0, 1, 2, 3, 4]
+        assert page["offset"] == 4
+        # The stored result is released once the last page is served
+        assert len(get_result_store()) == 0
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_csv(self, numbers_result_set):
+        """Every page of a delimited result carries its own header."""
+        page = paginate_results(numbers_result_set, "csv", 3)
+        next_page = await server.fetch_page(page["next_cursor"])
+
+        assert next_page["results"] == "N,Label\n3,row3\n4,row4\n"
+
+    @pytest.mark.asyncio
+    async def test_expired_cursor(self, numbers_result_set):
+        page = paginate_results(numbers_result_set, "records", 2)
+        get_result_store().clear()
+
+        with patch('adx_mcp_server.server.logger'):
+            with pytest.raises(ValueError, match="Cursor has expired or is unknown"):
+                await server.fetch_page(page["next_cursor"])
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", server._encode_cursor("abc", -1, 2), "e30="])
+    async def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            await server.fetch_page(cursor)
+
+    def test_result_store_uses_config(self, adx_config):
+        adx_config.result_store_max_entries = 3
+        adx_config.result_store_ttl_seconds = 42
+
+        store = get_result_store()
+        assert store.max_entries == 3
+        assert store.ttl_seconds == 42
+
+
+class TestExecuteQueryPagination:
+    """Tests for page_size on execute_query."""
+
+    def test_validate_page_size(self):
+        assert validate_page_size(None) is None
+        assert validate_page_size(5) == 5
+        with pytest.raises(ValueError, match="page_size must be a positive integer"):
+            validate_page_size(0)
+
+    @pytest.mark.asyncio
+    async def test_execute_query_with_page_size(self, adx_config, numbers_result_set):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            with patch('adx_mcp_server.server.logger'):
+                mock_get_client.return_value.execute.return_value = numbers_result_set
+                page = await server.execute_query("T", page_size=2)
+
+        assert page["row_count"] == 5
+        assert len(page["results"]) == 2
+        assert page["next_cursor"]
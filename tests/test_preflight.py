@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+"""
+Tests for the execute_query preflight cost estimate and scan budget.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from adx_mcp_server import server
+from adx_mcp_server.preflight import (
+    TABLE_STATS_QUERY,
+    TableStats,
+    estimate_query_cost,
+    limit_query,
+    parse_datetime,
+    parse_timespan,
+    referenced_tables,
+    time_filter_starts,
+)
+
+NOW = datetime(2024, 6, 11, tzinfo=timezone.utc)
+GB = 1024 ** 3
+
+STATS_ROWS = [
+    {
+        "TableName": "Events",
+        "TotalExtents": 1000,
+        "TotalExtentSize": 100 * GB,
+        "TotalRowCount": 10_000_000,
+        "MinExtentsCreationTime": "2024-05-12T00:00:00.0000000Z",
+        "MaxExtentsCreationTime": "2024-06-11T00:00:00.0000000Z",
+    },
+    {
+        "TableName": "Users",
+        "TotalExtents": 2,
+        "TotalExtentSize": 1024,
+        "TotalRowCount": 10,
+        "MinExtentsCreationTime": None,
+        "MaxExtentsCreationTime": None,
+    },
+]
+STATS = {row["TableName"]: TableStats.from_row(row) for row in STATS_ROWS}
+
+
+class TestParsing:
+    """Tests for reading tables and time filters out of KQL."""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("7d", timedelta(days=7)),
+        ("1.5h", timedelta(minutes=90)),
+        ("30min", timedelta(minutes=30)),
+        ("2 days", timedelta(days=2)),
+        ("500ms", timedelta(milliseconds=500)),
+        ("1.00:00:00", None),
+        ("7w", None),
+    ])
+    def test_parse_timespan(self, text, expected):
+        assert parse_timespan(text) == expected
+
+    def test_parse_datetime(self):
+        assert parse_datetime("2024-05-01T10:00:00.1234567Z") == datetime(2024, 5, 1, 10, 0, 0, 123456, tzinfo=timezone.utc)
+        assert parse_datetime("'2024-05-01'") == datetime(2024, 5, 1, tzinfo=timezone.utc)
+        assert parse_datetime(datetime(2024, 5, 1)) == datetime(2024, 5, 1, tzinfo=timezone.utc)
+        assert parse_datetime("yesterday") is None
+        assert parse_datetime(None) is None
+
+    def test_referenced_tables(self):
+        query = """
+        let recent = Events | where Name == "Users";  // Orders are not queried
+        recent | join kind=inner (['Users']) on UserId
+        """
+
+        assert referenced_tables(query, STATS) == ["Events", "Users"]
+        assert referenced_tables("table('Users') | union Events", STATS) == ["Users", "Events"]
+        assert referenced_tables("print 'Events'", STATS) == []
+
+    @pytest.mark.parametrize("query,expected", [
+        ("Events | where Timestamp > ago(7d)", NOW - timedelta(days=7)),
+        ("Events | where Timestamp>=now(-12h) | count", NOW - timedelta(hours=12)),
+        ("Events | where Timestamp > datetime(2024-06-01)", datetime(2024, 6, 1, tzinfo=timezone.utc)),
+        ("Events | where Timestamp between (ago(2d) .. ago(1d))", NOW - timedelta(days=2)),
+        ("Events | where A > ago(1d) | where B > ago(3d)", NOW - timedelta(days=1)),
+        ("Events | where Timestamp > ago(1d) and Other > ago(1tick)", NOW - timedelta(days=1)),
+        ("Events | where (A > ago(1d) or B == 1) and Timestamp > ago(2d)", NOW - timedelta(days=2)),
+        ("Events | extend X = 1 | where Timestamp > ago(1d) | count", NOW - timedelta(days=1)),
+        ("let recent = Events | where Timestamp > ago(1d); recent | count", NOW - timedelta(days=1)),
+        ("Events | where Timestamp < ago(1d)", None),
+        ("Events | where Timestamp > ago(7d) or Level == 'x'", None),
+        ("Events | where not(Timestamp > ago(7d))", None),
+        ("Events | where ago(7d) < Timestamp", None),
+        ("Events | extend Cutoff = ago(1d)", None),
+        ("Events // | where Timestamp > ago(1d)", None),
+        ("Events | summarize count() by Timestamp | where Timestamp > ago(1d)", None),
+        ("Events | where Timestamp > ago(1d) | join (Events) on A", None),
+        ("Users | join Events on A | where Timestamp > ago(1d)", None),
+        ("Events", None),
+    ])
+    def test_time_filter_starts(self, query, expected):
+        assert time_filter_starts(query, STATS, NOW)["Events"] == expected
+
+    def test_time_filter_starts_per_table(self):
+        query = "Events | where Timestamp > ago(1d) | join (Users | where Timestamp > ago(3d)) on UserId"
+
+        assert time_filter_starts(query, STATS, NOW) == {
+            "Events": NOW - timedelta(days=1),
+            "Users": NOW - timedelta(days=3),
+        }
+        assert time_filter_starts("Orders", STATS, NOW) == {}
+
+    @pytest.mark.parametrize("query,expected", [
+        ("Events | where X == 1;\n", "Events | where X == 1\n| take 100"),
+        ("Events // all of it", "Events // all of it\n| take 100"),
+        ("let n = 1; ['Events'] | project X", "let n = 1; ['Events'] | project X\n| take 100"),
+        ("Events | where X == 1 | render timechart", "Events | where X == 1\n| take 100\n| render timechart"),
+        ("Events | summarize count() by Name", None),
+        ("Events | join (Users) on UserId", None),
+        ("Events | sort by Timestamp", None),
+        ("let e = Events; e | take 5", None),
+        ("print 1", None),
+    ])
+    def test_limit_query(self, query, expected):
+        assert limit_query(query, 100, STATS) == expected
+
+
+class TestEstimateQueryCost:
+    """Tests for the scan estimate."""
+
+    def test_unfiltered_query_scans_the_whole_table(self):
+        estimate = estimate_query_cost("Events | count", STATS, NOW)
+
+        assert (estimate.extents, estimate.bytes, estimate.rows) == (1000, 100 * GB, 10_000_000)
+        assert estimate.tables[0].since is None
+
+    def test_time_filter_scales_by_the_covered_span(self):
+        estimate = estimate_query_cost("Events | where Timestamp > ago(3d)", STATS, NOW)
+
+        assert estimate.tables[0].fraction == pytest.approx(0.1)
+        assert estimate.extents == 100
+        assert estimate.bytes == pytest.approx(10 * GB, rel=1e-6)
+
+    def test_bounds_outside_the_table_span(self):
+        assert estimate_query_cost("Events | where Timestamp > ago(60d)", STATS, NOW).bytes == 100 * GB
+        assert estimate_query_cost("Events | where Timestamp > datetime(2025-01-01)", STATS, NOW).bytes == 0
+
+    def test_tables_without_creation_times_count_fully(self):
+        estimate = estimate_query_cost("Events | where Timestamp > ago(3d) | join Users on UserId", STATS, NOW)
+
+        assert [table.table for table in estimate.tables] == ["Events", "Users"]
+        assert estimate.tables[1].bytes == 1024
+        assert estimate.to_dict()["tables"][0]["time_filter_start"] == "2024-06-08T00:00:00+00:00"
+
+    def test_time_filter_applies_only_to_its_own_table(self):
+        estimate = estimate_query_cost("Events | where Timestamp > ago(3d) | join (Events) on Id", STATS, NOW)
+
+        assert estimate.bytes == 100 * GB
+
+    def test_unknown_tables(self):
+        assert estimate_query_cost("Orders | count", STATS, NOW) is None
+
+
+class TestExecuteQueryPreflight:
+    """Tests for the scan budget in the query tools."""
+
+    @pytest.fixture
+    def kusto(self, adx_config, make_result_set):
+        adx_config.preflight_max_scan_bytes = GB
+        stats = make_result_set(
+            [("TableName", "string"), ("TotalExtents", "long"), ("TotalExtentSize", "long"), ("TotalRowCount", "long"),
+             ("MinExtentsCreationTime", "datetime"), ("MaxExtentsCreationTime", "datetime")],
+            [list(row.values()) for row in STATS_ROWS]
+        )
+        rows = make_result_set([("N", "long")], [[1]])
+
+        def execute(database, query, properties=None):
+            return stats if query == TABLE_STATS_QUERY else rows
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.datetime') as mock_datetime, \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            mock_datetime.now.return_value = NOW
+            mock_get_client.return_value.execute.side_effect = execute
+            yield mock_get_client.return_value, mock_logger
+
+    def _queries(self, client):
+        return [call.args[1] for call in client.execute.call_args_list if call.args[1] != TABLE_STATS_QUERY]
+
+    @pytest.mark.asyncio
+    async def test_query_within_budget_runs_unchanged(self, kusto):
+        client, _ = kusto
+
+        assert await server.execute_query("Events | where Timestamp > ago(1h)") == [{"N": 1}]
+
+        assert self._queries(client) == ["Events | where Timestamp > ago(1h)"]
+
+    @pytest.mark.asyncio
+    async def test_query_over_budget_is_rejected_with_the_estimate(self, kusto):
+        client, mock_logger = kusto
+
+        with pytest.raises(ValueError, match="estimated 107374182400 bytes in 1000 extents of Events") as excinfo:
+            await server.execute_query("Events | summarize count() by Name")
+
+        assert '"budget_bytes":1073741824' in str(excinfo.value)
+        assert self._queries(client) == []
+        assert mock_logger.warning.call_args.kwargs["tables"] == ["Events"]
+
+    @pytest.mark.asyncio
+    async def test_query_over_budget_is_limited(self, kusto, adx_config):
+        adx_config.preflight_action = "limit"
+        adx_config.preflight_limit_rows = 50
+        client, _ = kusto
+
+        response = await server.execute_query("Events")
+
+        assert self._queries(client) == ["Events\n| take 50"]
+        assert response["results"] == [{"N": 1}]
+        assert response["preflight"]["limited_to_rows"] == 50
+        assert response["preflight"]["estimated_extents"] == 1000
+
+    @pytest.mark.asyncio
+    async def test_limited_page_carries_the_estimate(self, kusto, adx_config):
+        adx_config.preflight_action = "limit"
+
+        page = await server.execute_query("Events", page_size=10)
+
+        assert page["preflight"]["budget_bytes"] == GB
+
+    @pytest.mark.asyncio
+    async def test_query_a_take_cannot_limit_is_rejected(self, kusto, adx_config):
+        adx_config.preflight_action = "limit"
+        client, _ = kusto
+        rejected = server._preflight_checks.value("rejected")
+
+        with pytest.raises(ValueError, match="cannot be limited"):
+            await server.execute_query("Events | summarize count() by Name | render piechart")
+
+        assert self._queries(client) == []
+        assert server._preflight_checks.value("rejected") == rejected + 1
+
+    @pytest.mark.asyncio
+    async def test_export_is_checked(self, kusto, adx_config, tmp_path, make_streaming_response):
+        pytest.importorskip("pyarrow")
+        adx_config.export_dir = str(tmp_path)
+        client, _ = kusto
+        client.execute_streaming_query.return_value = make_streaming_response([("N", "long")], [[1]])
+
+        with pytest.raises(ValueError, match="Query rejected"):
+            await server.export_query("Events")
+        adx_config.preflight_action = "limit"
+        summary = await server.export_query("Events")
+
+        assert client.execute_streaming_query.call_args.args[1] == "Events\n| take 1000"
+        assert summary["preflight"]["limited_to_rows"] == 1000
+
+    @pytest.mark.asyncio
+    async def test_streaming_query_is_checked(self, kusto, adx_config):
+        client, _ = kusto
+        client.execute_streaming_query.return_value = MagicMock()
+        client.execute_streaming_query.return_value.iter_primary_results.return_value = iter([])
+
+        with pytest.raises(ValueError, match="Query rejected"):
+            await server.execute_streaming_query("Events")
+        adx_config.preflight_action = "limit"
+        summary = await server.execute_streaming_query("Events | where Name == 'x'")
+
+        assert client.execute_streaming_query.call_args.args[1] == "Events | where Name == 'x'\n| take 1000"
+        assert summary["preflight"]["limited_to_rows"] == 1000
+
+    @pytest.mark.asyncio
+    async def test_management_commands_and_unknown_tables_are_not_checked(self, kusto):
+        client, _ = kusto
+
+        await server.execute_query(".show tables")
+        await server.execute_query("Orders | count")
+
+        assert self._queries(client) == [".show tables", "Orders | count"]
+        assert 'adx_preflight_checks_total{outcome="skipped"}' in server._metrics.render()
+
+    @pytest.mark.asyncio
+    async def test_unavailable_statistics_do_not_block_queries(self, adx_config):
+        adx_config.preflight_max_scan_bytes = GB
+
+        def execute(database, query, properties=None):
+            if query == TABLE_STATS_QUERY:
+                raise Exception("Forbidden")
+            return None
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            mock_get_client.return_value.execute.side_effect = execute
+            assert await server.execute_query("Events") == []
+
+        assert mock_logger.warning.call_args.kwargs["error"] == "Forbidden"
+
+    @pytest.mark.asyncio
+    async def test_statistics_are_cached(self, kusto, adx_config):
+        adx_config.metadata_cache_ttl_seconds = 300
+        client, _ = kusto
+
+        await server.execute_query("Events | where Timestamp > ago(1h)")
+        await server.execute_query("Events | where Timestamp > ago(2h)")
+
+        stats_calls = [call for call in client.execute.call_args_list if call.args[1] == TABLE_STATS_QUERY]
+        assert len(stats_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, adx_config):
+        with patch('adx_mcp_server.server.estimate_query') as mock_estimate, \
+                patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute.return_value = None
+            await server.execute_query("Events")
+
+        mock_estimate.assert_not_called()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Tests for the opt-in execute_query result cache.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from adx_mcp_server import server
+from adx_mcp_server.cache import TTLCache
+from adx_mcp_server.server import get_query_cache, normalize_query, invalidate_query_cache
+
+
+@pytest.fixture
+def query_cache(adx_config):
+    """Enable the query cache for the duration of a test."""
+    adx_config.query_cache_ttl_seconds = 60
+    return adx_config
+
+
+@pytest.fixture
+def mock_client(query_cache, make_result_set):
+    with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+        with patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute.return_value = make_result_set([("N", "long")], [[1], [2]])
+            yield mock_get_client.return_value
+
+
+class TestNormalizeQuery:
+    """Tests for normalize_query."""
+
+    def test_whitespace_and_comments_are_collapsed(self):
+        query = "StormEvents  // recent only\n\t| where State == 'TEXAS'\n| take 10  "
+        assert normalize_query(query) == "StormEvents | where State == 'TEXAS' | take 10"
+
+    def test_string_literals_are_preserved(self):
+        assert normalize_query("T | where s == 'a  // b'") == "T | where s == 'a  // b'"
+        assert normalize_query('T | where s == "x\\"  y"  ') == 'T | where s == "x\\"  y"'
+        assert normalize_query("T | where p == @'c:\\  dir'") == "T | where p == @'c:\\  dir'"
+        assert normalize_query("print ```a\n  b```") == "print ```a\n  b```"
+
+
+class TestByteBudget:
+    """Tests for the byte budget on TTLCache."""
+
+    def test_invalid_budget(self):
+        with pytest.raises(ValueError, match="max_bytes must be a positive integer"):
+            TTLCache(10, 60, max_bytes=0)
+
+    def test_evicts_to_fit_budget(self):
+        cache = TTLCache(10, 60, max_bytes=100)
+        cache.set("a", 1, size=60)
+        cache.set("b", 2, size=30)
+        cache.set("c", 3, size=30)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.stats()["bytes"] == 60
+        assert cache.stats()["evictions"] == 1
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = TTLCache(10, 60, max_bytes=100)
+        cache.set("a", 1, size=10)
+
+        assert cache.set("b", 2, size=101) is False
+        assert cache.get("a") == 1
+        assert len(cache) == 1
+
+    def test_replacing_entry_updates_bytes(self):
+        cache = TTLCache(10, 60, max_bytes=100)
+        cache.set("a", 1, size=40)
+        cache.set("a", 2, size=10)
+        assert cache.stats()["bytes"] == 10
+
+        cache.pop("a")
+        assert cache.stats()["bytes"] == 0
+
+
+class TestExecuteQueryCache:
+    """Tests for caching execute_query results."""
+
+    def test_disabled_by_default(self, adx_config):
+        assert get_query_cache() is None
+        assert invalidate_query_cache() == 0
+
+    def test_uses_config(self, query_cache):
+        query_cache.query_cache_max_entries = 7
+        query_cache.query_cache_max_bytes = 1000
+
+        cache = get_query_cache()
+        assert cache.max_entries == 7
+        assert cache.ttl_seconds == 60
+        assert cache.max_bytes == 1000
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_hits_cache(self, mock_client):
+        first = await server.execute_query("T | take 2")
+        second = await server.execute_query("T  // same query\n| take 2")
+
+        assert first == second == [{"N": 1}, {"N": 2}]
+        mock_client.execute.assert_called_once()
+        assert get_query_cache().stats()["hits"] == 1
+        assert get_query_cache().stats()["bytes"] > 0
+
+    @pytest.mark.asyncio
+    async def test_request_properties_are_part_of_key(self, mock_client):
+        await server.execute_query("T | take 2")
+        await server.execute_query("T | take 2", max_rows=1)
+        await server.execute_query("T | take 2", max_rows=1)
+
+        assert mock_client.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_database_is_part_of_key(self, mock_client, query_cache):
+        await server.execute_query("T | take 2")
+        query_cache.database = "otherdb"
+        await server.execute_query("T | take 2")
+
+        assert mock_client.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_use_cache_false_bypasses(self, mock_client):
+        await server.execute_query("T | take 2")
+        await server.execute_query("T | take 2", use_cache=False)
+
+        assert mock_client.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_management_commands_are_not_cached(self, mock_client):
+        await server.execute_query(".show tables")
+        await server.execute_query(".show tables")
+
+        assert mock_client.execute.call_count == 2
+        assert len(get_query_cache()) == 0
+
+    @pytest.mark.asyncio
+    async def test_schema_change_clears_cache(self, mock_client):
+        await server.execute_query("T | take 2")
+        await server.execute_query(".drop table T")
+        await server.execute_query("T | take 2")
+
+        assert mock_client.execute.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_result_over_budget_is_not_cached(self, mock_client, query_cache):
+        query_cache.query_cache_max_bytes = 1
+
+        await server.execute_query("T | take 2")
+        await server.execute_query("T | take 2")
+
+        assert mock_client.execute.call_count == 2
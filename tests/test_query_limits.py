@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Tests for server-side row and byte limits on execute_query.
+"""
+
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+
+from azure.kusto.data.exceptions import KustoServiceError
+
+from adx_mcp_server import server
+from adx_mcp_server.server import build_request_properties, limit_results, validate_limit
+
+
+@pytest.fixture
+def ten_rows(make_result_set):
+    return make_result_set([("N", "long")], [[i] for i in range(10)])
+
+
+class TestBuildRequestProperties:
+    """Tests for build_request_properties."""
+
+    def test_no_limits(self, adx_config):
+        assert build_request_properties() is None
+
+    def test_row_and_byte_limits(self, adx_config):
+        """Limits map to truncation options with partial failures deferred."""
+        properties = build_request_properties(max_rows=100, max_bytes=1024)
+
+        assert properties.get_option("truncationmaxrecords", None) == 101
+        assert properties.get_option("truncationmaxsize", None) == 1024
+        assert properties.get_option("deferpartialqueryfailures", None) is True
+        assert not properties.has_option("servertimeout")
+
+    def test_server_timeout(self, adx_config):
+        adx_config.server_timeout_seconds = 30
+
+        properties = build_request_properties()
+
+        assert properties.get_option("servertimeout", None) == timedelta(seconds=30)
+        assert not properties.has_option("truncationmaxrecords")
+
+
+class TestLimitResults:
+    """Tests for limit_results."""
+
+    def test_within_limit(self, ten_rows):
+        result_set, truncation = limit_results(ten_rows, 10)
+
+        assert result_set is ten_rows
+        assert truncation == {"truncated": False, "total_row_count": 10}
+
+    def test_extra_row_marks_truncation(self, ten_rows):
+        """The extra record requested beyond max_rows is trimmed and flags truncation."""
+        result_set, truncation = limit_results(ten_rows, 9)
+
+        assert len(result_set.primary_results[0].raw_rows) == 9
+        assert truncation == {"truncated": True, "total_row_count": None}
+
+    def test_size_truncation_error(self, ten_rows):
+        """A deferred result-set-too-large failure flags truncation."""
+        ten_rows.get_exceptions.return_value = [
+            "Query result set has exceeded the internal data size limit 1024 (E_QUERY_RESULT_SET_TOO_LARGE)"
+        ]
+
+        result_set, truncation = limit_results(ten_rows, None)
+
+        assert result_set is ten_rows
+        assert truncation == {"truncated": True, "total_row_count": None}
+
+    def test_other_partial_failures_raise(self, ten_rows):
+        ten_rows.get_exceptions.return_value = ["Partial query failure: low memory condition (E_LOW_MEMORY_CONDITION)"]
+
+        with pytest.raises(KustoServiceError, match="E_LOW_MEMORY_CONDITION"):
+            limit_results(ten_rows, 100)
+
+    def test_empty_result(self):
+        assert limit_results(None, 5) == (None, {"truncated": False, "total_row_count": 0})
+
+
+class TestExecuteQueryLimits:
+    """Tests for max_rows/max_bytes on execute_query."""
+
+    def test_validate_limit(self):
+        assert validate_limit("max_rows", None) is None
+        with pytest.raises(ValueError, match="max_rows must be a positive integer"):
+            validate_limit("max_rows", -1)
+
+    @pytest.mark.asyncio
+    async def test_per_call_max_rows(self, adx_config, ten_rows):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            with patch('adx_mcp_server.server.logger'):
+                mock_get_client.return_value.execute.return_value = ten_rows
+                result = await server.execute_query("T", max_rows=5)
+
+        properties = mock_get_client.return_value.execute.call_args.args[2]
+        assert properties.get_option("truncationmaxrecords", None) == 6
+        assert result["truncated"] is True
+        assert result["total_row_count"] is None
+        assert result["row_count"] == 5
+        assert result["results"] == [{"N": i} for i in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_server_default_limits(self, adx_config, ten_rows):
+        """ADX_MAX_ROWS/ADX_MAX_BYTES apply when the call does not override them."""
+        adx_config.max_rows = 20
+        adx_config.max_bytes = 4096
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            with patch('adx_mcp_server.server.logger'):
+                mock_get_client.return_value.execute.return_value = ten_rows
+                result = await server.execute_query("T", output_format="columnar")
+
+        properties = mock_get_client.return_value.execute.call_args.args[2]
+        assert properties.get_option("truncationmaxrecords", None) == 21
+        assert properties.get_option("truncationmaxsize", None) == 4096
+        assert result["truncated"] is False
+        assert result["total_row_count"] == 10
+        assert len(result["results"]["rows"]) == 10
+
+    @pytest.mark.asyncio
+    async def test_limits_with_pagination(self, adx_config, ten_rows):
+        """Truncation details are added to the first page of a paginated result."""
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            with patch('adx_mcp_server.server.logger'):
+                mock_get_client.return_value.execute.return_value = ten_rows
+                page = await server.execute_query("T", page_size=3, max_rows=8)
+
+        assert page["row_count"] == 8
+        assert page["truncated"] is True
+        assert len(page["results"]) == 3
+        assert page["next_cursor"]
+
+    @pytest.mark.asyncio
+    async def test_no_limits_keeps_plain_results(self, adx_config, ten_rows):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            with patch('adx_mcp_server.server.logger'):
+                mock_get_client.return_value.execute.return_value = ten_rows
+                result = await server.execute_query("T")
+
+        properties = mock_get_client.return_value.execute.call_args.args[2]
+        assert not properties.has_option("truncationmaxrecords")
+        assert not properties.has_option("servertimeout")
+        assert len(result) == 10
@@ -26,7 +26,7 @@ class TestResultFormatting:
         primary_result.columns = [column1, column2, column3, column4, column5]
         
         # Create rows with various data types
-        primary_result.rows = [
+        primary_result.raw_rows = [
             ["String1", 1, 1.1, True, None],
             ["String2", 2, 2.2, False, None],
             ["", 0, 0.0, None, None],  # Row with empty string and null values
@@ -73,7 +73,7 @@ class TestResultFormatting:
         column2.column_name = "Column"  # Duplicate name
         
         primary_result.columns = [column1, column2]
-        primary_result.rows = [
+        primary_result.raw_rows = [
             ["Value1", "Value2"],
         ]
         
@@ -95,14 +95,14 @@ class TestResultFormatting:
         column1 = MagicMock()
         column1.column_name = "Column1"
         primary_result1.columns = [column1]
-        primary_result1.rows = [["Value1"]]
+        primary_result1.raw_rows = [["Value1"]]
         
         # Second primary result (should be ignored by format_query_results)
         primary_result2 = MagicMock()
         column2 = MagicMock()
         column2.column_name = "Column2"
         primary_result2.columns = [column2]
-        primary_result2.rows = [["Value2"]]
+        primary_result2.raw_rows = [["Value2"]]
         
         mock_result_set.primary_results = [primary_result1, primary_result2]
         
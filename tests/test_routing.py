@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Tests for routing tool calls to other allowed clusters and databases.
+"""
+
+import time
+import pytest
+from unittest.mock import ANY, patch, MagicMock
+
+from adx_mcp_server import server
+from adx_mcp_server.server import KustoClientRegistry, QueryTarget, current_target, select_target
+
+DEFAULT_CLUSTER = "https://testcluster.region.kusto.windows.net"
+OTHER_CLUSTER = "https://help.kusto.windows.net"
+
+
+@pytest.fixture
+def routing_config(adx_config):
+    adx_config.allowed_clusters = [OTHER_CLUSTER]
+    adx_config.allowed_databases = ["Samples"]
+    return adx_config
+
+
+@pytest.fixture
+def clients(routing_config, make_result_set):
+    """One mock client per cluster, handed out by a patched registry."""
+    by_cluster = {}
+
+    def get_client(cluster_url):
+        client = by_cluster.setdefault(cluster_url, MagicMock())
+        client.execute.return_value = make_result_set([("N", "long")], [[1]])
+        return client
+
+    with patch.object(server._client_registry, 'get_client', side_effect=get_client):
+        with patch('adx_mcp_server.server.logger'):
+            yield by_cluster
+
+
+class TestSelectTarget:
+    """Tests for select_target."""
+
+    def test_defaults(self, routing_config):
+        assert select_target() == QueryTarget(DEFAULT_CLUSTER, "testdb")
+
+    def test_cluster_by_url_or_short_name(self, routing_config):
+        assert select_target(cluster="https://HELP.kusto.windows.net/").cluster_url == OTHER_CLUSTER
+        assert select_target(cluster="help").cluster_url == OTHER_CLUSTER
+        assert select_target(cluster="testcluster").cluster_url == DEFAULT_CLUSTER
+
+    def test_sets_current_target(self, routing_config):
+        select_target(cluster="help", database="Samples")
+        assert current_target() == QueryTarget(OTHER_CLUSTER, "Samples")
+
+    def test_cluster_not_allowed(self, routing_config):
+        with pytest.raises(ValueError, match="Cluster 'evil' is not allowed"):
+            select_target(cluster="evil")
+
+    def test_database_not_allowed(self, routing_config):
+        with pytest.raises(ValueError, match="Database 'Secrets' is not allowed"):
+            select_target(database="Secrets")
+
+    def test_wildcard_database(self, routing_config):
+        routing_config.allowed_databases = ["*"]
+        assert select_target(database="Anything").database == "Anything"
+
+    def test_default_only_without_allow_list(self, adx_config):
+        assert select_target(database="testdb").database == "testdb"
+        with pytest.raises(ValueError, match="not allowed"):
+            select_target(cluster=OTHER_CLUSTER)
+
+
+class TestRoutedTools:
+    """Tests for cluster/database arguments on tools."""
+
+    @pytest.mark.asyncio
+    async def test_execute_query_routes_to_target(self, clients):
+        await server.execute_query("T | take 1", cluster="help", database="Samples")
+        await server.execute_query("T | take 1")
+
+        clients[OTHER_CLUSTER].execute.assert_called_once_with("Samples", "T | take 1", ANY)
+        clients[DEFAULT_CLUSTER].execute.assert_called_once_with("testdb", "T | take 1", ANY)
+
+    @pytest.mark.asyncio
+    async def test_disallowed_target_is_rejected_before_querying(self, clients):
+        with pytest.raises(ValueError, match="not allowed"):
+            await server.execute_query("T", database="Secrets")
+
+        assert clients == {}
+
+    @pytest.mark.asyncio
+    async def test_metadata_is_cached_per_target(self, clients):
+        await server.get_table_details("T")
+        await server.get_table_details("T", database="Samples")
+        await server.get_table_details("T", database="Samples")
+
+        assert clients[DEFAULT_CLUSTER].execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sample_table_data_routes_to_target(self, clients):
+        await server.sample_table_data("T", cluster=OTHER_CLUSTER)
+
+        assert clients[OTHER_CLUSTER].execute.call_args.args[:2] == ("testdb", "T | sample 10")
+
+    @pytest.mark.asyncio
+    async def test_query_cache_is_per_cluster(self, clients, routing_config):
+        routing_config.query_cache_ttl_seconds = 60
+
+        await server.execute_query("T | take 1")
+        await server.execute_query("T | take 1", cluster="help")
+
+        assert OTHER_CLUSTER in clients
+        clients[DEFAULT_CLUSTER].execute.assert_called_once()
+
+
+class TestIdleEviction:
+    """Tests for closing idle clients of non-default clusters."""
+
+    @pytest.fixture
+    def mock_sdk(self):
+        with patch('adx_mcp_server.server.DefaultAzureCredential'), \
+                patch('adx_mcp_server.server.KustoConnectionStringBuilder'), \
+                patch('adx_mcp_server.server.KustoClient') as mock_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_client.side_effect = lambda kcsb: MagicMock()
+            yield
+
+    def test_evict_idle_keeps_recent_and_pinned(self, mock_sdk):
+        registry = KustoClientRegistry()
+        pinned = registry.get_client("https://a.kusto.windows.net")
+        idle = registry.get_client("https://b.kusto.windows.net")
+        registry.release(idle)
+
+        with patch('adx_mcp_server.server.time.monotonic', return_value=time.monotonic() + 100):
+            recent = registry.get_client("https://c.kusto.windows.net")
+            evicted = registry.evict_idle(60, keep=("https://a.kusto.windows.net",))
+
+        assert evicted == 1
+        idle.close.assert_called_once()
+        pinned.close.assert_not_called()
+        recent.close.assert_not_called()
+        assert registry.get_client("https://b.kusto.windows.net") is not idle
+
+    def test_get_kusto_client_sweeps_idle_clients(self, mock_sdk, routing_config):
+        routing_config.client_idle_seconds = 60
+        select_target(cluster="help")
+        other = server.get_kusto_client()
+        server._client_registry.release(other)
+        select_target()
+
+        with patch('adx_mcp_server.server.time.monotonic', return_value=time.monotonic() + 100):
+            default = server.get_kusto_client()
+
+        other.close.assert_called_once()
+        default.close.assert_not_called()
+
+    def test_leased_idle_client_is_closed_when_released(self, mock_sdk):
+        registry = KustoClientRegistry()
+        leased = registry.get_client("https://b.kusto.windows.net")
+
+        with patch('adx_mcp_server.server.time.monotonic', return_value=time.monotonic() + 100):
+            assert registry.evict_idle(60) == 1
+
+        leased.close.assert_not_called()
+        registry.release(leased)
+        leased.close.assert_called_once()
+
+    def test_no_sweep_when_disabled(self, mock_sdk, routing_config):
+        routing_config.client_idle_seconds = 0
+        assert server._idle_sweep_due() is False
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Tests for the database schema catalog and the get_database_schema tool.
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from adx_mcp_server import server
+from adx_mcp_server.catalog import SCHEMA_QUERY, SCHEMA_VERSION_QUERY, SchemaCatalog
+
+SCHEMA_JSON = json.dumps({
+    "Databases": {
+        "testdb": {
+            "Name": "testdb",
+            "MajorVersion": 12,
+            "MinorVersion": 3,
+            "Tables": {
+                "Events": {
+                    "Name": "Events",
+                    "Folder": "raw",
+                    "DocString": "Raw events",
+                    "OrderedColumns": [
+                        {"Name": "Timestamp", "Type": "System.DateTime", "CslType": "datetime"},
+                        {"Name": "Payload", "Type": "System.Object", "CslType": "dynamic"},
+                    ],
+                },
+                "Users": {
+                    "Name": "Users",
+                    "Folder": None,
+                    "DocString": None,
+                    "OrderedColumns": [{"Name": "Id", "Type": "System.Int64", "CslType": "long"}],
+                },
+            },
+        }
+    }
+})
+
+
+@pytest.fixture
+def catalog_client(adx_config, make_result_set):
+    """A client that answers the schema query with SCHEMA_JSON and any other query with one row."""
+    def execute(database, query, properties=None):
+        if query == SCHEMA_QUERY:
+            return make_result_set([("DatabaseSchema", "string")], [[SCHEMA_JSON]])
+        if query == SCHEMA_VERSION_QUERY:
+            return make_result_set([("Version", "string")], [["v12.3"]])
+        return make_result_set([("ColumnName", "string")], [["x"]])
+
+    with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+        with patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute.side_effect = execute
+            yield mock_get_client.return_value
+
+
+def _queries(client):
+    return [call.args[1] for call in client.execute.call_args_list]
+
+
+class TestSchemaCatalog:
+    """Tests for parsing SchemaCatalog."""
+
+    def test_parse_schema_json(self):
+        catalog = SchemaCatalog.from_schema_json("testdb", SCHEMA_JSON)
+
+        assert catalog.version == "v12.3"
+        assert list(catalog.tables) == ["Events", "Users"]
+        assert catalog.list_tables() == [
+            {"TableName": "Events", "Folder": "raw", "DatabaseName": "testdb"},
+            {"TableName": "Users", "Folder": "", "DatabaseName": "testdb"},
+        ]
+
+    def test_table_schema_matches_getschema(self):
+        catalog = SchemaCatalog.from_schema_json("testdb", SCHEMA_JSON)
+
+        assert catalog.table_schema("Events") == [
+            {"ColumnName": "Timestamp", "ColumnOrdinal": 0, "DataType": "System.DateTime", "ColumnType": "datetime"},
+            {"ColumnName": "Payload", "ColumnOrdinal": 1, "DataType": "System.Object", "ColumnType": "dynamic"},
+        ]
+        assert catalog.table_schema("Missing") is None
+
+    def test_single_database_under_other_name(self):
+        """The only database in the payload is used even if its key is the pretty name."""
+        catalog = SchemaCatalog.from_schema_json("db-id", SCHEMA_JSON)
+        assert len(catalog.tables) == 2
+
+    def test_dict_round_trip(self):
+        catalog = SchemaCatalog.from_schema_json("testdb", SCHEMA_JSON)
+        assert SchemaCatalog.from_dict(json.loads(json.dumps(catalog.to_dict()))) == catalog
+
+    @pytest.mark.parametrize("payload", ["not json", "[]", json.dumps({"Databases": {"a": {}, "b": {}}})])
+    def test_invalid_payload(self, payload):
+        with pytest.raises(ValueError):
+            SchemaCatalog.from_schema_json("testdb", payload)
+
+
+class TestCatalogTools:
+    """Tests for answering tools from the catalog."""
+
+    @pytest.mark.asyncio
+    async def test_get_database_schema(self, catalog_client):
+        result = await server.get_database_schema()
+
+        assert result["database"] == "testdb"
+        assert result["table_count"] == 2
+        assert result["tables"][0]["columns"][0] == {"name": "Timestamp", "type": "datetime", "data_type": "System.DateTime"}
+        assert _queries(catalog_client) == [SCHEMA_QUERY]
+
+    @pytest.mark.asyncio
+    async def test_get_database_schema_refresh(self, catalog_client):
+        await server.get_database_schema()
+        await server.get_database_schema()
+        await server.get_database_schema(refresh=True)
+
+        assert _queries(catalog_client) == [SCHEMA_QUERY, SCHEMA_QUERY]
+
+    @pytest.mark.asyncio
+    async def test_get_database_schema_missing_config(self):
+        with patch('adx_mcp_server.server.logger'):
+            with patch.object(server.config, 'cluster_url', ""):
+                with pytest.raises(ValueError, match="configuration is missing"):
+                    await server.get_database_schema()
+
+    @pytest.mark.asyncio
+    async def test_get_database_schema_error(self, catalog_client):
+        catalog_client.execute.side_effect = Exception("Forbidden")
+
+        with pytest.raises(Exception, match="Forbidden"):
+            await server.get_database_schema()
+
+    @pytest.mark.asyncio
+    async def test_per_table_tools_share_one_round_trip(self, catalog_client):
+        """Schemas of many tables and the table list come from a single schema query."""
+        events = await server.get_table_schema("Events")
+        users = await server.get_table_schema("Users")
+        tables = await server.list_tables()
+
+        assert [column["ColumnName"] for column in events] == ["Timestamp", "Payload"]
+        assert users[0]["ColumnType"] == "long"
+        assert [table["TableName"] for table in tables] == ["Events", "Users"]
+        assert _queries(catalog_client) == [SCHEMA_QUERY]
+
+    @pytest.mark.asyncio
+    async def test_unknown_table_falls_back_to_getschema(self, catalog_client):
+        result = await server.get_table_schema("MyView")
+
+        assert result == [{"ColumnName": "x"}]
+        assert _queries(catalog_client) == [SCHEMA_QUERY, "MyView | getschema"]
+
+    @pytest.mark.asyncio
+    async def test_catalog_failure_falls_back_and_is_remembered(self, catalog_client, make_result_set):
+        def execute(database, query, properties=None):
+            if query == SCHEMA_QUERY:
+                raise Exception("Forbidden")
+            return make_result_set([("ColumnName", "string")], [["x"]])
+        catalog_client.execute.side_effect = execute
+
+        await server.get_table_schema("Events")
+        await server.get_table_schema("Users")
+
+        assert _queries(catalog_client) == [SCHEMA_QUERY, "Events | getschema", "Users | getschema"]
+
+    @pytest.mark.asyncio
+    async def test_catalog_unused_when_cache_disabled(self, catalog_client, adx_config):
+        adx_config.metadata_cache_ttl_seconds = 0
+
+        await server.get_table_schema("Events")
+
+        assert _queries(catalog_client) == ["Events | getschema"]
+
+    @pytest.mark.asyncio
+    async def test_table_invalidation_drops_catalog(self, catalog_client):
+        """After invalidation the known catalog is revalidated with a version probe."""
+        await server.get_table_schema("Events")
+        server.invalidate_metadata_cache("Events")
+        await server.get_table_schema("Events")
+
+        assert _queries(catalog_client) == [SCHEMA_QUERY, SCHEMA_VERSION_QUERY]
+
+    @pytest.mark.asyncio
+    async def test_empty_schema_response(self, catalog_client, make_result_set):
+        catalog_client.execute.side_effect = None
+        catalog_client.execute.return_value = make_result_set([("DatabaseSchema", "string")], [])
+
+        with pytest.raises(ValueError, match="Empty response"):
+            await server.get_schema_catalog()
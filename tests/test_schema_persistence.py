@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""
+Tests for persisting the schema catalog and revalidating it by schema version.
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from adx_mcp_server import server
+from adx_mcp_server.catalog import (
+    SCHEMA_QUERY,
+    SCHEMA_VERSION_QUERY,
+    SchemaCatalog,
+    catalog_file_path,
+    load_catalog,
+    save_catalog,
+)
+from tests.test_schema_catalog import SCHEMA_JSON
+
+CLUSTER = "https://testcluster.region.kusto.windows.net"
+
+
+@pytest.fixture
+def catalog():
+    return SchemaCatalog.from_schema_json("testdb", SCHEMA_JSON)
+
+
+@pytest.fixture
+def schema_dir(adx_config, tmp_path):
+    adx_config.schema_cache_dir = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def versioned_client(adx_config, make_result_set):
+    """A client whose schema version can be changed by the test."""
+    state = {"version": "v12.3"}
+
+    def execute(database, query, properties=None):
+        if query == SCHEMA_QUERY:
+            return make_result_set([("DatabaseSchema", "string")], [[SCHEMA_JSON]])
+        if query == SCHEMA_VERSION_QUERY:
+            return make_result_set([("Version", "string")], [[state["version"]]])
+        raise AssertionError(f"Unexpected query: {query}")
+
+    with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+        with patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute.side_effect = execute
+            yield mock_get_client.return_value, state
+
+
+def _queries(client):
+    return [call.args[1] for call in client.execute.call_args_list]
+
+
+class TestCatalogFiles:
+    """Tests for save_catalog and load_catalog."""
+
+    def test_round_trip(self, tmp_path, catalog):
+        path = catalog_file_path(str(tmp_path), CLUSTER, "testdb")
+        save_catalog(path, CLUSTER, catalog)
+
+        assert load_catalog(path, CLUSTER, "testdb") == catalog
+        assert [p.name for p in tmp_path.iterdir()] == [path.rsplit("/", 1)[1]]
+
+    def test_path_is_per_target(self, tmp_path):
+        assert catalog_file_path("d", CLUSTER, "a") != catalog_file_path("d", CLUSTER, "b")
+        assert catalog_file_path("d", CLUSTER + "/", "a") == catalog_file_path("d", CLUSTER.upper(), "a")
+
+    def test_missing_file(self, tmp_path):
+        assert load_catalog(str(tmp_path / "none.json"), CLUSTER, "testdb") is None
+
+    def test_other_target_is_rejected(self, tmp_path, catalog):
+        path = str(tmp_path / "schema.json")
+        save_catalog(path, CLUSTER, catalog)
+
+        with pytest.raises(ValueError, match="different cluster or database"):
+            load_catalog(path, "https://other.kusto.windows.net", "testdb")
+
+    @pytest.mark.parametrize("content", ["{broken", json.dumps({"format": 99, "catalog": {}}), json.dumps({"format": 1, "cluster_url": CLUSTER, "catalog": {"database": "testdb"}})])
+    def test_corrupt_file_is_rejected(self, tmp_path, content):
+        path = tmp_path / "schema.json"
+        path.write_text(content)
+
+        with pytest.raises(ValueError):
+            load_catalog(str(path), CLUSTER, "testdb")
+
+
+class TestWarmStart:
+    """Tests for loading the persisted catalog and revalidating it."""
+
+    @pytest.mark.asyncio
+    async def test_fetched_catalog_is_persisted(self, schema_dir, versioned_client):
+        await server.get_database_schema()
+
+        path = catalog_file_path(str(schema_dir), CLUSTER, "testdb")
+        assert load_catalog(path, CLUSTER, "testdb").version == "v12.3"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_version_skips_full_fetch(self, schema_dir, versioned_client, catalog):
+        client, _ = versioned_client
+        save_catalog(catalog_file_path(str(schema_dir), CLUSTER, "testdb"), CLUSTER, catalog)
+
+        assert server.load_persisted_catalog() == catalog
+        result = await server.get_table_schema("Users")
+
+        assert result[0]["ColumnName"] == "Id"
+        assert _queries(client) == [SCHEMA_VERSION_QUERY]
+
+    @pytest.mark.asyncio
+    async def test_changed_version_refetches(self, schema_dir, versioned_client, catalog):
+        client, state = versioned_client
+        catalog.version = "v12.2"
+        save_catalog(catalog_file_path(str(schema_dir), CLUSTER, "testdb"), CLUSTER, catalog)
+        server.load_persisted_catalog()
+
+        await server.get_table_schema("Users")
+
+        assert _queries(client) == [SCHEMA_VERSION_QUERY, SCHEMA_QUERY]
+        path = catalog_file_path(str(schema_dir), CLUSTER, "testdb")
+        assert load_catalog(path, CLUSTER, "testdb").version == "v12.3"
+
+    @pytest.mark.asyncio
+    async def test_failed_probe_refetches(self, schema_dir, versioned_client, catalog, make_result_set):
+        client, _ = versioned_client
+        save_catalog(catalog_file_path(str(schema_dir), CLUSTER, "testdb"), CLUSTER, catalog)
+        server.load_persisted_catalog()
+        client.execute.side_effect = [Exception("probe failed"), make_result_set([("DatabaseSchema", "string")], [[SCHEMA_JSON]])]
+
+        assert (await server.get_schema_catalog()).version == "v12.3"
+
+    @pytest.mark.asyncio
+    async def test_refresh_ignores_known_catalog(self, schema_dir, versioned_client, catalog):
+        client, _ = versioned_client
+        save_catalog(catalog_file_path(str(schema_dir), CLUSTER, "testdb"), CLUSTER, catalog)
+        server.load_persisted_catalog()
+
+        await server.get_database_schema(refresh=True)
+
+        assert _queries(client) == [SCHEMA_QUERY]
+
+    def test_corrupt_file_is_ignored(self, schema_dir):
+        path = catalog_file_path(str(schema_dir), CLUSTER, "testdb")
+        with open(path, "w") as f:
+            f.write("{broken")
+
+        with patch('adx_mcp_server.server.logger') as mock_logger:
+            assert server.load_persisted_catalog() is None
+
+        mock_logger.warning.assert_called_once()
+
+    def test_disabled_without_directory(self, adx_config):
+        assert server.load_persisted_catalog() is None
+
+    @pytest.mark.asyncio
+    async def test_persist_failure_is_logged(self, schema_dir, versioned_client):
+        with patch('adx_mcp_server.server.save_catalog', side_effect=OSError("read-only")):
+            catalog = await server.get_schema_catalog()
+
+        assert catalog.version == "v12.3"
+
+    @pytest.mark.asyncio
+    async def test_lifespan_warms_catalog(self, schema_dir, versioned_client, catalog):
+        """On start the persisted catalog is loaded and revalidated in the background."""
+        client, _ = versioned_client
+        save_catalog(catalog_file_path(str(schema_dir), CLUSTER, "testdb"), CLUSTER, catalog)
+
+        with patch('adx_mcp_server.server.prefetch_kusto_token'):
+            async with server._lifespan(server.mcp):
+                await server._revalidate_schema_catalog()
+                assert server.get_metadata_cache().get(server._metadata_cache_key("catalog")) == catalog
+
+        assert _queries(client)[0] == SCHEMA_VERSION_QUERY
+
+    @pytest.mark.asyncio
+    async def test_warm_up_failure_is_logged(self, adx_config):
+        with patch('adx_mcp_server.server.get_schema_catalog', side_effect=Exception("offline")), \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            await server._revalidate_schema_catalog()
+
+        mock_logger.warning.assert_called_once()
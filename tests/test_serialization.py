@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""
+Tests for result serialization: per-column converters and pre-encoded tool results.
+"""
+
+import importlib
+import json
+import sys
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from fastmcp import FastMCP
+from fastmcp.client import Client
+from fastmcp.tools import FunctionTool
+
+from adx_mcp_server import serialization, server
+from adx_mcp_server.serialization import column_converters, dumps
+from adx_mcp_server.server import EncodedResultTool, format_query_results
+
+
+@pytest.fixture
+def mixed_type_result_set(make_result_set):
+    return make_result_set(
+        [
+            ("Timestamp", "datetime"), ("Duration", "timespan"), ("Price", "decimal"),
+            ("Id", "guid"), ("Ratio", "real"), ("Props", "dynamic"), ("Name", "string"),
+        ],
+        [
+            ["2024-01-01T00:00:00.1234567Z", "1.02:03:04.5000000", "1.50", "74be27de-1e4e-49d9-b579-fe0b331d3642", 0.5, {"k": [1]}, "ä"],
+            [None, "-00:00:01", None, None, "NaN", None, None],
+        ],
+    )
+
+
+class TestConverters:
+    """Tests for the per-column converters."""
+
+    def test_converters_only_for_columns_that_need_them(self):
+        converters = column_converters(["string", "datetime", "long", "timespan", "dynamic", "decimal", "guid", "real", "bool"])
+
+        assert [index for index, _ in converters] == [7]
+
+    def test_real_converter_keeps_kusto_spelling_of_non_finite_values(self):
+        (_, convert), = column_converters(["real"])
+
+        assert [convert(value) for value in (1.5, None, float("nan"), float("inf"), float("-inf"), "NaN")] == [
+            1.5, None, "NaN", "Infinity", "-Infinity", "NaN"
+        ]
+
+
+class TestDumps:
+    """Tests for the JSON encoder."""
+
+    def test_compact_and_unescaped(self):
+        assert dumps({"a": [1, "ä"]}) == '{"a":[1,"ä"]}'
+
+    @pytest.mark.parametrize("value,expected", [
+        (datetime(2024, 1, 1, tzinfo=timezone.utc), "2024-01-01T00:00:00Z"),
+        (datetime(2024, 1, 1, 1, 2, 3, 4567, tzinfo=timezone.utc), "2024-01-01T01:02:03.004567Z"),
+        (datetime(2024, 1, 1), "2024-01-01T00:00:00"),
+        (timedelta(hours=1), "01:00:00"),
+        (timedelta(days=1, hours=2, minutes=3, seconds=4, microseconds=500000), "1.02:03:04.5000000"),
+        (timedelta(seconds=-1), "-00:00:01"),
+        (timedelta(0), "00:00:00"),
+    ])
+    def test_dates_and_timespans_use_kusto_notation(self, value, expected):
+        assert dumps(value) == json.dumps(expected)
+
+    def test_non_json_values(self):
+        value = {
+            "when": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            "took": timedelta(seconds=90),
+            "price": Decimal("1.50"),
+            "id": uuid.UUID("74be27de-1e4e-49d9-b579-fe0b331d3642"),
+            "tags": {"x"},
+            "raw": b"bytes",
+            "other": object,
+        }
+
+        assert json.loads(dumps(value)) == {
+            "when": "2024-01-01T00:00:00Z",
+            "took": "00:01:30",
+            "price": "1.50",
+            "id": "74be27de-1e4e-49d9-b579-fe0b331d3642",
+            "tags": ["x"],
+            "raw": "bytes",
+            "other": str(object),
+        }
+
+    def test_stdlib_fallback_without_orjson(self, monkeypatch):
+        """Without orjson the stdlib encoder produces the same text."""
+        value = {"when": datetime(2024, 1, 1, tzinfo=timezone.utc), "price": Decimal("2"), "name": "ä"}
+        expected = dumps(value)
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        try:
+            fallback = importlib.reload(serialization)
+            assert fallback.json_backend() == "json"
+            assert fallback.dumps(value) == expected
+        finally:
+            monkeypatch.delitem(sys.modules, "orjson")
+            importlib.reload(serialization)
+
+
+class TestFormatQueryResults:
+    """Tests for record formatting from raw rows."""
+
+    def test_values_are_kept_as_kusto_sent_them(self, mixed_type_result_set):
+        records = format_query_results(mixed_type_result_set)
+
+        assert records == [
+            {
+                "Timestamp": "2024-01-01T00:00:00.1234567Z",
+                "Duration": "1.02:03:04.5000000",
+                "Price": "1.50",
+                "Id": "74be27de-1e4e-49d9-b579-fe0b331d3642",
+                "Ratio": 0.5,
+                "Props": {"k": [1]},
+                "Name": "ä",
+            },
+            {"Timestamp": None, "Duration": "-00:00:01", "Price": None, "Id": None, "Ratio": "NaN", "Props": None, "Name": None},
+        ]
+        # The stdlib encoder accepts the records without a fallback
+        json.dumps(records, allow_nan=False)
+
+    def test_typed_rows_are_not_built(self, mixed_type_result_set):
+        """The SDK's typed rows, which parse every datetime, timespan and decimal, are never used."""
+        table = mixed_type_result_set.primary_results[0]
+        format_query_results(mixed_type_result_set)
+
+        assert not table.kusto_result_rows
+
+    def test_non_finite_reals(self, make_result_set):
+        result_set = make_result_set([("Ratio", "real")], [[float("nan")], [1.5]])
+
+        assert format_query_results(result_set) == [{"Ratio": "NaN"}, {"Ratio": 1.5}]
+
+
+class TestEncodedResultTool:
+    """Tests for tools that return pre-encoded results."""
+
+    @pytest.fixture
+    def app(self):
+        app = FastMCP("serialization-test")
+
+        def records() -> List[Dict[str, Any]]:
+            return [{"a": 1, "b": "ä"}]
+
+        def mapping() -> Dict[str, Any]:
+            return {"rows": [[1, 2]]}
+
+        def text() -> str:
+            return "a,b\n1,2\n"
+
+        def number() -> int:
+            return 7
+
+        for fn in (records, mapping, text, number):
+            app.add_tool(EncodedResultTool.from_function(fn))
+        return app
+
+    @pytest.mark.asyncio
+    async def test_fastmcp_calls_the_conversion_hook(self, app):
+        # EncodedResultTool overrides FunctionTool.convert_result, which fastmcp
+        # does not document; if the hook goes away results silently lose the encoding
+        assert callable(getattr(FunctionTool, "convert_result", None))
+
+        with patch.object(EncodedResultTool, "convert_result", autospec=True, side_effect=EncodedResultTool.convert_result) as hook:
+            async with Client(app) as client:
+                await client.call_tool("mapping", {})
+
+        hook.assert_called_once()
+        assert hook.call_args.args[1] == {"rows": [[1, 2]]}
+
+    @pytest.mark.asyncio
+    async def test_list_result(self, app):
+        async with Client(app) as client:
+            result = await client.call_tool("records", {})
+
+        assert result.content[0].text == '[{"a":1,"b":"ä"}]'
+        assert result.structured_content == {"result": [{"a": 1, "b": "ä"}]}
+        assert result.data == [{"a": 1, "b": "ä"}]
+
+    @pytest.mark.asyncio
+    async def test_dict_result(self, app):
+        async with Client(app) as client:
+            result = await client.call_tool("mapping", {})
+
+        assert result.content[0].text == '{"rows":[[1,2]]}'
+        assert result.structured_content == {"rows": [[1, 2]]}
+
+    @pytest.mark.asyncio
+    async def test_text_result_is_not_quoted(self, app):
+        async with Client(app) as client:
+            result = await client.call_tool("text", {})
+
+        assert result.content[0].text == "a,b\n1,2\n"
+
+    @pytest.mark.asyncio
+    async def test_other_results_use_default_conversion(self, app):
+        async with Client(app) as client:
+            result = await client.call_tool("number", {})
+
+        assert result.data == 7
+
+    def test_text_without_output_schema(self):
+        tool = EncodedResultTool.from_function(lambda: None, name="untyped", output_schema=None)
+
+        assert tool.convert_result([1, 2]).structured_content is None
+        assert tool.convert_result({"a": 1}).structured_content == {"a": 1}
+
+    @pytest.mark.asyncio
+    async def test_server_tools_are_pre_encoded(self):
+        tools = await server.mcp.list_tools()
+
+        assert tools
+        assert all(isinstance(tool, EncodedResultTool) for tool in tools)
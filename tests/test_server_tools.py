@@ -155,7 +155,7 @@ class TestFormatQueryResults:
         col2.column_name = "Value"
 
         primary_result.columns = [col1, col2]
-        primary_result.rows = [
+        primary_result.raw_rows = [
             ["Row1", 100],
             ["Row2", 200],
             ["Row3", 300]
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+Tests for coalescing identical concurrent queries.
+"""
+
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+
+from adx_mcp_server import server
+from adx_mcp_server.singleflight import SingleFlight
+from adx_mcp_server.server import get_single_flight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return value * 2
+
+        results = await asyncio.gather(*[flight.run("k", fetch, 21) for _ in range(5)])
+
+        assert results == [42] * 5
+        assert calls == [21]
+        assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 4}
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+
+        async def fetch(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        assert await asyncio.gather(flight.run("a", fetch, 1), flight.run("b", fetch, 2)) == [1, 2]
+        assert flight.stats()["executed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            return object()
+
+        first = await flight.run("k", fetch)
+        second = await flight.run("k", fetch)
+
+        assert first is not second
+        assert flight.stats()["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(flight.run("k", fail), flight.run("k", fail), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flight.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flight.run("k", fetch))
+        second = asyncio.ensure_future(flight.run("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    @pytest.mark.asyncio
+    async def test_call_is_cancelled_with_its_last_caller(self):
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.ensure_future(flight.run("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+
+        callers[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        assert flight.stats()["in_flight"] == 0
+
+
+class TestQueryCoalescing:
+    """Tests for coalescing in execute_query."""
+
+    @pytest.fixture
+    def slow_client(self, adx_config, make_result_set):
+        release = threading.Event()
+
+        def slow_execute(database, query, properties=None):
+            release.wait(1)
+            return make_result_set([("N", "long")], [[1]])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            with patch('adx_mcp_server.server.logger'):
+                mock_get_client.return_value.execute.side_effect = slow_execute
+                yield mock_get_client.return_value, release
+
+    @pytest.mark.asyncio
+    async def test_identical_queries_reach_cluster_once(self, slow_client):
+        client, release = slow_client
+        tasks = [
+            asyncio.ensure_future(server.execute_query("T | take 1")),
+            asyncio.ensure_future(server.execute_query("T\n| take 1 // same")),
+            asyncio.ensure_future(server.execute_query("T | take 1", use_cache=False)),
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [[{"N": 1}]] * 3
+        client.execute.assert_called_once()
+        assert get_single_flight().stats()["coalesced"] == 2
+
+    @pytest.mark.asyncio
+    async def test_different_limits_are_not_coalesced(self, slow_client):
+        client, release = slow_client
+        tasks = [
+            asyncio.ensure_future(server.execute_query("T | take 1")),
+            asyncio.ensure_future(server.execute_query("T | take 1", max_rows=5)),
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert client.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_management_commands_are_not_coalesced(self, slow_client):
+        client, release = slow_client
+        release.set()
+
+        await asyncio.gather(*[server.execute_query(".set-or-append T <| print 1") for _ in range(2)])
+
+        assert client.execute.call_count == 2
+        assert get_single_flight().stats()["executed"] == 0
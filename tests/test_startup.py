@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Tests for fast startup: lazy Azure SDK imports and configuration deferred to run_server.
+"""
+
+import dataclasses
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from unittest.mock import patch
+
+from adx_mcp_server import server
+from adx_mcp_server.main import load_environment
+
+SRC_DIR = str(Path(__file__).parent.parent / "src")
+
+# Milliseconds importing the server may add on top of fastmcp and structlog
+STARTUP_BUDGET_MS = float(os.environ.get("ADX_STARTUP_BUDGET_MS", "250"))
+
+_PROBE = """
+import json, sys, time
+from fastmcp import FastMCP
+import structlog
+started = time.perf_counter()
+import adx_mcp_server.main
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({
+    "elapsed_ms": elapsed_ms,
+    "azure_modules": sorted(m for m in sys.modules if m.startswith("azure")),
+    "cluster_url": adx_mcp_server.main.config.cluster_url,
+    "logging_configured": structlog.is_configured(),
+}))
+"""
+
+
+def _probe_import():
+    """Import the server in a fresh interpreter and report what the import did."""
+    env = dict(os.environ, PYTHONPATH=SRC_DIR, ADX_CLUSTER_URL="https://fromenv.kusto.windows.net")
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True, check=True, timeout=60
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def probe():
+    return _probe_import()
+
+
+class TestImportSideEffects:
+    """Tests for what importing the server does (and does not do)."""
+
+    def test_import_does_not_load_azure_sdk(self, probe):
+        assert probe["azure_modules"] == []
+
+    def test_import_does_not_read_configuration_or_configure_logging(self, probe):
+        assert probe["cluster_url"] == ""
+        assert probe["logging_configured"] is False
+
+    def test_import_time_within_budget(self):
+        """Regression threshold on the server's own import cost (best of three runs)."""
+        elapsed_ms = min(_probe_import()["elapsed_ms"] for _ in range(3))
+        assert elapsed_ms < STARTUP_BUDGET_MS, (
+            f"Importing adx_mcp_server took {elapsed_ms:.0f} ms, budget is {STARTUP_BUDGET_MS:.0f} ms"
+        )
+
+
+class TestLazyAzureSdk:
+    """Tests for the lazily bound Azure SDK names."""
+
+    def test_names_resolve_on_attribute_access(self):
+        from azure.kusto.data import KustoClient
+
+        assert server.KustoClient is KustoClient
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError, match="no_such_name"):
+            server.no_such_name
+
+    def test_patched_name_is_not_overwritten(self):
+        with patch('adx_mcp_server.server.ClientRequestProperties') as mock_properties:
+            server._load_azure_sdk()
+            assert server.build_request_properties(max_rows=5) is mock_properties.return_value
+
+
+class TestDeferredConfiguration:
+    """Tests for building the configuration at startup."""
+
+    @pytest.fixture
+    def restore_config(self):
+        original = dataclasses.replace(server.config)
+        yield server.config
+        for config_field in dataclasses.fields(server.config):
+            setattr(server.config, config_field.name, getattr(original, config_field.name))
+
+    def test_load_config_updates_shared_config(self, monkeypatch, restore_config):
+        monkeypatch.setenv("ADX_CLUSTER_URL", "https://fromenv.kusto.windows.net")
+        monkeypatch.setenv("ADX_DATABASE", "envdb")
+        monkeypatch.setenv("ADX_ALLOWED_DATABASES", "a, b")
+
+        loaded = server.load_config()
+
+        assert loaded is restore_config
+        assert restore_config.cluster_url == "https://fromenv.kusto.windows.net"
+        assert restore_config.database == "envdb"
+        assert restore_config.allowed_databases == ["a", "b"]
+        assert restore_config.mcp_server_config.mcp_server_transport == "stdio"
+
+    def test_load_environment(self, monkeypatch, restore_config):
+        monkeypatch.setenv("ADX_DATABASE", "envdb")
+
+        with patch('dotenv.load_dotenv', return_value=False), \
+                patch('adx_mcp_server.main.configure_logging') as mock_configure, \
+                patch('adx_mcp_server.main.logger') as mock_logger:
+            load_environment()
+
+        mock_configure.assert_called_once()
+        mock_logger.info.assert_any_call("No .env file found, using system environment variables")
+        assert restore_config.database == "envdb"
+
+    def test_run_server_loads_environment_before_validation(self):
+        calls = []
+        with patch('adx_mcp_server.main.load_environment', side_effect=lambda: calls.append("load")), \
+                patch('adx_mcp_server.main.setup_environment', side_effect=lambda: calls.append("setup") or False), \
+                patch('adx_mcp_server.main.logger'):
+            from adx_mcp_server.main import run_server
+            with pytest.raises(SystemExit):
+                run_server()
+
+        assert calls == ["load", "setup"]
+
+    @pytest.mark.parametrize("level", ["DEBUG", "debug", "10"])
+    def test_configure_logging_accepts_level_names(self, monkeypatch, level):
+        monkeypatch.setenv("LOG_LEVEL", level)
+        with patch('adx_mcp_server.server.structlog.configure') as mock_configure, \
+                patch('adx_mcp_server.server.structlog.make_filtering_bound_logger') as mock_filter:
+            server.configure_logging()
+
+        mock_filter.assert_called_once_with(10)
+        mock_configure.assert_called_once()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+"""
+Tests for streaming query results as MCP progress notifications.
+"""
+
+import asyncio
+import json
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastmcp.client import Client
+
+from adx_mcp_server import server
+from adx_mcp_server.server import _progress_token, _stream_query
+
+COLUMNS = [("Name", "string"), ("Ratio", "real")]
+
+
+def make_ctx(meta):
+    ctx = MagicMock()
+    ctx.request_context.meta = meta
+    return ctx
+
+
+class TestStreamQuery:
+    """Tests for the streaming reader running on the worker thread."""
+
+    def test_rows_are_handed_over_in_batches(self, adx_config, make_streaming_response):
+        batches = []
+        response = make_streaming_response(COLUMNS, [[f"r{i}", float("nan") if i == 0 else i / 2] for i in range(5)])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = _stream_query("testdb", "T", None, 2, None, lambda columns, rows: batches.append(rows), threading.Event())
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert batches[0][0] == ["r0", "NaN"]
+        assert summary == {
+            "columns": [{"name": "Name", "type": "string"}, {"name": "Ratio", "type": "real"}],
+            "row_count": 5,
+            "batch_count": 3,
+            "truncated": False,
+        }
+
+    def test_max_rows_stops_reading(self, adx_config, make_streaming_response):
+        rows = iter([[i] for i in range(10)])
+        response = make_streaming_response([("N", "long")], rows)
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = _stream_query("testdb", "T", None, 3, 4, lambda columns, batch: None, threading.Event())
+
+        assert summary["row_count"] == 4
+        assert summary["batch_count"] == 2
+        assert summary["truncated"] is True
+        # The rest of the response is left unread
+        assert len(list(rows)) == 5
+
+    def test_stop_event_ends_the_stream(self, adx_config, make_streaming_response):
+        stop = threading.Event()
+        batches = []
+
+        def on_batch(columns, rows):
+            batches.append(rows)
+            stop.set()
+
+        response = make_streaming_response([("N", "long")], [[i] for i in range(10)])
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = _stream_query("testdb", "T", None, 2, None, on_batch, stop)
+
+        assert batches == [[[0], [1]]]
+        assert summary["batch_count"] == 1
+
+    def test_partial_failures_are_raised_after_the_rows(self, adx_config, make_streaming_response):
+        from azure.kusto.data.exceptions import KustoServiceError
+
+        batches = []
+        response = make_streaming_response([("N", "long")], [[1]], errors=["Description:'E_LOW_MEMORY_CONDITION'"])
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            with pytest.raises(KustoServiceError, match="E_LOW_MEMORY_CONDITION"):
+                _stream_query("testdb", "T", None, 2, None, lambda columns, rows: batches.append(rows), threading.Event())
+
+        assert batches == [[[1]]]
+        response.set_skip_incomplete_tables.assert_called_once_with(True)
+
+    def test_truncation_failure_marks_the_result_truncated(self, adx_config, make_streaming_response):
+        response = make_streaming_response([("N", "long")], [[1]], errors=["Description:'E_QUERY_RESULT_SET_TOO_LARGE'"])
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = _stream_query("testdb", "T", None, 2, None, lambda columns, rows: None, threading.Event())
+
+        assert summary["row_count"] == 1
+        assert summary["truncated"] is True
+
+    def test_stopped_stream_skips_the_failure_check(self, adx_config, make_streaming_response):
+        stop = threading.Event()
+        stop.set()
+        response = make_streaming_response([("N", "long")], [[1]], errors=["Description:'E_LOW_MEMORY_CONDITION'"])
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = _stream_query("testdb", "T", None, 2, None, lambda columns, rows: None, stop)
+
+        assert summary["row_count"] == 0
+        response.get_exceptions.assert_not_called()
+
+    def test_stopped_stream_is_read_to_the_end(self, adx_config, make_streaming_response):
+        stop = threading.Event()
+        stop.set()
+        response = make_streaming_response([("N", "long")], [[1]])
+        response.__iter__.return_value = iter([MagicMock(), MagicMock()])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            _stream_query("testdb", "T", None, 2, None, lambda columns, rows: None, stop)
+
+        response.set_skip_incomplete_tables.assert_called_once_with(True)
+        assert list(response.__iter__.return_value) == []
+
+    def test_stopped_stream_ending_with_an_error_is_not_raised(self, adx_config, make_streaming_response):
+        stop = threading.Event()
+        stop.set()
+        response = make_streaming_response([("N", "long")], [[1]])
+        response.__iter__.side_effect = RuntimeError("Query was cancelled")
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = _stream_query("testdb", "T", None, 2, None, lambda columns, rows: None, stop)
+
+        assert summary["row_count"] == 0
+        mock_logger.debug.assert_called_once()
+
+    def test_no_primary_result(self, adx_config):
+        response = MagicMock()
+        response.iter_primary_results.return_value = iter([])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = _stream_query("testdb", "T", None, 2, None, lambda columns, rows: None, threading.Event())
+
+        assert summary == {"columns": [], "row_count": 0, "batch_count": 0, "truncated": False}
+
+    def test_auth_error_retries_once(self, adx_config, make_streaming_response):
+        from azure.kusto.data.exceptions import KustoAuthenticationError
+
+        response = make_streaming_response([("N", "long")], [[1]])
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.side_effect = [
+                KustoAuthenticationError("expired", Exception("401")), response
+            ]
+            summary = _stream_query("testdb", "T", None, 2, None, lambda columns, rows: None, threading.Event())
+
+        assert summary["row_count"] == 1
+        assert mock_get_client.return_value.execute_streaming_query.call_count == 2
+
+    def test_other_errors_are_raised(self, adx_config):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client:
+            mock_get_client.return_value.execute_streaming_query.side_effect = Exception("Query failed")
+            with pytest.raises(Exception, match="Query failed"):
+                _stream_query("testdb", "T", None, 2, None, lambda columns, rows: None, threading.Event())
+
+
+class TestStreamingQueryTool:
+    """Tests for the execute_streaming_query tool."""
+
+    def test_progress_token(self):
+        assert _progress_token(None) is None
+        assert _progress_token(make_ctx(None)) is None
+        assert _progress_token(make_ctx({"progressToken": 7})) == 7
+
+    @pytest.mark.asyncio
+    async def test_batches_are_sent_as_progress_notifications(self, adx_config, make_streaming_response):
+        adx_config.stream_batch_rows = 2
+        ctx = make_ctx({"progressToken": "t"})
+        notifications = []
+
+        async def report_progress(progress, total=None, message=None):
+            notifications.append((progress, json.loads(message)))
+
+        ctx.report_progress = report_progress
+        response = make_streaming_response(COLUMNS, [["a", 1.0], ["b", 2.0], ["c", 3.0]])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = await server.execute_streaming_query("T", ctx=ctx)
+
+        properties = mock_get_client.return_value.execute_streaming_query.call_args.kwargs["properties"]
+        assert properties.get_option("notruncation", None) is True
+        assert notifications == [
+            (2, {"batch": 0, "rows": [["a", 1.0], ["b", 2.0]], "columns": [{"name": "Name", "type": "string"}, {"name": "Ratio", "type": "real"}]}),
+            (3, {"batch": 1, "rows": [["c", 3.0]]}),
+        ]
+        assert summary["streamed"] is True
+        assert summary["row_count"] == 3
+        assert "rows" not in summary
+
+    @pytest.mark.asyncio
+    async def test_rows_are_returned_inline_without_a_progress_token(self, adx_config, make_streaming_response):
+        response = make_streaming_response(COLUMNS, [["a", 1.0], ["b", 2.0], ["c", 3.0]])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = await server.execute_streaming_query("T", batch_size=2, max_rows=2)
+
+        properties = mock_get_client.return_value.execute_streaming_query.call_args.kwargs["properties"]
+        assert properties.get_option("truncationmaxrecords", None) == 3
+        assert not properties.has_option("notruncation")
+        assert summary["streamed"] is False
+        assert summary["rows"] == [["a", 1.0], ["b", 2.0]]
+        assert summary["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_max_bytes_is_enforced_by_the_cluster(self, adx_config, make_streaming_response):
+        adx_config.max_bytes = 4096
+        ctx = make_ctx({"progressToken": "t"})
+        ctx.report_progress = AsyncMock()
+        response = make_streaming_response(COLUMNS, [["a", 1.0]], errors=["Description:'E_QUERY_RESULT_SET_TOO_LARGE'"])
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            summary = await server.execute_streaming_query("T", ctx=ctx)
+
+        properties = mock_get_client.return_value.execute_streaming_query.call_args.kwargs["properties"]
+        assert properties.get_option("truncationmaxsize", None) == 4096
+        assert properties.get_option("deferpartialqueryfailures", None) is True
+        assert not properties.has_option("notruncation")
+        assert summary["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_invalid_batch_size(self, adx_config):
+        with pytest.raises(ValueError, match="batch_size must be a positive integer"):
+            await server.execute_streaming_query("T", batch_size=0)
+
+    @pytest.mark.asyncio
+    async def test_missing_configuration(self, adx_config):
+        adx_config.cluster_url = ""
+
+        with patch('adx_mcp_server.server.logger'):
+            with pytest.raises(ValueError, match="configuration is missing"):
+                await server.execute_streaming_query("T")
+
+    @pytest.mark.asyncio
+    async def test_query_failure_is_logged(self, adx_config):
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            mock_get_client.return_value.execute_streaming_query.side_effect = Exception("Query failed")
+            with pytest.raises(Exception, match="Query failed"):
+                await server.execute_streaming_query("T")
+
+        mock_logger.error.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cancellation_stops_the_reader(self, adx_config, make_streaming_response):
+        ctx = make_ctx({"progressToken": "t"})
+        first_batch = asyncio.Event()
+        consumed = []
+
+        async def report_progress(progress, total=None, message=None):
+            first_batch.set()
+
+        def rows():
+            for i in range(1000):
+                consumed.append(i)
+                yield [i]
+
+        ctx.report_progress = report_progress
+        response = make_streaming_response([("N", "long")], rows())
+
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            task = asyncio.create_task(server.execute_streaming_query("T", batch_size=1, ctx=ctx))
+            await first_batch.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            for _ in range(500):
+                if server.get_query_executor().stats()["running"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+
+        assert server.get_query_executor().stats()["running"] == 0
+        assert len(consumed) < 1000
+
+    @pytest.mark.asyncio
+    async def test_client_receives_progress_notifications(self, adx_config, make_streaming_response):
+        received = []
+
+        async def progress_handler(progress, total, message):
+            received.append((progress, json.loads(message)))
+
+        response = make_streaming_response(COLUMNS, [["a", 1.0], ["b", 2.0], ["c", 3.0]])
+        with patch('adx_mcp_server.server.get_kusto_client') as mock_get_client, \
+                patch('adx_mcp_server.server.logger'):
+            mock_get_client.return_value.execute_streaming_query.return_value = response
+            async with Client(server.mcp) as client:
+                result = await client.call_tool(
+                    "execute_streaming_query", {"query": "T", "batch_size": 2}, progress_handler=progress_handler
+                )
+
+        assert [progress for progress, _ in received] == [2, 3]
+        assert [message["rows"] for _, message in received] == [[["a", 1.0], ["b", 2.0]], [["c", 3.0]]]
+        assert result.structured_content["row_count"] == 3
+        assert result.structured_content["streamed"] is True
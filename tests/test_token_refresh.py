@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""
+Tests for proactive background refresh of Kusto access tokens.
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from azure.core.credentials import AccessToken
+
+from adx_mcp_server import server
+from adx_mcp_server.credentials import RefreshingCredential
+
+SCOPE = "https://kusto.kusto.windows.net/.default"
+
+
+def _credential(lifetime=3600.0, delay=0.0):
+    """A fake credential issuing tokens that live for ``lifetime`` seconds."""
+    credential = MagicMock()
+    issued = []
+
+    def get_token(*scopes, **kwargs):
+        time.sleep(delay)
+        token = AccessToken(f"token-{len(issued)}", int(time.time() + lifetime))
+        issued.append(token)
+        return token
+
+    credential.get_token.side_effect = get_token
+    return credential
+
+
+class TestRefreshingCredential:
+    """Tests for RefreshingCredential."""
+
+    def test_invalid_margin(self):
+        with pytest.raises(ValueError, match="refresh_margin_seconds must be positive"):
+            RefreshingCredential(MagicMock(), 0)
+
+    def test_tokens_are_cached_per_scope(self):
+        inner = _credential()
+        credential = RefreshingCredential(inner, 300)
+        try:
+            first = credential.get_token(SCOPE)
+            second = credential.get_token(SCOPE)
+            other = credential.get_token("https://other/.default")
+
+            assert first is second
+            assert other is not first
+            assert inner.get_token.call_count == 2
+        finally:
+            credential.close()
+
+    def test_prefetched_token_serves_queries_without_waiting(self):
+        inner = _credential(delay=0.1)
+        credential = RefreshingCredential(inner, 300)
+        try:
+            credential.prefetch(SCOPE)
+
+            started = time.monotonic()
+            credential.get_token(SCOPE)
+            assert time.monotonic() - started < 0.05
+            assert credential.stats()["last_refresh_ms"] >= 100
+        finally:
+            credential.close()
+
+    def test_background_refresh_before_expiry(self):
+        """A token inside the refresh margin is replaced in the background."""
+        inner = _credential(lifetime=300.5)
+        credential = RefreshingCredential(inner, 300)
+        try:
+            with patch('adx_mcp_server.credentials._MIN_REFRESH_INTERVAL_SECONDS', 0.2):
+                first = credential.get_token(SCOPE)
+                deadline = time.monotonic() + 2
+                while credential.stats()["refreshes"] < 2 and time.monotonic() < deadline:
+                    time.sleep(0.05)
+
+            assert inner.get_token.call_count >= 2
+            assert credential.get_token(SCOPE) is not first
+        finally:
+            credential.close()
+
+    def test_expired_token_is_acquired_inline(self):
+        inner = _credential(lifetime=10)
+        credential = RefreshingCredential(inner, 1)
+        try:
+            first = credential.get_token(SCOPE)
+            second = credential.get_token(SCOPE)
+
+            assert first is not second
+        finally:
+            credential.close()
+
+    def test_failed_refresh_is_counted_and_retried(self):
+        inner = _credential(lifetime=300.3)
+        credential = RefreshingCredential(inner, 300)
+        try:
+            with patch('adx_mcp_server.credentials._MIN_REFRESH_INTERVAL_SECONDS', 0.1), \
+                    patch('adx_mcp_server.credentials.logger') as mock_logger:
+                credential.get_token(SCOPE)
+                inner.get_token.side_effect = Exception("AAD unavailable")
+                deadline = time.monotonic() + 2
+                while not mock_logger.warning.called and time.monotonic() < deadline:
+                    time.sleep(0.05)
+
+            assert credential.stats()["refresh_failures"] == 1
+            mock_logger.warning.assert_called_once()
+        finally:
+            credential.close()
+
+    def test_claims_bypass_cache(self):
+        inner = _credential()
+        credential = RefreshingCredential(inner, 300)
+        try:
+            credential.get_token(SCOPE)
+            credential.get_token(SCOPE, claims="challenge")
+
+            assert inner.get_token.call_count == 2
+            inner.get_token.assert_called_with(SCOPE, claims="challenge")
+        finally:
+            credential.close()
+
+    def test_stats(self):
+        credential = RefreshingCredential(_credential(lifetime=1000), 300)
+        try:
+            assert credential.stats()["tokens"] == 0
+            credential.get_token(SCOPE)
+
+            stats = credential.stats()
+            assert stats["tokens"] == 1
+            assert stats["token_age_seconds"] < 1
+            assert 990 < stats["expires_in_seconds"] <= 1000
+            assert stats["refreshes"] == 1
+        finally:
+            credential.close()
+
+    def test_close_stops_refresher_and_closes_credential(self):
+        inner = _credential()
+        credential = RefreshingCredential(inner, 300)
+        credential.get_token(SCOPE)
+        thread = credential._thread
+
+        credential.close()
+        thread.join(1)
+
+        assert not thread.is_alive()
+        inner.close.assert_called_once()
+
+
+class TestRegistryIntegration:
+    """Tests for the refreshing credential in the client registry."""
+
+    @pytest.fixture
+    def mock_sdk(self, monkeypatch):
+        monkeypatch.delenv('AZURE_TENANT_ID', raising=False)
+        monkeypatch.delenv('AZURE_CLIENT_ID', raising=False)
+        with patch('adx_mcp_server.server.DefaultAzureCredential') as mock_dac, \
+                patch('adx_mcp_server.server.KustoConnectionStringBuilder') as mock_kcsb, \
+                patch('adx_mcp_server.server.KustoClient'), \
+                patch('adx_mcp_server.server.logger'):
+            mock_dac.return_value = _credential()
+            yield mock_dac, mock_kcsb
+
+    def test_registry_wraps_credential(self, mock_sdk, adx_config):
+        _, mock_kcsb = mock_sdk
+        server.get_kusto_client()
+
+        credential = mock_kcsb.with_azure_token_credential.call_args.kwargs["credential"].credential
+        assert isinstance(credential, RefreshingCredential)
+        assert server._client_registry.token_stats()["tokens"] == 0
+
+    def test_wrapping_can_be_disabled(self, mock_sdk, adx_config):
+        mock_dac, mock_kcsb = mock_sdk
+        adx_config.token_refresh_margin_seconds = 0
+        server.get_kusto_client()
+
+        assert mock_kcsb.with_azure_token_credential.call_args.kwargs["credential"].credential is mock_dac.return_value
+        assert server._client_registry.token_stats() is None
+
+    def test_prefetch_kusto_token(self, mock_sdk, adx_config):
+        mock_dac, _ = mock_sdk
+        with patch('adx_mcp_server.server.CloudSettings') as mock_cloud:
+            mock_cloud.get_cloud_info_for_cluster.return_value = MagicMock(
+                kusto_service_resource_id="https://kusto.kusto.windows.net",
+                login_mfa_required=False
+            )
+            server.prefetch_kusto_token()
+
+        mock_dac.return_value.get_token.assert_called_once_with(SCOPE)
+        assert server._client_registry.token_stats()["tokens"] == 1
+
+    def test_prefetch_uses_mfa_scope(self, mock_sdk, adx_config):
+        mock_dac, _ = mock_sdk
+        with patch('adx_mcp_server.server.CloudSettings') as mock_cloud:
+            mock_cloud.get_cloud_info_for_cluster.return_value = MagicMock(
+                kusto_service_resource_id="https://kusto.kusto.windows.net",
+                login_mfa_required=True
+            )
+            server.prefetch_kusto_token()
+
+        mock_dac.return_value.get_token.assert_called_once_with("https://kusto.kustomfa.windows.net/.default")
+
+    def test_prefetch_failure_is_logged(self, mock_sdk, adx_config):
+        with patch('adx_mcp_server.server.CloudSettings') as mock_cloud, \
+                patch('adx_mcp_server.server.logger') as mock_logger:
+            mock_cloud.get_cloud_info_for_cluster.side_effect = Exception("offline")
+            server.prefetch_kusto_token()
+
+        mock_logger.warning.assert_called_once()
+
+    def test_prefetch_skipped_when_disabled(self, mock_sdk, adx_config):
+        adx_config.token_refresh_margin_seconds = 0
+        with patch('adx_mcp_server.server.CloudSettings') as mock_cloud:
+            server.prefetch_kusto_token()
+
+        mock_cloud.get_cloud_info_for_cluster.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lifespan_prefetches_token(self, adx_config):
+        with patch('adx_mcp_server.server.prefetch_kusto_token') as mock_prefetch, \
+                patch('adx_mcp_server.server.close_async_kusto_clients', new_callable=AsyncMock):
+            async with server._lifespan(server.mcp):
+                for _ in range(20):
+                    if mock_prefetch.called:
+                        break
+                    await asyncio.sleep(0.01)
+
+        mock_prefetch.assert_called_once()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""
+Tests for the optional OpenTelemetry spans.
+"""
+
+import sys
+import pytest
+from unittest.mock import ANY, patch, MagicMock
+
+from fastmcp import FastMCP
+from fastmcp.client import Client
+
+from adx_mcp_server import server, tracing
+from adx_mcp_server.credentials import RefreshingCredential
+
+
+@pytest.fixture
+def exporter():
+    """Record spans in memory for the duration of a test."""
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    with patch('adx_mcp_server.tracing.logger'):
+        assert tracing.configure_tracing(provider) is True
+    yield exporter
+    tracing.shutdown_tracing()
+
+
+@pytest.fixture
+def traced_client(adx_config, make_result_set):
+    """A pooled client, reached through the real get_kusto_client, that returns one row."""
+    client = MagicMock()
+    client.execute.return_value = make_result_set([("x", "long")], [[1]])
+    with patch.object(server._client_registry, 'get_client', return_value=client), \
+            patch('adx_mcp_server.server.logger'):
+        yield client
+
+
+def _spans(exporter):
+    return {span.name: span for span in exporter.get_finished_spans()}
+
+
+class TestNoOpFallback:
+    """Tests for the disabled state."""
+
+    def test_span_is_a_shared_no_op(self):
+        assert tracing.tracing_enabled() is False
+        with tracing.span("anything", {"a": 1}) as current:
+            current.set_attribute("b", 2)
+            assert current.is_recording() is False
+        assert tracing.span("other") is tracing.span("anything")
+
+    def test_requests_still_get_a_client_request_id(self):
+        assert server._with_client_request_id(None).client_request_id.startswith("adx-mcp-server;")
+
+    @pytest.mark.asyncio
+    async def test_tools_work_without_tracing(self, traced_client):
+        assert await server.execute_query("T | take 1") == [{"x": 1}]
+        traced_client.execute.assert_called_once_with("testdb", "T | take 1", ANY)
+
+
+class TestSpans:
+    """Tests for the spans recorded with an in-memory exporter."""
+
+    @pytest.mark.asyncio
+    async def test_query_spans_nest_under_the_caller(self, exporter, traced_client):
+        with tracing.span("execute_tool execute_query"):
+            await server.execute_query("T | take 1", output_format="csv")
+
+        spans = _spans(exporter)
+        parent = spans["execute_tool execute_query"]
+        for name in ("kusto.get_client", "kusto.execute", "kusto.format_results"):
+            assert spans[name].parent.span_id == parent.context.span_id
+            assert spans[name].context.trace_id == parent.context.trace_id
+        assert spans["kusto.format_results"].attributes["adx.row_count"] == 1
+        assert spans["kusto.format_results"].attributes["adx.output_format"] == "csv"
+
+    @pytest.mark.asyncio
+    async def test_execute_span_carries_client_request_id(self, exporter, traced_client):
+        await server.execute_query("T | take 1")
+
+        properties = traced_client.execute.call_args.args[2]
+        attributes = _spans(exporter)["kusto.execute"].attributes
+        assert properties.client_request_id.startswith("adx-mcp-server;")
+        assert attributes["kusto.client_request_id"] == properties.client_request_id
+        assert attributes["db.namespace"] == "testdb"
+        assert attributes["server.address"] == "https://testcluster.region.kusto.windows.net"
+
+    @pytest.mark.asyncio
+    async def test_failed_request_is_recorded(self, exporter, traced_client):
+        traced_client.execute.side_effect = ValueError("Syntax error")
+
+        with pytest.raises(ValueError):
+            await server.execute_query("T |")
+
+        execute_span = _spans(exporter)["kusto.execute"]
+        assert execute_span.status.is_ok is False
+        assert execute_span.events[0].name == "exception"
+
+    def test_token_acquisition_span(self, exporter):
+        inner = MagicMock()
+        inner.get_token.return_value = MagicMock(expires_on=4102444800)
+        credential = RefreshingCredential(inner, 300)
+        try:
+            with tracing.span("kusto.execute"):
+                credential.get_token("https://kusto/.default")
+        finally:
+            credential.close()
+
+        spans = _spans(exporter)
+        assert spans["azure.get_token"].parent.span_id == spans["kusto.execute"].context.span_id
+
+    @pytest.mark.asyncio
+    async def test_tool_middleware(self, exporter):
+        app = FastMCP("tracing-test")
+        app.add_middleware(server.ToolTracingMiddleware())
+
+        @app.tool()
+        async def tracing_probe() -> str:
+            with tracing.span("inner"):
+                return "ok"
+
+        async with Client(app) as client:
+            await client.call_tool("tracing_probe", {})
+
+        spans = _spans(exporter)
+        assert spans["execute_tool tracing_probe"].attributes["gen_ai.tool.name"] == "tracing_probe"
+        assert spans["inner"].parent.span_id == spans["execute_tool tracing_probe"].context.span_id
+
+
+class TestConfigureTracing:
+    """Tests for configure_tracing and enable_tracing."""
+
+    def test_creates_and_shuts_down_otlp_provider(self):
+        provider = MagicMock()
+        with patch('adx_mcp_server.tracing._create_otlp_provider', return_value=provider), \
+                patch('adx_mcp_server.tracing.trace.get_tracer_provider', return_value=tracing.trace.ProxyTracerProvider()), \
+                patch('adx_mcp_server.tracing.trace.set_tracer_provider') as mock_set, \
+                patch('adx_mcp_server.tracing.logger'):
+            assert tracing.configure_tracing() is True
+            assert tracing.tracing_enabled() is True
+            tracing.shutdown_tracing()
+
+        mock_set.assert_called_once_with(provider)
+        provider.shutdown.assert_called_once()
+        assert tracing.tracing_enabled() is False
+
+    def test_uses_existing_global_provider(self):
+        provider = MagicMock()
+        with patch('adx_mcp_server.tracing.trace.get_tracer_provider', return_value=provider), \
+                patch('adx_mcp_server.tracing._create_otlp_provider') as mock_create, \
+                patch('adx_mcp_server.tracing.logger'):
+            tracing.configure_tracing()
+            tracing.shutdown_tracing()
+
+        mock_create.assert_not_called()
+        provider.shutdown.assert_not_called()
+
+    def test_missing_exporter_is_logged(self):
+        with patch.dict(sys.modules, {"opentelemetry.exporter.otlp.proto.http.trace_exporter": None}), \
+                patch('adx_mcp_server.tracing.logger') as mock_logger:
+            assert tracing._create_otlp_provider() is None
+
+        mock_logger.warning.assert_called_once()
+
+    def test_enable_tracing_adds_middleware(self):
+        with patch('adx_mcp_server.server.configure_tracing', return_value=True), \
+                patch('adx_mcp_server.server.mcp') as mock_mcp:
+            assert server.enable_tracing() is True
+
+        assert isinstance(mock_mcp.add_middleware.call_args.args[0], server.ToolTracingMiddleware)
+
+    def test_enable_tracing_without_opentelemetry(self):
+        with patch('adx_mcp_server.server.configure_tracing', return_value=False), \
+                patch('adx_mcp_server.server.mcp') as mock_mcp:
+            assert server.enable_tracing() is False
+
+        mock_mcp.add_middleware.assert_not_called()